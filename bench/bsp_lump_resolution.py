@@ -0,0 +1,95 @@
+"""Resolves every registered lump name for synthetic BSP headers, with the registry and with the old full scan.
+
+Usage: python bench/bsp_lump_resolution.py [header count]
+"""
+import random
+import sys
+import time
+from dataclasses import dataclass
+
+import _bootstrap  # noqa: F401
+
+from SourceIO.library.shared.app_id import SteamAppId
+from SourceIO.library.source1.bsp import lumps  # noqa: F401, registers lump classes
+from SourceIO.library.source1.bsp.lump import LUMP_REGISTRY, Lump, _RESOLVED_LUMPS, resolve_lump_class
+
+
+@dataclass
+class FakeLumpInfo:
+    version: int
+
+
+def scan_lump_class(lump_name, bsp_version, steam_id, lumps_info):
+    """Ranking get_lump did before the registry, returns rank of the best match and every class with that rank."""
+    best_matches = []
+    for sub in Lump.all_subclasses():
+        for tag in sub.tags:
+            if tag.lump_name != lump_name or tag.lump_id >= len(lumps_info):
+                continue
+            if tag.bsp_version is not None and tag.bsp_version > bsp_version:
+                continue
+            if tag.steam_id is not None and tag.steam_id != steam_id:
+                continue
+            if tag.lump_version is not None and tag.lump_version != lumps_info[tag.lump_id].version:
+                continue
+            rank = 0
+            if tag.bsp_version is not None and tag.bsp_version == bsp_version:
+                rank += 2
+            if tag.steam_id is not None:
+                rank += 1
+            if tag.lump_version is not None:
+                rank += 1
+            best_matches.append((rank, (sub, tag.lump_id)))
+    if not best_matches:
+        return None
+    best_rank = max(rank for rank, _ in best_matches)
+    return [match for rank, match in best_matches if rank == best_rank]
+
+
+def make_headers(count: int, rng: random.Random):
+    tags = [tag for candidates in LUMP_REGISTRY.values() for _, tag in candidates]
+    # BSPFile.version is (version, minor), tags hold either (version,) or (version, minor)
+    bsp_versions = sorted({(tag.bsp_version[0], 0) for tag in tags if tag.bsp_version}
+                          | {tag.bsp_version for tag in tags if tag.bsp_version and len(tag.bsp_version) == 2}
+                          | {(19, 0), (20, 0), (21, 0)})
+    steam_ids = sorted({tag.steam_id for tag in tags if tag.steam_id is not None}) + [SteamAppId.UNKNOWN]
+    lump_versions = sorted({tag.lump_version for tag in tags if tag.lump_version is not None} | {0})
+    headers = []
+    for _ in range(count):
+        lumps_info = [FakeLumpInfo(rng.choice(lump_versions)) for _ in range(128)]
+        headers.append((rng.choice(bsp_versions), rng.choice(steam_ids), lumps_info))
+    return headers
+
+
+def main():
+    header_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    headers = make_headers(header_count, random.Random(0))
+    names = list(LUMP_REGISTRY.keys())
+    lookups = header_count * len(names)
+
+    start = time.perf_counter()
+    expected = [scan_lump_class(name, *header) for header in headers for name in names]
+    scan_time = time.perf_counter() - start
+
+    _RESOLVED_LUMPS.clear()
+    start = time.perf_counter()
+    resolved = [resolve_lump_class(name, *header) for header in headers for name in names]
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for header in headers:
+        for name in names:
+            resolve_lump_class(name, *header)
+    warm_time = time.perf_counter() - start
+
+    mismatches = sum(1 for result, matches in zip(resolved, expected)
+                     if (result is None) != (matches is None) or (result is not None and result not in matches))
+    print(f'{header_count} headers x {len(names)} lump names = {lookups} lookups, {mismatches} mismatches')
+    print(f'full scan:       {scan_time * 1e6 / lookups:8.2f} us/lookup')
+    print(f'registry, cold:  {cold_time * 1e6 / lookups:8.2f} us/lookup')
+    print(f'registry, warm:  {warm_time * 1e6 / lookups:8.2f} us/lookup')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Decodes synthetic binary KV3 trees with the per value reader functions and with KV3ColumnarDecoder.
+
+Usage: python bench/kv3_decoders.py [values per tree]
+"""
+import sys
+import time
+
+import _bootstrap  # noqa: F401
+
+sys.path.insert(0, str(_bootstrap.REPO_ROOT / 'tests'))
+
+from SourceIO.library.source2.keyvalues3.columnar_decoder import (KV3ColumnarDecoder, TYPE_FORMAT_V1, TYPE_FORMAT_V3,
+                                                                   TYPE_FORMAT_V5)
+from kv3_trees import assert_same_tree, wide_array_tree
+
+
+def _time(decode, writer, repeats: int):
+    best = None
+    result = None
+    for _ in range(repeats):
+        context = writer.context()
+        start = time.perf_counter()
+        result = decode(context)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    failed = False
+    for type_format in (TYPE_FORMAT_V1, TYPE_FORMAT_V3, TYPE_FORMAT_V5):
+        writer = wide_array_tree(type_format, 1, count)
+        legacy_time, legacy = _time(lambda context: context.read_value(context), writer, 3)
+        columnar_time, columnar = _time(lambda context: KV3ColumnarDecoder(context, type_format).decode(), writer, 3)
+        try:
+            assert_same_tree(legacy, columnar)
+            status = 'same tree'
+        except AssertionError as e:
+            status = f'MISMATCH {e}'
+            failed = True
+        print(f'v{type_format}: {len(writer.types)} type bytes, legacy {legacy_time * 1000:.1f} ms, '
+              f'columnar {columnar_time * 1000:.1f} ms, x{legacy_time / columnar_time:.1f}, {status}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Throughput of the KeyValues lexers and parsers on a synthetic entity lump, VMT and gameinfo style text.
+
+Usage: python bench/kv_parsers.py [revision]
+With a git revision, kv_parser.py and s1_keyvalues.py of that revision are timed too and their
+entity trees must match the current ones (e.g. the baseline commit for the regular expression lexers).
+"""
+import random
+import sys
+import time
+import warnings
+
+import _bootstrap  # noqa: F401
+
+sys.path.insert(0, str(_bootstrap.REPO_ROOT / 'tests'))
+
+from SourceIO.library.utils import kv_parser, s1_keyvalues
+from kv_conformance import import_revision
+
+VMT = '''"VertexLitGeneric"
+{
+\t"$basetexture" "models/props/some/long/path/texture"
+\t"$bumpmap" "models/props/some/long/path/texture_normal"
+\t"$phong" "1"
+\t"$phongexponent" "20"
+\t">=dx90_20b"
+\t{
+\t\t"$selfillum" "1"
+\t}
+\t"proxies"
+\t{
+\t\t"sine"
+\t\t{
+\t\t\t"sinemin" "0"
+\t\t\t"resultvar" "$selfillumtint"
+\t\t}
+\t}
+}
+'''
+
+
+def entity_lump(entity_count: int) -> str:
+    rng = random.Random(1)
+    entities = []
+    for i in range(entity_count):
+        entities.append('{\n'
+                        f'"classname" "prop_static_{i % 50}"\n'
+                        f'"origin" "{rng.uniform(-9999, 9999):.3f} {rng.uniform(-9999, 9999):.3f} '
+                        f'{rng.uniform(0, 999):.3f}"\n'
+                        f'"angles" "0 {rng.randint(0, 359)} 0"\n'
+                        f'"targetname" "some_entity_name_{i}"\n'
+                        '"spawnflags" "256"\n'
+                        '"OnTrigger" "relay,Trigger,,0,-1"\n'
+                        '"model" "models/props/some/long/path/model.mdl"\n'
+                        '}\n')
+    return ''.join(entities)
+
+
+def s1_text(block_count: int) -> str:
+    rng = random.Random(2)
+    blocks = []
+    for i in range(block_count):
+        blocks.append(f'"block_{i}"\n{{\n'
+                      f'\tname "item_{i}"\n'
+                      f'\tpath |gameinfo_path|models/item_{i}.mdl\n'
+                      f'\tscale {rng.uniform(0, 10):.4f}\n'
+                      f'\torigin {rng.randint(-999, 999)} {rng.randint(-999, 999)} {rng.randint(-999, 999)}\n'
+                      '\t"flags" "1"\n'
+                      '}\n')
+    return '"root"\n{\n' + ''.join(blocks) + '}\n'
+
+
+def _rate(size: int, function) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function()
+    return size / (time.perf_counter() - start) / 1e6, result
+
+
+def measure(kv_module, s1_module, entities: str, s1_data: str):
+    entity_size = len(entities.encode('utf-8'))
+
+    def lex():
+        return sum(1 for _ in kv_module.ValveKeyValueLexer(entities).lex())
+
+    def parse_entities():
+        parser = kv_module.ValveKeyValueParser(buffer_and_name=(entities, 'entities'), self_recover=True,
+                                               array_of_blocks=True)
+        parser.parse()
+        return [block.to_dict() for block in parser.tree]
+
+    def parse_vmts():
+        for _ in range(2000):
+            kv_module.ValveKeyValueParser(buffer_and_name=(VMT, 'vmt'), self_recover=True).parse()
+
+    lex_rate, _ = _rate(entity_size, lex)
+    parse_rate, tree = _rate(entity_size, parse_entities)
+    vmt_rate, _ = _rate(len(VMT) * 2000, parse_vmts)
+    s1_rate, _ = _rate(len(s1_data.encode('utf-8')), lambda: s1_module.KVParser('s1', s1_data).parse())
+    print(f'  ValveKeyValueLexer {lex_rate:.2f} MB/s, entity parse {parse_rate:.2f} MB/s, '
+          f'VMT parse {vmt_rate:.2f} MB/s, KVParser {s1_rate:.2f} MB/s')
+    return tree
+
+
+def main():
+    warnings.simplefilter('ignore')
+    entities = entity_lump(20000)
+    s1_data = s1_text(10000)
+    print(f'entity lump {len(entities) / 1e6:.1f} MB, KVParser input {len(s1_data) / 1e6:.1f} MB')
+    print('current')
+    tree = measure(kv_parser, s1_keyvalues, entities, s1_data)
+    if len(sys.argv) > 1:
+        revision = sys.argv[1]
+        print(revision)
+        old_tree = measure(import_revision(revision, 'library/utils/kv_parser.py', 'old_kv_parser'),
+                           import_revision(revision, 'library/utils/s1_keyvalues.py', 'old_s1_keyvalues'),
+                           entities, s1_data)
+        if old_tree != tree:
+            print('MISMATCH in entity trees')
+            sys.exit(1)
+        print('entity trees match')
+
+
+if __name__ == '__main__':
+    main()
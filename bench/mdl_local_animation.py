@@ -0,0 +1,320 @@
+"""Decodes synthetic MDL animation sections and packed quaternions with the batched numpy readers
+and with the per bone, per value readers they replaced, results must be bit for bit identical.
+
+Usage: python bench/mdl_local_animation.py [bones] [frames] [seeds]
+"""
+import struct
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import _bootstrap  # noqa: F401
+
+from SourceIO.library.models.mdl.structs.compressed_vectors import Quat48, Quat48S, Quat64
+from SourceIO.library.models.mdl.structs.local_animation import (ANIM_DTYPE, AniBoneFlags, AnimBoneFlags,
+                                                                 AnimDescFlags, StudioAnimDesc)
+from SourceIO.library.utils import MemoryBuffer
+from SourceIO.library.utils.math_utilities import euler_to_quat
+
+_CHANNELS = object()
+
+
+# Readers as they were before the batched rewrite, one value at a time
+
+def scalar_frame_animations(buffer, bones, frame_count):
+    entry_offset = buffer.tell()
+    constant_offset, frame_offset, frame_length = buffer.read_fmt("3i")
+    buffer.skip(12)
+    bone_flags = [AniBoneFlags(buffer.read_uint8()) for _ in bones]
+    if constant_offset > 0:
+        constant_info = np.zeros((1, len(bones),), ANIM_DTYPE)
+        buffer.seek(entry_offset + constant_offset)
+        for bone in bones:
+            flag = bone_flags[bone.bone_id]
+            if flag & AniBoneFlags.CONST_ROT2:
+                constant_info[0, bone.bone_id]["rot"] = Quat48S.read(buffer)
+            if flag & AniBoneFlags.RAW_ROT:
+                constant_info[0, bone.bone_id]["rot"] = Quat48.read(buffer)
+            if flag & AniBoneFlags.RAW_POS:
+                constant_info[0, bone.bone_id]["pos"] = buffer.read_fmt("3e")
+            if flag & AniBoneFlags.CONST_POS2:
+                constant_info[0, bone.bone_id]["pos"] = buffer.read_fmt("3f")
+        return constant_info
+
+    frame_buffer = np.zeros((frame_count, len(bones)), ANIM_DTYPE)
+    buffer.seek(entry_offset + frame_offset)
+    for frame_id in range(frame_count):
+        for bone in bones:
+            flag = bone_flags[bone.bone_id]
+            if flag & AniBoneFlags.ANIM_ROT2:
+                frame_buffer[frame_id, bone.bone_id]["rot"] = Quat48S.read(buffer)
+            if flag & AniBoneFlags.ANIM_ROT:
+                frame_buffer[frame_id, bone.bone_id]["rot"] = Quat48.read(buffer)
+            if flag & AniBoneFlags.ANIM_POS:
+                frame_buffer[frame_id, bone.bone_id]["pos"] = buffer.read_fmt("3e")
+            if flag & AniBoneFlags.FULL_ANIM_POS:
+                frame_buffer[frame_id, bone.bone_id]["pos"] = buffer.read_fmt("3f")
+    return frame_buffer
+
+
+def _scalar_rle_values(buffer, frame_count, scale):
+    valid, total = buffer.read_fmt("2B")
+    frame_offset = 0
+    all_shorts = np.zeros(frame_count + 1, np.int16)
+    while frame_offset < frame_count:
+        if valid > 0:
+            all_shorts[frame_offset:frame_offset + valid] = buffer.read_fmt(f"{valid}h")
+            frame_offset += valid
+        if total - valid > 0:
+            repeat_frames = total - valid
+            all_shorts[frame_offset:frame_offset + repeat_frames] = all_shorts[frame_offset - 1]
+            frame_offset += repeat_frames
+        valid, total = buffer.read_fmt("2B")
+    return all_shorts[:-1].astype(np.float32) * scale
+
+
+def _scalar_channels(buffer, frame_count, scale):
+    entry = buffer.tell()
+    offsets = buffer.read_fmt("3h")
+    values = np.zeros((frame_count, 3), dtype=np.float32)
+    for axis, offset in enumerate(offsets):
+        if offset > 0:
+            with buffer.read_from_offset(entry + offset):
+                values[:, axis] = _scalar_rle_values(buffer, frame_count, scale[axis])
+    return values
+
+
+def scalar_mdl_animations(buffer, bones, frame_count):
+    frame_buffer = np.zeros((frame_count, len(bones)), ANIM_DTYPE)
+    for bone in bones:
+        frame_buffer[:, bone.bone_id]["rot"] = bone.quat
+        frame_buffer[:, bone.bone_id]["pos"] = bone.position
+
+    for _ in bones:
+        bone_entry = buffer.tell()
+        bone_index = buffer.read_uint8()
+        if bone_index == 255:
+            break
+        bone = bones[bone_index]
+        flags = AnimBoneFlags(buffer.read_uint8())
+        next_offset = buffer.read_int16()
+
+        if flags & AnimBoneFlags.RAW_ROT:
+            rot = [Quat48.read(buffer)] * frame_count
+        elif flags & AnimBoneFlags.ANIM_RAW_ROT2:
+            rot = [Quat64.read(buffer)] * frame_count
+        elif flags & AnimBoneFlags.ANIM_ROT:
+            rot = euler_to_quat(_scalar_channels(buffer, frame_count, bone.rotation_scale) + bone.rotation)
+        elif flags & AnimBoneFlags.ANIM_DELTA:
+            rot = [(0, 0, 0, 1)] * frame_count
+        else:
+            rot = [bone.quat] * frame_count
+        frame_buffer[:, bone_index]["rot"] = rot
+
+        if flags & AnimBoneFlags.RAW_POS:
+            pos = [buffer.read_fmt("3e")] * frame_count
+        elif flags & AnimBoneFlags.ANIM_POS:
+            pos = _scalar_channels(buffer, frame_count, bone.position_scale) + bone.position
+        elif flags & AnimBoneFlags.ANIM_DELTA:
+            pos = [(0.0, 0.0, 0.0)] * frame_count
+        else:
+            pos = [bone.position] * frame_count
+        frame_buffer[:, bone_index]["pos"] = pos
+
+        if next_offset > 0:
+            buffer.seek(bone_entry + next_offset)
+            continue
+        break
+    return frame_buffer
+
+
+# Synthetic data
+
+def make_bones(rng, bone_count):
+    bones = []
+    for bone_id in range(bone_count):
+        quat = rng.normal(size=4)
+        bones.append(SimpleNamespace(bone_id=bone_id,
+                                     quat=tuple((quat / np.linalg.norm(quat)).tolist()),
+                                     position=tuple(rng.normal(size=3).tolist()),
+                                     rotation=tuple(rng.normal(size=3).tolist()),
+                                     rotation_scale=tuple((rng.random(3) * 0.01).tolist()),
+                                     position_scale=tuple((rng.random(3) * 0.1).tolist())))
+    return bones
+
+
+def packed_quat48(rng, count):
+    """x and y near the middle of their range so the dropped w stays real."""
+    packed = np.empty((count, 3), np.uint16)
+    packed[:, 0] = rng.integers(20000, 45000, count)
+    packed[:, 1] = rng.integers(20000, 45000, count)
+    packed[:, 2] = rng.integers(8000, 24000, count) | (rng.integers(0, 2, count) << 15)
+    return packed
+
+
+def packed_quat48s(rng, count):
+    return (rng.integers(16384 - 8000, 16384 + 8000, (count, 3)) | (rng.integers(0, 2, (count, 3)) << 15)).astype(
+        np.uint16)
+
+
+def packed_quat64(rng, count):
+    xs, ys, zs = (rng.integers(700000, 1400000, count).astype(np.uint64) for _ in range(3))
+    sign = rng.integers(0, 2, count).astype(np.uint64)
+    packed = np.empty((count, 2), np.uint32)
+    packed[:, 0] = (xs | ((ys & 0x7FF) << 21)) & 0xFFFFFFFF
+    packed[:, 1] = ((ys >> 11) | (zs << 10) | (sign << 31)) & 0xFFFFFFFF
+    return packed
+
+
+def rle_stream(rng, frame_count):
+    """Runs of up to 12 values and up to 14 repeats, the last run may overshoot frame_count."""
+    stream = bytearray()
+    frame_offset = 0
+    while frame_offset < frame_count:
+        valid = int(rng.integers(0, min(frame_count - frame_offset, 12) + 1))
+        total = valid + int(rng.integers(0 if valid else 1, 15))
+        stream += struct.pack('<2B', valid, total)
+        stream += rng.integers(-30000, 30000, valid).astype('<i2').tobytes()
+        frame_offset += total
+    return stream + b'\0\0'
+
+
+def _mdl_bone_entry(rng, frame_count, parts):
+    """Fixed part of the entry followed by RLE streams of its channels, channel offsets are relative to them."""
+    fixed_size = 4 + sum(6 if part is _CHANNELS else len(part) for part in parts)
+    body = bytearray()
+    tail = bytearray()
+    for part in parts:
+        if part is _CHANNELS:
+            header_pos = 4 + len(body)
+            offsets = []
+            for _ in range(3):
+                if rng.random() < 0.8:
+                    offsets.append(fixed_size + len(tail) - header_pos)
+                    tail += rle_stream(rng, frame_count)
+                else:
+                    offsets.append(0)
+            body += struct.pack('<3h', *offsets)
+        else:
+            body += part
+    return bytes(body + tail)
+
+
+def mdl_section(rng, bone_count, frame_count):
+    """RLE section covering most bones, with one bone listed twice."""
+    bone_ids = rng.permutation(bone_count)[:int(bone_count * 0.8)].tolist() + [int(rng.integers(0, bone_count))]
+    entries = []
+    for bone_id in bone_ids:
+        flags = 0
+        parts = []
+        rot_kind = rng.integers(0, 5)
+        if rot_kind == 0:
+            flags |= AnimBoneFlags.RAW_ROT
+            parts.append(packed_quat48(rng, 1).tobytes())
+        elif rot_kind == 1:
+            flags |= AnimBoneFlags.ANIM_RAW_ROT2
+            parts.append(packed_quat64(rng, 1).tobytes())
+        elif rot_kind == 2:
+            flags |= AnimBoneFlags.ANIM_ROT
+            parts.append(_CHANNELS)
+        elif rot_kind == 3:
+            flags |= AnimBoneFlags.ANIM_DELTA
+        pos_kind = rng.integers(0, 4)
+        if pos_kind == 0:
+            flags |= AnimBoneFlags.RAW_POS
+            parts.append(rng.normal(size=3).astype('<f2').tobytes())
+        elif pos_kind == 1:
+            flags |= AnimBoneFlags.ANIM_POS
+            parts.append(_CHANNELS)
+        elif pos_kind == 2:
+            flags |= AnimBoneFlags.ANIM_DELTA
+        entries.append((bone_id, int(flags), _mdl_bone_entry(rng, frame_count, parts)))
+
+    section = bytearray()
+    for i, (bone_id, flags, entry) in enumerate(entries):
+        next_offset = 0 if i == len(entries) - 1 else 4 + len(entry)
+        section += struct.pack('<BBh', bone_id, flags, next_offset) + entry
+    return bytes(section)
+
+
+def frame_section(rng, bone_count, frame_count, constant):
+    """Frame animation section, constant sections hold a single frame."""
+    mask = 0x63 if constant else 0x9C
+    flags = [int(flag) & mask for flag in rng.integers(0, 256, bone_count)]
+    data = bytearray()
+    for _ in range(1 if constant else frame_count):
+        for flag in flags:
+            if flag & (AniBoneFlags.CONST_ROT2 if constant else AniBoneFlags.ANIM_ROT2):
+                data += packed_quat48s(rng, 1).tobytes()
+            if flag & (AniBoneFlags.RAW_ROT if constant else AniBoneFlags.ANIM_ROT):
+                data += packed_quat48(rng, 1).tobytes()
+            if flag & (AniBoneFlags.RAW_POS if constant else AniBoneFlags.ANIM_POS):
+                data += rng.normal(size=3).astype('<f2').tobytes()
+            if flag & (AniBoneFlags.CONST_POS2 if constant else AniBoneFlags.FULL_ANIM_POS):
+                data += rng.normal(size=3).astype('<f4').tobytes()
+    data_offset = 24 + bone_count
+    header = struct.pack('<3i', data_offset if constant else 0, 0 if constant else data_offset,
+                         0 if constant else len(data)) + bytes(12)
+    return header + bytes(flags) + bytes(data)
+
+
+def make_desc(frame_count, frame_anim):
+    return StudioAnimDesc(0, 0, 'bench', 30.0, AnimDescFlags.FRAMEANIM if frame_anim else AnimDescFlags(0),
+                          frame_count, *([0] * 16))
+
+
+# Comparison
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def compare_quaternions(rng, count):
+    failed = False
+    for quat_class, generator in ((Quat48, packed_quat48), (Quat48S, packed_quat48s), (Quat64, packed_quat64)):
+        packed = generator(rng, count)
+        buffer = MemoryBuffer(packed.tobytes())
+        scalar_time, scalar = _timed(lambda: np.asarray([quat_class.read(buffer) for _ in range(count)], np.float64))
+        batched_time, batched = _timed(quat_class.decode, packed)
+        same = scalar.tobytes() == batched.tobytes()
+        failed |= not same
+        print(f'{quat_class.__name__:8} x{count}: read() {scalar_time * 1000:.1f} ms, '
+              f'decode() {batched_time * 1000:.1f} ms, {"identical" if same else "MISMATCH"}')
+    return failed
+
+
+def compare_sections(rng, bones, frame_count):
+    failed = False
+    cases = [('RLE section', False, mdl_section(rng, len(bones), frame_count), scalar_mdl_animations),
+             ('frame constants', True, frame_section(rng, len(bones), frame_count, True), scalar_frame_animations),
+             ('frame animation', True, frame_section(rng, len(bones), frame_count, False), scalar_frame_animations)]
+    for name, frame_anim, data, scalar_reader in cases:
+        scalar_time, scalar = _timed(scalar_reader, MemoryBuffer(data), bones, frame_count)
+        desc = make_desc(frame_count, frame_anim)
+        batched_time, batched = _timed(desc._read_animation_frames, MemoryBuffer(data), bones, frame_count)
+        same = scalar.tobytes() == batched.tobytes()
+        failed |= not same
+        print(f'{name:16} {len(bones)} bones x {frame_count} frames: scalar {scalar_time * 1000:.1f} ms, '
+              f'batched {batched_time * 1000:.1f} ms, {"identical" if same else "MISMATCH"}')
+    return failed
+
+
+def main():
+    bone_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    frame_count = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    seeds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    assert bone_count < 255, 'bone index 255 terminates RLE sections'
+    failed = compare_quaternions(np.random.default_rng(0), 100000)
+    for seed in range(seeds):
+        rng = np.random.default_rng(seed)
+        print(f'seed {seed}')
+        failed |= compare_sections(rng, make_bones(rng, bone_count), frame_count)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 import traceback
-from typing import Type
+from typing import Type, Union
 
 import bpy
 
@@ -7,6 +7,7 @@ from SourceIO.library.models.mdl.v10.structs.texture import StudioTexture
 from SourceIO.library.shared.content_manager import ContentManager
 from SourceIO.library.source1.vmt import VMT
 from SourceIO.library.source2 import CompiledMaterialResource
+from SourceIO.library.utils import Buffer
 from SourceIO.logger import SourceLogMan
 from .shader_base import ShaderBase
 from .shaders.goldsrc_shader_base import GoldSrcShaderBase
@@ -38,9 +39,12 @@ class Source1MaterialLoader(MaterialLoaderBase):
         logger.info(f'Registered Source1 material handler for {sub.__name__} shader')
         _handlers[sub.SHADER] = sub
 
-    def __init__(self, content_manager: ContentManager, file_object, material_name):
+    def __init__(self, content_manager: ContentManager, file_object: Union[Buffer, VMT], material_name):
         super().__init__(material_name)
-        self.vmt: VMT = VMT(file_object, self.material_name, content_manager)
+        if isinstance(file_object, VMT):
+            self.vmt: VMT = file_object
+        else:
+            self.vmt: VMT = VMT(file_object, self.material_name, content_manager)
         self.content_manager = content_manager
 
     def create_material(self, material: bpy.types.Material):
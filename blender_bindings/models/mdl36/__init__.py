@@ -27,7 +27,8 @@ def import_mdl36(model_path: TinyPath, buffer: Buffer,
     if vtx_buffer is None:
         logger.error(f"Could not find VTX file for {model_path}")
         raise RequiredFileNotFound(f"Could not find VVD file for {model_path}")
-    vtx = open_vtx(vtx_buffer)
+    # Importers only build LOD 0, other LODs are not parsed
+    vtx = open_vtx(vtx_buffer, lod=0)
 
     if options.import_textures:
         try:
@@ -37,8 +37,9 @@ def import_mdl44(model_path: TinyPath, buffer: Buffer,
     if vtx_buffer is None or vvd_buffer is None:
         logger.error(f"Could not find VTX and/or VVD file for {model_path}")
         raise RequiredFileNotFound(f"Could not find VTX and/or VVD file for {model_path}")
-    vtx = open_vtx(vtx_buffer)
-    vvd = Vvd.from_buffer(vvd_buffer)
+    # Importers only build LOD 0, other LODs are not parsed
+    vtx = open_vtx(vtx_buffer, lod=0)
+    vvd = Vvd.from_buffer(vvd_buffer, lod=0)
     if options.import_textures:
         try:
             import_materials(content_manager, mdl, use_bvlg=options.use_bvlg)
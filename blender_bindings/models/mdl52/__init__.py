@@ -31,8 +31,9 @@ def import_mdl52(model_path: TinyPath, buffer: Buffer,
     if vtx_buffer is None or vvd_buffer is None:
         logger.error(f"Could not find VTX and/or VVD file for {model_path}")
         raise RequiredFileNotFound(f"Could not find VTX and/or VVD file for {model_path}")
-    vtx = open_vtx(vtx_buffer)
-    vvd = Vvd.from_buffer(vvd_buffer)
+    # Importers only build LOD 0, other LODs are not parsed
+    vtx = open_vtx(vtx_buffer, lod=0)
+    vvd = Vvd.from_buffer(vvd_buffer, lod=0)
     vvc_buffer = content_manager.find_file(model_path.with_suffix(".vvc"))
     if vvc_buffer is not None:
         vvc = Vvc.from_buffer(vvc_buffer)
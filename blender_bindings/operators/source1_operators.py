@@ -15,7 +15,7 @@ from SourceIO.blender_bindings.utils.bpy_utils import get_or_create_material, is
 from SourceIO.blender_bindings.utils.resource_utils import serialize_mounted_content, deserialize_mounted_content
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.shared.content_manager import ContentManager
-from SourceIO.library.utils import FileBuffer
+from SourceIO.library.utils import FileBuffer, MappedFileBuffer
 from SourceIO.library.utils.path_utilities import path_stem
 from SourceIO.library.utils.tiny_path import TinyPath
 from SourceIO.logger import SourceLogMan
@@ -91,7 +91,7 @@ class SOURCEIO_OT_BSPImport(ImportOperatorHelper, Source1BSPSettings):
             content_manager.scan_for_content(filepath)
         else:
             deserialize_mounted_content(content_manager)
-        with FileBuffer(filepath) as f:
+        with MappedFileBuffer(filepath) as f:
             import_bsp(filepath, f, content_manager, self,
                        SteamAppId(int(self.steam_app_id)) if self.steam_app_id != "-999" else None)
 
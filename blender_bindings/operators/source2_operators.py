@@ -7,7 +7,7 @@ from SourceIO.library.shared.content_manager.providers.vpk_provider import VPKCo
 from SourceIO.library.source2 import (CompiledMaterialResource, CompiledModelResource,
                                       CompiledTextureResource, CompiledPhysicsResource)
 from SourceIO.library.source2.resource_types.compiled_world_resource import CompiledMapResource
-from SourceIO.library.utils import FileBuffer
+from SourceIO.library.utils import MappedFileBuffer
 from SourceIO.library.utils.math_utilities import SOURCE2_HAMMER_UNIT_TO_METERS
 from SourceIO.library.utils.tiny_path import TinyPath
 from .operator_helper import ImportOperatorHelper
@@ -51,7 +51,7 @@ class SOURCEIO_OT_VMDLImport(ImportOperatorHelper):
 
         for n, file in enumerate(self.files):
             print(f"Loading {n + 1}/{len(self.files)}")
-            with FileBuffer(directory / file.name) as f:
+            with MappedFileBuffer(directory / file.name) as f:
                 model_resource = CompiledModelResource.from_buffer(f, directory / file.name)
                 import_context = ImportContext(self.scale, self.lod_mask, self.import_physics, self.import_attachments,
                                                self.import_materials)
@@ -88,7 +88,7 @@ class SOURCEIO_OT_VMAPImport(ImportOperatorHelper):
                 deserialize_mounted_content(content_manager)
             file_stem = TinyPath(file.name).stem
             content_manager.add_child(VPKContentProvider(directory / f"{file_stem}.vpk"))
-            with FileBuffer(directory / file.name) as buffer:
+            with MappedFileBuffer(directory / file.name) as buffer:
                 model = CompiledMapResource.from_buffer(buffer, TinyPath(file.name))
                 load_map(model, content_manager, self.scale)
 
@@ -200,7 +200,7 @@ class SOURCEIO_OT_VMATImport(ImportOperatorHelper):
             deserialize_mounted_content(content_manager)
         for n, file in enumerate(self.files):
             print(f"Loading {n + 1}/{len(self.files)}")
-            with FileBuffer(directory / file.name) as f:
+            with MappedFileBuffer(directory / file.name) as f:
                 material_resource = CompiledMaterialResource.from_buffer(f, directory / file.name)
                 load_material(content_manager, material_resource, TinyPath(file.name))
         return {'FINISHED'}
@@ -219,7 +219,7 @@ class SOURCEIO_OT_VTEXImport(ImportOperatorHelper):
     def execute(self, context):
         directory = self.get_directory()
         for file in self.files:
-            with FileBuffer(directory / file.name) as f:
+            with MappedFileBuffer(directory / file.name) as f:
                 texture_resource = CompiledTextureResource.from_buffer(f, directory / file.name)
                 image = import_texture(texture_resource, TinyPath(file.name))
 
@@ -262,7 +262,7 @@ class SOURCEIO_OT_VPHYSImport(ImportOperatorHelper):
 
         for n, file in enumerate(self.files):
             print(f"Loading {n + 1}/{len(self.files)}")
-            with FileBuffer(directory / file.name) as f:
+            with MappedFileBuffer(directory / file.name) as f:
                 phys_res = CompiledPhysicsResource.from_buffer(f, directory / file.name)
                 objects = load_physics(phys_res.get_block(PhysBlock, block_name="DATA"), self.scale)
 
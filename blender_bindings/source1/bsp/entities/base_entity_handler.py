@@ -10,6 +10,7 @@ from SourceIO.blender_bindings.material_loader.material_loader import Source1Mat
 from SourceIO.blender_bindings.material_loader.shaders.source1_shaders.sky import Skybox
 from SourceIO.blender_bindings.source1.vtf import load_skybox_texture
 from SourceIO.blender_bindings.utils.bpy_utils import add_material, get_or_create_material
+from SourceIO.library.source1.vmt import load_vmt
 from SourceIO.library.source1.vtf import SkyboxException
 from SourceIO.library.utils.math_utilities import ensure_length, lerp_vec
 from SourceIO.library.utils.path_utilities import path_stem
@@ -689,9 +690,9 @@ class BaseEntityHandler(AbstractEntityHandler):
 
         mat = get_or_create_material(TinyPath(stripped_material_name).name, stripped_material_name)
         add_material(mat, curve_object)
-        material_file = self.content_manager.find_file(TinyPath("materials") / (material_name + ".vmt"))
-        if material_file:
-            loader = Source1MaterialLoader(self.content_manager, material_file, stripped_material_name)
+        vmt = load_vmt(self.content_manager, TinyPath("materials") / (material_name + ".vmt"))
+        if vmt:
+            loader = Source1MaterialLoader(self.content_manager, vmt, stripped_material_name)
             loader.create_material(mat)
         return curve_object
 
@@ -742,10 +743,10 @@ class BaseEntityHandler(AbstractEntityHandler):
 
     def handle_infodecal(self, entity: infodecal, entity_raw: dict):
         material_name = TinyPath(entity.texture).name
-        material_file = self.content_manager.find_file(TinyPath("materials") / (entity.texture + ".vmt"))
-        if material_file:
+        vmt = load_vmt(self.content_manager, TinyPath("materials") / (entity.texture + ".vmt"))
+        if vmt:
             material_name = strip_patch_coordinates.sub("", material_name)
-            loader = Source1MaterialLoader(self.content_manager, material_file, material_name)
+            loader = Source1MaterialLoader(self.content_manager, vmt, material_name)
             mat = get_or_create_material(path_stem(material_name), material_name)
             loader.create_material(mat)
 
@@ -202,7 +202,7 @@ class TitanfallEntityHandler(BaseEntityHandler):
     def load_entities(self):
         entity_lump = self._bsp.get_lump('LUMP_ENTITIES')
         additional_entity_lump = self._bsp.get_lump('LUMP_ENTITYPARTITIONS')
-        for entity_data in chain(entity_lump.entities, additional_entity_lump.entities):
+        for entity_data in chain(entity_lump.iter_entities(), additional_entity_lump.entities):
             if not self.handle_entity(entity_data):
                 self.logger.warn(pformat(entity_data))
         # bpy.context.view_layer.update()
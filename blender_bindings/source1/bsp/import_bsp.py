@@ -17,7 +17,9 @@ from SourceIO.library.source1.bsp.datatypes.static_prop_lump import StaticPropLu
 from SourceIO.library.source1.bsp.datatypes.face import Face
 from SourceIO.library.source1.bsp.datatypes.texture_data import TextureData
 from SourceIO.library.source1.bsp.datatypes.texture_info import TextureInfo
+from SourceIO.library.source1.bsp.displacement_mesh import build_displacements
 from SourceIO.library.source1.bsp.lumps import *
+from SourceIO.library.source1.vmt import load_vmt
 from SourceIO.library.utils import Buffer, TinyPath, path_stem, SOURCE1_HAMMER_UNIT_TO_METERS
 from SourceIO.library.utils.idtech3_shader_parser import parse_shader_materials
 from SourceIO.library.utils.math_utilities import convert_rotation_source1_to_blender
@@ -41,6 +43,11 @@ from SourceIO.blender_bindings.source1.bsp.entities.vindictus_entity_handler imp
 strip_patch_coordinates = re.compile(r"_-?\d+_-?\d+_-?\d+.*$")
 log_manager = SourceLogMan()
 
+# Lumps needed by every map import, decoded concurrently before the import starts
+PREFETCHED_LUMPS = ('LUMP_ENTITIES', 'LUMP_PAK', 'LUMP_MODELS', 'LUMP_FACES', 'LUMP_VERTICES', 'LUMP_EDGES',
+                    'LUMP_SURFEDGES', 'LUMP_TEXINFO', 'LUMP_TEXDATA', 'LUMP_TEXDATA_STRING_TABLE', 'LUMP_GAME_LUMP',
+                    'LUMP_DISPINFO', 'LUMP_DISP_VERTS')
+
 
 def get_entity_name(entity_data: dict[str, Any]):
     return f'{entity_data.get("targetname", entity_data.get("hammerid", "missing_hammer_id"))}'
@@ -53,6 +60,7 @@ def import_bsp(map_path: TinyPath, buffer: Buffer, content_manager: ContentManag
     bsp = open_bsp(map_path, buffer, content_manager, override_steamappid)
     if bsp is None:
         raise Exception("Could not open map file. This function can only load Source1 BSP files.")
+    bsp.prefetch(PREFETCHED_LUMPS)
 
     pak_lump: Optional[PakLump] = bsp.get_lump('LUMP_PAK')
     if pak_lump:
@@ -101,11 +109,12 @@ def import_entities(bsp: BSPFile, content_manager: ContentManager, settings: Sou
     logger.info(f"Using {handler_class.__name__} entity handler")
     entity_handler = handler_class(bsp, master_collection, settings.scale, settings.light_scale)
 
+    # Handlers stream entities from the lump, dump them once they are all parsed
+    entity_handler.load_entities(settings)
     entity_lump: Optional[EntityLump] = bsp.get_lump('LUMP_ENTITIES')
     if entity_lump:
         entities_json = bpy.data.texts.new(f'{bsp.filepath.stem}_entities.json')
         json.dump(entity_lump.entities, entities_json, indent=1)
-    entity_handler.load_entities(settings)
 
 
 def import_cubemaps(bsp: BSPFile, settings: Source1BSPSettings, master_collection: bpy.types.Collection,
@@ -185,12 +194,12 @@ def import_materials(bsp: BSPFile, content_manager: ContentManager, settings: So
                     f'Skipping loading of {tmp} as it already loaded')
                 continue
             logger.info(f"Loading {material_name} material")
-            material_file = content_manager.find_file(TinyPath("materials") / (material_name + ".vmt"))
+            vmt = load_vmt(content_manager, TinyPath("materials") / (material_name + ".vmt"))
 
-            if material_file:
+            if vmt:
                 material_name = strip_patch_coordinates.sub("", material_name)
                 try:
-                    loader = Source1MaterialLoader(content_manager, material_file, material_name)
+                    loader = Source1MaterialLoader(content_manager, vmt, material_name)
                     loader.create_material(mat)
                 except Exception as e:
                     logger.exception("Failed to load material due to exception:", e)
@@ -252,145 +261,55 @@ def import_disp(bsp: BSPFile, settings: Source1BSPSettings,
     edge_lump: Optional[EdgeLump] = bsp.get_lump('LUMP_EDGES')
     surf_edge_lump: Optional[SurfEdgeLump] = bsp.get_lump('LUMP_SURFEDGES')
     disp_verts_lump: Optional[DispVertLump] = bsp.get_lump('LUMP_DISP_VERTS')
-    surf_edges = surf_edge_lump.surf_edges
-    vertices = vertex_lump.vertices
-    edges = edge_lump.edges
+    face_lump: FaceLump = bsp.get_lump('LUMP_FACES')
+    tex_info_lump: TextureInfoLump = bsp.get_lump('LUMP_TEXINFO')
+    tex_data_lump: TextureDataLump = bsp.get_lump('LUMP_TEXDATA')
 
-    disp_verts = disp_verts_lump.transformed_vertices
+    infos = disp_info_lump.infos
+    disp_mesh = build_displacements(infos, face_lump.columns,
+                                    surf_edge_lump.surf_edges, edge_lump.edges, vertex_lump.vertices,
+                                    disp_verts_lump.vertices, tex_info_lump.texture_info, tex_data_lump.texture_data,
+                                    disp_multiblend.blends if disp_multiblend else None)
 
     parent_collection = get_or_create_collection('displacements', master_collection)
-    info_count = len(disp_info_lump.infos)
-    multiblend_offset = 0
-    for n, disp_info in enumerate(disp_info_lump.infos):
-        logger.info(f'Processing {n + 1}/{info_count} displacement face')
-        final_vertex_colors = {}
-        src_face = disp_info.get_source_face(bsp)
-
-        texture_info = get_tex_info(src_face, bsp)
-        texture_data = get_texture_data(texture_info, bsp)
-        tv1, tv2 = texture_info.texture_vectors
-
-        first_edge = src_face.first_edge
-        edge_count = src_face.edge_count
-
-        used_surf_edges = surf_edges[first_edge:first_edge + edge_count]
-        reverse = np.subtract(1, (used_surf_edges > 0).astype(np.uint8))
-        used_edges = edges[np.abs(used_surf_edges)]
-        tmp = np.arange(used_edges.shape[0])
-        face_vertex_ids = used_edges[tmp, reverse]
-        face_vertices = vertices[face_vertex_ids] * settings.scale
-
-        start_pos = np.asarray(disp_info.start_position, np.float32)
-        min_index = np.where(
-            np.sum(
-                np.isclose(face_vertices,
-                           start_pos * settings.scale,
-                           0.5e-2),
-                axis=1
-            ) == 3)
-        if min_index[0].shape[0] == 0:
-            lowest = 999.e16
-            for i, value in enumerate(np.sum(face_vertices - start_pos, axis=1)):
-                if value < lowest:
-                    min_index = i
-                    lowest = value
-        else:
-            min_index = min_index[0][0]
-
-        left_edge = face_vertices[(1 + min_index) & 3] - face_vertices[min_index & 3]
-        right_edge = face_vertices[(2 + min_index) & 3] - face_vertices[(3 + min_index) & 3]
-
-        num_edge_vertices = (1 << disp_info.power) + 1
-        subdivide_scale = 1.0 / (num_edge_vertices - 1)
-        left_edge_step = left_edge * subdivide_scale
-        right_edge_step = right_edge * subdivide_scale
-
-        subdiv_vert_count = num_edge_vertices ** 2
-
-        disp_vertices = np.zeros((subdiv_vert_count, 3), dtype=np.float32)
-        disp_uv = np.zeros((subdiv_vert_count, 2), dtype=np.float32)
-        disp_indices = np.arange(0, subdiv_vert_count, dtype=np.uint32) + disp_info.disp_vert_start
-        for i in range(num_edge_vertices):
-            left_end = left_edge_step * i
-            left_end += face_vertices[min_index & 3]
-
-            right_end = right_edge_step * i
-            right_end += face_vertices[(3 + min_index) & 3]
-
-            left_right_seg = right_end - left_end
-            left_right_step = left_right_seg * subdivide_scale
-
-            for j in range(num_edge_vertices):
-                disp_vertices[(i * num_edge_vertices + j)] = left_end + (left_right_step * j)
-        disp_uv[:, 0] = (np.dot(disp_vertices, tv1[:3]) + tv1[3] * settings.scale) / (
-                texture_data.view_width * settings.scale)
-        disp_uv[:, 1] = 1 - ((np.dot(disp_vertices, tv2[:3]) + tv2[3] * settings.scale) / (
-                texture_data.view_height * settings.scale))
-
-        disp_vertices_alpha = disp_verts_lump.vertices['alpha'][disp_indices]
-        final_vertex_colors['vertex_alpha'] = np.concatenate(
-            (np.hstack([disp_vertices_alpha, disp_vertices_alpha, disp_vertices_alpha]),
-             np.ones((disp_vertices_alpha.shape[0], 1))), axis=1)
-
-        if disp_multiblend and disp_info.has_multiblend:
-            multiblend_layers = disp_multiblend.blends[multiblend_offset:multiblend_offset + subdiv_vert_count]
-            final_vertex_colors['multiblend'] = multiblend_layers['multiblend'].copy()
-            red = final_vertex_colors['multiblend'][:, 0].copy()
-            alpha = final_vertex_colors['multiblend'][:, 3].copy()
-
-            final_vertex_colors['multiblend'][:, 3] = red
-            final_vertex_colors['multiblend'][:, 0] = alpha
-
-            final_vertex_colors['alphablend'] = multiblend_layers['alphablend']
-            miltiblend_color_layer = multiblend_layers['multiblend_colors']
-            shape_ = multiblend_layers.shape[0]
-            final_vertex_colors['multiblend_color0'] = np.concatenate((miltiblend_color_layer[:, 0, :],
-                                                                       np.ones((shape_, 1))),
-                                                                      axis=1)
-            final_vertex_colors['multiblend_color1'] = np.concatenate((miltiblend_color_layer[:, 1, :],
-                                                                       np.ones((shape_, 1))),
-                                                                      axis=1)
-            final_vertex_colors['multiblend_color2'] = np.concatenate((miltiblend_color_layer[:, 2, :],
-                                                                       np.ones((shape_, 1))),
-                                                                      axis=1)
-            final_vertex_colors['multiblend_color3'] = np.concatenate((miltiblend_color_layer[:, 3, :],
-                                                                       np.ones((shape_, 1))),
-                                                                      axis=1)
-            multiblend_offset += subdiv_vert_count
-        face_indices = np.zeros(((num_edge_vertices - 1) * (num_edge_vertices - 1) * 2, 3),np.uint32)
-        face_index = 0
-        for i in range(num_edge_vertices - 1):
-            for j in range(num_edge_vertices - 1):
-                index = i * num_edge_vertices + j
-                if index & 1:
-                    face_indices[face_index] = (index, index + 1, index + num_edge_vertices)
-                    face_indices[face_index+1] = (index + 1, index + num_edge_vertices + 1, index + num_edge_vertices)
-                else:
-                    face_indices[face_index] = (index, index + num_edge_vertices + 1, index + num_edge_vertices)
-                    face_indices[face_index+1] = (index, index + 1, index + num_edge_vertices + 1)
-                face_index+=2
-        mesh_data = FastMesh.new(f"{bsp.filepath.stem}_disp_{disp_info.map_face}_MESH")
-        mesh_obj = bpy.data.objects.new(f"{bsp.filepath.stem}_disp_{disp_info.map_face}", mesh_data)
-        if parent_collection is not None:
-            parent_collection.objects.link(mesh_obj)
-        else:
-            master_collection.objects.link(mesh_obj)
-        mesh_data.from_pydata(disp_vertices + disp_verts[disp_indices] * settings.scale, [], face_indices)
-
-        uv_data = mesh_data.uv_layers.new().data
-        vertex_indices = np.zeros((len(mesh_data.loops, )), dtype=np.uint32)
-        mesh_data.loops.foreach_get('vertex_index', vertex_indices)
-        uv_data.foreach_set('uv', disp_uv[vertex_indices].flatten())
-
-        for name, vertex_color_layer in final_vertex_colors.items():
-            vertex_colors = mesh_data.vertex_colors.get(name, False) or mesh_data.vertex_colors.new(name=name)
-            vertex_colors_data = vertex_colors.data
-            vertex_colors_data.foreach_set('color', vertex_color_layer[vertex_indices].flatten())
+    mesh_data = FastMesh.new(f"{bsp.filepath.stem}_displacements_MESH")
+    mesh_obj = bpy.data.objects.new(f"{bsp.filepath.stem}_displacements", mesh_data)
+    if parent_collection is not None:
+        parent_collection.objects.link(mesh_obj)
+    else:
+        master_collection.objects.link(mesh_obj)
+    mesh_data.from_pydata(disp_mesh.positions * settings.scale, [], disp_mesh.triangles)
 
+    material_indices = np.zeros(len(infos), np.int32)
+    for n, disp_info in enumerate(infos):
+        texture_info = get_tex_info(disp_info.get_source_face(bsp), bsp)
+        texture_data = get_texture_data(texture_info, bsp)
         material_name = strings_lump.strings[texture_data.name_id] or "NO_NAME"
         material_name = strip_patch_coordinates.sub("", material_name)
-        add_material(get_or_create_material(path_stem(material_name), material_name), mesh_obj)
-        mesh_data.validate(clean_customdata=False)
+        material_indices[n] = add_material(get_or_create_material(path_stem(material_name), material_name), mesh_obj)
+    mesh_data.polygons.foreach_set('material_index', material_indices[disp_mesh.triangle_displacements])
+
+    vertex_indices = disp_mesh.triangles.ravel()
+    mesh_data.uv_layers.new().data.foreach_set('uv', disp_mesh.uvs[vertex_indices].ravel())
+
+    vertex_count = len(disp_mesh.positions)
+    final_vertex_colors = {'vertex_alpha': np.ones((vertex_count, 4), np.float32)}
+    final_vertex_colors['vertex_alpha'][:, :3] = disp_mesh.alpha[:, None]
+    if disp_mesh.multiblend is not None:
+        # Red and alpha channels are swapped in the lump
+        final_vertex_colors['multiblend'] = disp_mesh.multiblend[:, [3, 1, 2, 0]]
+        final_vertex_colors['alphablend'] = disp_mesh.alphablend
+        for layer_id in range(4):
+            color = np.ones((vertex_count, 4), np.float32)
+            color[:, :3] = disp_mesh.multiblend_colors[:, layer_id]
+            final_vertex_colors[f'multiblend_color{layer_id}'] = color
+
+    for name, vertex_color_layer in final_vertex_colors.items():
+        vertex_colors = mesh_data.vertex_colors.get(name, False) or mesh_data.vertex_colors.new(name=name)
+        vertex_colors.data.foreach_set('color', vertex_color_layer[vertex_indices].ravel())
+    mesh_data.validate(clean_customdata=False)
+    logger.info(f'Imported {len(infos)} displacements')
+
     # def load_physics(self):
     #     physics_lump: PhysicsLump = self.map_file.get_lump('LUMP_PHYSICS')
     #     if not physics_lump or not physics_lump.solid_blocks:
@@ -1,7 +1,6 @@
 import logging
 from collections import defaultdict
 from dataclasses import dataclass
-from enum import IntEnum
 from itertools import chain
 from struct import pack, unpack
 from typing import Any, Mapping, Optional
@@ -11,13 +10,12 @@ import numpy as np
 from mathutils import Matrix, Quaternion, Vector
 
 from SourceIO.blender_bindings.shared.model_container import ModelContainer
-from SourceIO.blender_bindings.utils.bpy_utils import (add_material, find_layer_collection,
+from SourceIO.blender_bindings.utils.bpy_utils import (add_material, add_vertex_groups, find_layer_collection,
                                                        get_new_unique_collection, get_or_create_material,
                                                        is_blender_4_1)
 from SourceIO.library.shared.content_manager import ContentManager
 from SourceIO.library.source2 import (CompiledMaterialResource, CompiledModelResource, CompiledMorphResource,
                                       CompiledPhysicsResource, CompiledTextureResource, CompiledMeshResource)
-from SourceIO.library.source2.common import convert_normals, convert_normals_2
 from SourceIO.library.source2.blocks.kv3_block import KVBlock
 from SourceIO.library.source2.blocks.morph_block import MorphBlock
 from SourceIO.library.source2.blocks.phys_block import PhysBlock
@@ -25,6 +23,7 @@ from SourceIO.library.source2.blocks.vertex_index_buffer import VertexIndexBuffe
 from SourceIO.library.source2.blocks.vertex_index_buffer.vertex_buffer import VertexBuffer
 from SourceIO.library.source2.keyvalues3.types import NullObject, Object
 from SourceIO.library.source2.exceptions import MissingBlock
+from SourceIO.library.source2.utils.mesh_builder import DrawCallMesh, MeshBuilder
 from SourceIO.library.utils.math_utilities import SOURCE2_HAMMER_UNIT_TO_METERS
 from SourceIO.library.utils.path_utilities import path_stem
 from SourceIO.library.source2.compiled_resource import DATA_BLOCK
@@ -78,6 +77,7 @@ class ImportContext:
 
 
 def load_model(content_manager: ContentManager, resource: CompiledModelResource, import_contex: ImportContext):
+    resource.prefetch_blocks({"DATA": KVBlock, "CTRL": KVBlock})
     armature = create_armature(content_manager, resource, import_contex.scale)
     physics_objects = []
     if import_contex.import_physics:
@@ -219,6 +219,7 @@ def load_external_mesh(content_manager: ContentManager, model_resource: Compiled
                        container: ModelContainer, mesh_id: int, mesh_resource: CompiledMeshResource,
                        import_context: ImportContext
                        ):
+    mesh_resource.prefetch_blocks({"DATA": KVBlock, "VBIB": VertexIndexBuffer, "MRPH": MorphBlock})
     data_block = mesh_resource.get_block(KVBlock, block_name='DATA')
     vbib_block = mesh_resource.get_block(VertexIndexBuffer, block_name='VBIB')
     morph_block = None
@@ -251,96 +252,16 @@ def load_external_mesh(content_manager: ContentManager, model_resource: Compiled
 
 
 def _add_vertex_groups(model_resource: CompiledModelResource,
-                       vertex_buffer: VertexBuffer,
+                       draw_call_mesh: DrawCallMesh,
                        mesh_id: int,
-                       used_vertices: np.ndarray,
                        mesh_obj: bpy.types.Object):
-    has_weights = vertex_buffer.has_attribute('BLENDWEIGHT')
-    has_indicies = vertex_buffer.has_attribute('BLENDINDICES')
-
-    if not has_weights and not has_indicies:
+    if draw_call_mesh.bone_indices is None:
         return
     model_data_block = model_resource.get_block(KVBlock, block_name='DATA')
     bones = model_data_block['m_modelSkeleton']['m_boneName']
-    weight_groups = {bone: mesh_obj.vertex_groups.new(name=bone) for bone in bones}
     remap_table = np.asarray(model_data_block['m_remappingTable'][model_data_block['m_remappingTableStarts'][mesh_id]:],
                              np.uint32)
-    if has_weights and has_indicies:
-        blendweights = used_vertices["BLENDWEIGHT"]
-        if blendweights.dtype == np.uint8:
-            weights_array = blendweights.astype(np.float32)
-        elif blendweights.dtype == np.uint16:
-            weights_array = blendweights.view(np.uint8).astype(np.float32).reshape(-1, 8)
-        else:
-            raise NotImplementedError(f"Blendweights of type {blendweights.dtype} not supported")
-        weights_array = weights_array / 255
-        indices_array = used_vertices["BLENDINDICES"]
-        if indices_array.dtype == np.uint8:
-            indices_array = indices_array.astype(np.uint32)
-        elif indices_array.dtype == np.uint16:
-            indices_array = indices_array.view(np.uint8).astype(np.uint32).reshape(-1, 8)
-        elif indices_array.dtype == np.int16:
-            indices_array = indices_array.view(np.uint8).astype(np.uint32).reshape(-1, 8)
-        elif indices_array.dtype == np.int32:
-            indices_array = indices_array.view(np.uint16).astype(np.uint32).reshape(-1, 8)
-        else:
-            raise NotImplementedError(f"Blendindices of type {indices_array.dtype} not supported")
-    else:
-        indices_array = used_vertices["BLENDINDICES"]
-        if indices_array.dtype == np.uint8:
-            indices_array = indices_array.astype(np.uint32)
-        elif indices_array.dtype == np.uint16:
-            indices_array = indices_array.view(np.uint8).astype(np.uint32).reshape(-1, 8)
-        else:
-            raise NotImplementedError(f"Blendindices of type {indices_array.dtype} not supported")
-        weights_array = np.ones_like(indices_array, dtype=np.float32)
-    remapped_indices = remap_table[indices_array]
-    for n, bone_indices in enumerate(remapped_indices):
-        weights = weights_array[n]
-        for bone_index, weight in zip(bone_indices, weights):
-            if weight > 0:
-                bone_name = bones[bone_index]
-                weight_groups[bone_name].add([n], weight, 'REPLACE')
-
-
-def convert_to_float32(uv_array: np.ndarray):
-    if uv_array.dtype == np.float32 or uv_array.dtype == np.float16:
-        return uv_array
-    dtype_info = np.iinfo(uv_array.dtype)
-    dtype_min, dtype_max = dtype_info.min, dtype_info.max
-
-    if uv_array.shape[1] == 4:
-        uv_array = uv_array[:, :2]
-
-    if dtype_info.kind == 'u':  # Unsigned type
-        return (uv_array.astype(np.float32) - dtype_min) / (dtype_max - dtype_min)
-    else:  # Signed type
-        return (uv_array.astype(np.float32) - dtype_min) / (dtype_max - dtype_min) * 2 - 1
-
-
-class RenderMeshDrawPrimitiveFlags(IntEnum):
-    NONE = 0x0,
-    UseShadowFastPath = 0x1,
-    UseCompressedNormalTangent = 0x2,
-    IsOccluder = 0x4,
-    InputLayoutIsNotMatchedToMaterial = 0x8,
-    HasBakedLightingFromVertexStream = 0x10,
-    HasBakedLightingFromLightmap = 0x20,
-    CanBatchWithDynamicShaderConstants = 0x40,
-    DrawLast = 0x80,
-    HasPerInstanceBakedLightingData = 0x100,
-
-
-def use_compressed_normals(draw_call: dict):
-    if draw_call.get('m_bUseCompressedNormalTangent', False):
-        return True
-    if "m_nFlags" not in draw_call:
-        return False
-    flags = draw_call["m_nFlags"]
-    if isinstance(flags, int):
-        return flags & RenderMeshDrawPrimitiveFlags.UseCompressedNormalTangent
-    else:
-        return "MESH_DRAW_FLAGS_USE_COMPRESSED_NORMAL_TANGENT" in flags or "USE_COMPRESSED_NORMAL_TANGENT" in flags
+    add_vertex_groups(mesh_obj, bones, remap_table[draw_call_mesh.bone_indices], draw_call_mesh.bone_weights)
 
 
 def create_mesh(content_manager: ContentManager, model_resource: CompiledModelResource, container: ModelContainer,
@@ -353,6 +274,7 @@ def create_mesh(content_manager: ContentManager, model_resource: CompiledModelRe
     if import_context.import_attachments:
         load_attachments(data_block["m_attachments"], container, import_context.scale)
 
+    builder = MeshBuilder(vertex_buffers, index_buffers, import_context.scale)
     for scene_object in data_block['m_sceneObjects']:
         if import_context.draw_call_index is not None:
             draw_calls = [scene_object["m_drawCalls"][import_context.draw_call_index]]
@@ -360,13 +282,6 @@ def create_mesh(content_manager: ContentManager, model_resource: CompiledModelRe
             draw_calls = scene_object["m_drawCalls"]
 
         for draw_call in draw_calls:
-            assert len(draw_call['m_vertexBuffers']) == 1
-            assert draw_call['m_nPrimitiveType'] in [5, 'RENDER_PRIM_TRIANGLES']
-
-            vertex_buffer_info = draw_call['m_vertexBuffers'][0]
-            index_buffer_info = draw_call['m_indexBuffer']
-            vertex_buffer = vertex_buffers[vertex_buffer_info['m_hBuffer']]
-            index_buffer = index_buffers[index_buffer_info['m_hBuffer']]
             material_name = draw_call['m_material', 'm_pMaterial']
             material_resource: CompiledMaterialResource | None = None
             if not isinstance(material_name, NullObject):
@@ -393,18 +308,8 @@ def create_mesh(content_manager: ContentManager, model_resource: CompiledModelRe
                 overlay = False
                 morph_supported = bool(morph_block)
                 logging.error(f'Failed to load material {material_name} for {mesh_resource.name}!')
-            vertices = vertex_buffer.get_vertices()
-            indices = index_buffer.get_indices()
-            base_vertex = draw_call['m_nBaseVertex']
+            draw_call_mesh = builder.build(draw_call)
             vertex_count = draw_call['m_nVertexCount']
-            start_index = draw_call['m_nStartIndex'] // 3
-            index_count = draw_call['m_nIndexCount'] // 3
-
-            part_indices = indices[start_index:start_index + index_count]
-            used_vertices_ids, _, new_indices = np.unique(part_indices, return_index=True, return_inverse=True)
-
-            used_vertices = vertices[base_vertex:][used_vertices_ids]
-            del used_vertices_ids, part_indices
 
             material_stem = path_stem(material_name)
             model_name = mesh_name or mesh_resource.name
@@ -412,20 +317,12 @@ def create_mesh(content_manager: ContentManager, model_resource: CompiledModelRe
             # mesh = bpy.data.meshes.new(f'{model_name}_{material_stem}_mesh')
             mesh_obj = bpy.data.objects.new(f'{model_name}_{material_stem}', mesh)
 
-            positions = used_vertices['POSITION'] * import_context.scale
-            if vertex_buffer.has_attribute('NORMAL'):
-                normals = used_vertices['NORMAL']
-                if use_compressed_normals(draw_call):
-                    if normals.dtype == np.uint32:
-                        normals = convert_normals_2(normals)
-                    else:
-                        normals = convert_normals(normals)
-            else:
-                normals = None
+            positions = draw_call_mesh.positions
+            normals = draw_call_mesh.normals
             if overlay and normals is not None:
                 positions += normals * 0.01
 
-            mesh.from_pydata(positions, np.empty(0), new_indices.reshape((-1, 3)))
+            mesh.from_pydata(positions, np.empty(0), draw_call_mesh.indices)
             mesh.update()
             material = get_or_create_material(material_stem, TinyPath(material_name).as_posix())
             add_material(material, mesh_obj)
@@ -456,55 +353,23 @@ def create_mesh(content_manager: ContentManager, model_resource: CompiledModelRe
                 tmp[:3] = tmp[:3] ** 0.5
                 tint_data = np.full((vertex_count, 4), tmp, np.float32)
                 vertex_colors_data.foreach_set('color', tint_data[vertex_indices].flatten())
-            for uv_id in range(16):
-                if uv_id == 0:
-                    attrib_name = f"TEXCOORD"
-                else:
-                    attrib_name = f"TEXCOORD_{uv_id}"
-                if vertex_buffer.has_attribute(attrib_name):
-                    uv_layer = used_vertices[attrib_name].copy()
-                    if uv_layer.shape[1] < 2:
-                        continue
-                    if uv_layer.shape[1] == 4:
-                        uv_layer_0 = convert_to_float32(uv_layer[:, :2])
-                        uv_layer_1 = convert_to_float32(uv_layer[:, 2:])
-                        uv_layer_0[:, 1] = np.subtract(1, uv_layer_0[:, 1])
-                        uv_layer_1[:, 1] = np.subtract(1, uv_layer_1[:, 1])
-
-                        uv_data = mesh.uv_layers.new(name=attrib_name).data
-                        uv_data.foreach_set('uv', uv_layer_0[vertex_indices].flatten())
-
-                        uv_data = mesh.uv_layers.new(name=attrib_name + "_2").data
-                        uv_data.foreach_set('uv', uv_layer_1[vertex_indices].flatten())
-                        del uv_layer_0, uv_layer_1, uv_data
-
-                    else:
-                        uv_layer = convert_to_float32(uv_layer)
-                        uv_layer[:, 1] = np.subtract(1, uv_layer[:, 1])
-
-                        uv_data = mesh.uv_layers.new(name=attrib_name).data
-                        uv_data.foreach_set('uv', uv_layer[vertex_indices].flatten())
-                        del uv_layer, uv_data
+            for uv_name, uv_layer in draw_call_mesh.uvs.items():
+                uv_data = mesh.uv_layers.new(name=uv_name).data
+                uv_data.foreach_set('uv', uv_layer[vertex_indices].flatten())
+                del uv_data
 
-            if vertex_buffer.has_attribute('NORMAL'):
+            if normals is not None:
                 mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), np.uint32))
-                normals = used_vertices['NORMAL']
-                if use_compressed_normals(draw_call):
-                    if normals.dtype == np.uint32:
-                        normals = convert_normals_2(normals)
-                    else:
-                        normals = convert_normals(normals)
                 mesh.normals_split_custom_set_from_vertices(normals)
                 if not is_blender_4_1():
                     mesh.use_auto_smooth = True
 
-            if vertex_buffer.has_attribute('COLOR'):
-                color = used_vertices['COLOR']
+            if draw_call_mesh.colors is not None:
                 vertex_colors = mesh.vertex_colors.get('COLOR', False) or mesh.vertex_colors.new(name='COLOR')
                 vertex_colors_data = vertex_colors.data
-                vertex_colors_data.foreach_set('color', color[vertex_indices].flatten())
+                vertex_colors_data.foreach_set('color', draw_call_mesh.colors[vertex_indices].flatten())
 
-            _add_vertex_groups(model_resource, vertex_buffer, mesh_id, used_vertices, mesh_obj)
+            _add_vertex_groups(model_resource, draw_call_mesh, mesh_id, mesh_obj)
             objects.append(mesh_obj)
             if morph_block and morph_supported and morph_texture is not None:
                 pos_bundle_id = morph_block.get_bundle_id('MORPH_BUNDLE_TYPE_POSITION_SPEED')
@@ -2,7 +2,9 @@ import contextlib
 import random
 
 import bpy
+import numpy as np
 
+from SourceIO.library.utils.math_utilities import group_vertex_weights
 from SourceIO.library.utils.tiny_path import TinyPath
 
 
@@ -35,6 +37,14 @@ def is_blender_4_3():
     return bpy.app.version >= (4, 3, 0)
 
 
+def add_vertex_groups(mesh_obj: bpy.types.Object, bone_names: list[str],
+                      bone_indices: np.ndarray, bone_weights: np.ndarray):
+    """Creates a vertex group per bone and assigns weights with one add call per (bone, weight) pair."""
+    weight_groups = {bone_name: mesh_obj.vertex_groups.new(name=bone_name) for bone_name in bone_names}
+    for bone_index, weight, vertex_ids in group_vertex_weights(bone_indices, bone_weights):
+        weight_groups[bone_names[bone_index]].add(vertex_ids.tolist(), weight, 'REPLACE')
+
+
 def find_layer_collection(layer_collection, name):
     if layer_collection.name == name:
         return layer_collection
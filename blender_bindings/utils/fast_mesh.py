@@ -87,3 +87,29 @@ class FastMesh(Mesh):
                 # Flag loose edges.
                 calc_edges_loose=has_faces,
             )
+
+    def from_loops(self,
+                   vertices: np.ndarray,
+                   loop_starts: np.ndarray,
+                   loop_totals: np.ndarray,
+                   loop_vertices: np.ndarray,
+                   shade_flat=True):
+        """
+        Make a mesh of n-gons from flat loop arrays, polygon i uses
+        loop_vertices[loop_starts[i]:loop_starts[i] + loop_totals[i]].
+        """
+        self.vertices.add(len(vertices))
+        self.vertices.foreach_set("co", vertices.ravel())
+        if len(loop_starts):
+            self.loops.add(len(loop_vertices))
+            self.loops.foreach_set("vertex_index", loop_vertices)
+            self.polygons.add(len(loop_starts))
+            self.polygons.foreach_set("loop_start", loop_starts)
+            if bpy.app.version < (4, 0, 0):
+                self.polygons.foreach_set("loop_total", loop_totals)
+
+        if shade_flat:
+            self.shade_flat()
+
+        if len(loop_starts):
+            self.update(calc_edges=True, calc_edges_loose=True)
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 from SourceIO.library.utils import Buffer
 
 
@@ -8,6 +10,11 @@ class Quat:
     def read(buffer: Buffer):
         raise NotImplementedError('Override me')
 
+    @staticmethod
+    def decode(packed: np.ndarray) -> np.ndarray:
+        """Decodes (N, words) array of packed quaternions into (N, 4) float64 array, matching read() exactly."""
+        raise NotImplementedError('Override me')
+
 
 class Quat64(Quat):
     @staticmethod
@@ -25,6 +32,19 @@ class Quat64(Quat):
         w = wn * math.sqrt(1.0 - x * x - y * y - z * z)
         return x, y, z, w
 
+    @staticmethod
+    def decode(packed: np.ndarray) -> np.ndarray:
+        b0 = packed[:, 0].astype(np.int64)
+        b1 = packed[:, 1].astype(np.int64)
+        quat = np.empty((len(packed), 4), np.float64)
+        quat[:, 0] = ((b0 & 0x1FFFFF) - 1048576) * (1 / 1048576.5)
+        quat[:, 1] = ((((b1 & 0x03FF) << 11) | (b0 >> 21)) - 1048576) * (1 / 1048576.5)
+        quat[:, 2] = (((b1 >> 10) & 0x1FFFFF) - 1048576) * (1 / 1048576.5)
+        x, y, z = quat[:, 0], quat[:, 1], quat[:, 2]
+        quat[:, 3] = np.sqrt(1.0 - x * x - y * y - z * z)
+        quat[(b1 & 0x80000000) != 0, 3] *= -1
+        return quat
+
 
 class Quat48(Quat):
     @staticmethod
@@ -41,6 +61,18 @@ class Quat48(Quat):
             w = -w
         return x, y, z, w
 
+    @staticmethod
+    def decode(packed: np.ndarray) -> np.ndarray:
+        packed = packed.astype(np.int64)
+        quat = np.empty((len(packed), 4), np.float64)
+        quat[:, 0] = (packed[:, 0] - 32768) * (1 / 32768)
+        quat[:, 1] = (packed[:, 1] - 32768) * (1 / 32768)
+        quat[:, 2] = ((packed[:, 2] & 0x7FFF) - 16384) * (1 / 16384)
+        x, y, z = quat[:, 0], quat[:, 1], quat[:, 2]
+        quat[:, 3] = np.sqrt(1 - x * x - y * y - z * z)
+        quat[(packed[:, 2] >> 15) != 0, 3] *= -1
+        return quat
+
 
 class Quat48S(Quat):
     SCALE48S = 23168.0
@@ -69,3 +101,16 @@ class Quat48S(Quat):
         if d_neg:
             quat[id] = -quat[id]
         return quat
+
+    @staticmethod
+    def decode(packed: np.ndarray) -> np.ndarray:
+        packed = packed.astype(np.int64)
+        components = np.empty((len(packed), 4), np.float64)
+        components[:, :3] = ((packed & 0x7FFF) - Quat48S.SHIFT48S) * (1 / Quat48S.SCALE48S)
+        a, b, c = components[:, 0], components[:, 1], components[:, 2]
+        components[:, 3] = np.sqrt(1.0 - a * a - b * b - c * c)
+        components[(packed[:, 2] >> 15) != 0, 3] *= -1
+        # Components are stored starting at index ia, wrapping around
+        ia = (packed[:, 1] >> 15) + (packed[:, 0] >> 15) * 2
+        order = (np.arange(4)[None, :] - ia[:, None]) % 4
+        return np.take_along_axis(components, order, axis=1)
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from dataclasses import dataclass
 from enum import IntFlag
 
@@ -177,20 +178,13 @@ class StudioAnimDesc:
         entry_offset = buffer.tell()
         frame_anim = StudioFrameAnim.from_buffer(buffer)
         bone_flags = [AniBoneFlags(buffer.read_uint8()) for _ in bones]
-        constant_info = np.zeros((1, len(bones),), ANIM_DTYPE)
         if frame_anim.constant_offset > 0:
             assert frame_anim.frame_length == 0
             buffer.seek(entry_offset + frame_anim.constant_offset)
-            for bone in bones:
-                flag = bone_flags[bone.bone_id]
-                if flag & AniBoneFlags.CONST_ROT2:
-                    constant_info[0, bone.bone_id]["rot"] = Quat48S.read(buffer)
-                if flag & AniBoneFlags.RAW_ROT:
-                    constant_info[0, bone.bone_id]["rot"] = Quat48.read(buffer)
-                if flag & AniBoneFlags.RAW_POS:
-                    constant_info[0, bone.bone_id]["pos"] = buffer.read_fmt("3e")
-                if flag & AniBoneFlags.CONST_POS2:
-                    constant_info[0, bone.bone_id]["pos"] = buffer.read_fmt("3f")
+            constant_info = np.zeros((1, len(bones),), ANIM_DTYPE)
+            _read_frame_records(buffer, bones, bone_flags, 1, constant_info,
+                                (AniBoneFlags.CONST_ROT2, AniBoneFlags.RAW_ROT,
+                                 AniBoneFlags.RAW_POS, AniBoneFlags.CONST_POS2))
             return constant_info
 
         elif frame_anim.frame_offset != 0 and frame_anim.frame_length > 0:
@@ -198,93 +192,29 @@ class StudioAnimDesc:
 
             assert frame_anim.constant_offset == 0
             buffer.seek(entry_offset + frame_anim.frame_offset)
-            for frame_id in range(section_frame_count):
-                for bone in bones:
-                    bone_flag = bone_flags[bone.bone_id]
-
-                    if bone_flag & AniBoneFlags.ANIM_ROT2:
-                        section_frame_buffer[frame_id, bone.bone_id]["rot"] = Quat48S.read(buffer)
-                    if bone_flag & AniBoneFlags.ANIM_ROT:
-                        section_frame_buffer[frame_id, bone.bone_id]["rot"] = Quat48.read(buffer)
-                    if bone_flag & AniBoneFlags.ANIM_POS:
-                        section_frame_buffer[frame_id, bone.bone_id]["pos"] = buffer.read_fmt("3e")
-                    if bone_flag & AniBoneFlags.FULL_ANIM_POS:
-                        section_frame_buffer[frame_id, bone.bone_id]["pos"] = buffer.read_fmt("3f")
+            _read_frame_records(buffer, bones, bone_flags, section_frame_count, section_frame_buffer,
+                                (AniBoneFlags.ANIM_ROT2, AniBoneFlags.ANIM_ROT,
+                                 AniBoneFlags.ANIM_POS, AniBoneFlags.FULL_ANIM_POS))
             return section_frame_buffer
 
-    def _read_anim_rot_value(self, buffer: Buffer, flags: AnimBoneFlags, frame_count: int, base_quat: Vector4,
-                             base_rot: Vector3, rot_scale: Vector3) -> list[Vector4]:
-        if flags & AnimBoneFlags.RAW_ROT:
-            return [Quat48.read(buffer)] * frame_count
-        if flags & AnimBoneFlags.ANIM_RAW_ROT2:
-            return [Quat64.read(buffer)] * frame_count
-        if not flags & AnimBoneFlags.ANIM_ROT:
-            if flags & AnimBoneFlags.ANIM_DELTA:
-                return [(0, 0, 0, 1)] * frame_count
-            return [base_quat] * frame_count
-
-        if flags & AnimBoneFlags.ANIM_ROT:
-            entry = buffer.tell()
-            x_offset = buffer.read_int16()
-            y_offset = buffer.read_int16()
-            z_offset = buffer.read_int16()
-            anim_rot = np.zeros((frame_count, 3), dtype=np.float32)
-            if x_offset > 0:
-                with buffer.read_from_offset(entry + x_offset):
-                    anim_rot[:, 0] = self._read_mdl_anim_values(buffer, frame_count, rot_scale[0])
-
-            if y_offset > 0:
-                with buffer.read_from_offset(entry + y_offset):
-                    anim_rot[:, 1] = self._read_mdl_anim_values(buffer, frame_count, rot_scale[1])
-
-            if z_offset > 0:
-                with buffer.read_from_offset(entry + z_offset):
-                    anim_rot[:, 2] = self._read_mdl_anim_values(buffer, frame_count, rot_scale[2])
-
-            # if not flags & AnimBoneFlags.ANIM_DELTA:
-            anim_rot = anim_rot + base_rot
-
-            return euler_to_quat(anim_rot)
-
-    def _read_anim_pos_value(self, buffer: Buffer, flags: AnimBoneFlags, frame_count: int, base_pos: Vector3,
-                             pos_scale: Vector3) -> list[Vector3]:
-        if flags & AnimBoneFlags.RAW_POS:
-            return [buffer.read_fmt("3e")] * frame_count
-        elif not flags & AnimBoneFlags.ANIM_POS:
-            if flags & AnimBoneFlags.ANIM_DELTA:
-                return [(0.0, 0.0, 0.0)] * frame_count
-            return [base_pos] * frame_count
-
-        if flags & AnimBoneFlags.ANIM_POS:
-            entry = buffer.tell()
-            x_offset = buffer.read_int16()
-            y_offset = buffer.read_int16()
-            z_offset = buffer.read_int16()
-            anim_pos = np.zeros((frame_count, 3), dtype=np.float32)
-            if x_offset > 0:
-                with buffer.read_from_offset(entry + x_offset):
-                    anim_pos[:, 0] = self._read_mdl_anim_values(buffer, frame_count, pos_scale[0])
-
-            if y_offset > 0:
-                with buffer.read_from_offset(entry + y_offset):
-                    anim_pos[:, 1] = self._read_mdl_anim_values(buffer, frame_count, pos_scale[1])
-
-            if z_offset > 0:
-                with buffer.read_from_offset(entry + z_offset):
-                    anim_pos[:, 2] = self._read_mdl_anim_values(buffer, frame_count, pos_scale[2])
-            # if not flags & AnimBoneFlags.ANIM_DELTA:
-            anim_pos = anim_pos + base_pos
-            return anim_pos
+    @staticmethod
+    def _read_anim_channels(buffer: Buffer, rle: '_RLEChannels', scale: Vector3) -> tuple[int, int, int]:
+        entry = buffer.tell()
+        offsets = buffer.read_fmt("3h")
+        return tuple(rle.add(buffer, entry + offset, axis_scale) if offset > 0 else -1
+                     for offset, axis_scale in zip(offsets, scale))
 
     def _read_mdl_animations(self, buffer: Buffer, bones: list[Bone], section_frame_count: int):
-        animation_sections = []
-
         section_frame_buffer = np.zeros((section_frame_count, len(bones)), ANIM_DTYPE)
-
-        for bone in bones:
-            section_frame_buffer[:, bone.bone_id]["rot"] = bone.quat
-            section_frame_buffer[:, bone.bone_id]["pos"] = bone.position
-
+        bone_ids = [bone.bone_id for bone in bones]
+        section_frame_buffer["rot"][:, bone_ids] = [bone.quat for bone in bones]
+        section_frame_buffer["pos"][:, bone_ids] = [bone.position for bone in bones]
+
+        # Headers are walked bone by bone, frame data of every bone is decoded together afterwards.
+        # Later entries for the same bone override earlier ones, same as writing them in order would.
+        rle = _RLEChannels(section_frame_count)
+        rot_values = {}
+        pos_values = {}
         for _ in bones:
             bone_entry = buffer.tell()
             bone_index = buffer.read_uint8()
@@ -299,40 +229,171 @@ class StudioAnimDesc:
             flags = AnimBoneFlags(buffer.read_uint8())
 
             next_offset = buffer.read_int16()
-            animation_sections.append((bone_index, flags, next_offset))
             assert flags & 0x40 == 0
             assert flags & 0x80 == 0
 
-            value = self._read_anim_rot_value(buffer, flags, section_frame_count, used_bone.quat, used_bone.rotation,
-                                              used_bone.rotation_scale)
-            section_frame_buffer[:, bone_index]["rot"] = value
-
-            value = self._read_anim_pos_value(buffer, flags, section_frame_count, used_bone.position,
-                                              used_bone.position_scale)
-            section_frame_buffer[:, bone_index]["pos"] = value
+            if flags & AnimBoneFlags.RAW_ROT:
+                rot_values[bone_index] = (Quat48, buffer.read(6))
+            elif flags & AnimBoneFlags.ANIM_RAW_ROT2:
+                rot_values[bone_index] = (Quat64, buffer.read(8))
+            elif flags & AnimBoneFlags.ANIM_ROT:
+                rot_values[bone_index] = (_RLEChannels, self._read_anim_channels(buffer, rle, used_bone.rotation_scale))
+            elif flags & AnimBoneFlags.ANIM_DELTA:
+                rot_values[bone_index] = (None, (0, 0, 0, 1))
+            else:
+                rot_values[bone_index] = (None, used_bone.quat)
+
+            if flags & AnimBoneFlags.RAW_POS:
+                pos_values[bone_index] = (np.float16, buffer.read(6))
+            elif not flags & AnimBoneFlags.ANIM_POS:
+                if flags & AnimBoneFlags.ANIM_DELTA:
+                    pos_values[bone_index] = (None, (0.0, 0.0, 0.0))
+                else:
+                    pos_values[bone_index] = (None, used_bone.position)
+            else:
+                pos_values[bone_index] = (_RLEChannels,
+                                          self._read_anim_channels(buffer, rle, used_bone.position_scale))
 
             if next_offset > 0:
                 buffer.seek(bone_entry + next_offset)
                 continue
             break
 
+        channels = rle.expand()
+        rot = section_frame_buffer["rot"]
+        pos = section_frame_buffer["pos"]
+        for kind, items in _group_by_kind(rot_values).items():
+            ids = [bone_index for bone_index, _ in items]
+            if kind is None:
+                rot[:, ids] = [value for _, value in items]
+            elif kind is _RLEChannels:
+                euler = _gather_channels(channels, items, section_frame_count)
+                euler = euler + np.asarray([bones[bone_index].rotation for bone_index in ids])[:, None, :]
+                quats = euler_to_quat(euler.reshape((-1, 3))).reshape((len(ids), section_frame_count, 4))
+                rot[:, ids] = quats.transpose((1, 0, 2))
+            else:
+                words = 3 if kind is Quat48 else 2
+                packed = np.frombuffer(b"".join(value for _, value in items), np.uint16 if words == 3 else np.uint32)
+                rot[:, ids] = kind.decode(packed.reshape((-1, words)))
+        for kind, items in _group_by_kind(pos_values).items():
+            ids = [bone_index for bone_index, _ in items]
+            if kind is None:
+                pos[:, ids] = [value for _, value in items]
+            elif kind is _RLEChannels:
+                values = _gather_channels(channels, items, section_frame_count)
+                values = values + np.asarray([bones[bone_index].position for bone_index in ids])[:, None, :]
+                pos[:, ids] = values.transpose((1, 0, 2))
+            else:
+                pos[:, ids] = np.frombuffer(b"".join(value for _, value in items), np.float16).reshape((-1, 3))
+
         return section_frame_buffer
 
-    def _read_rle_compressed_data(self, buffer: Buffer, frame_count: int):
-        valid, total = buffer.read_fmt("2B")
-        frame_offset = 0
-        all_shorts = np.zeros(frame_count + 1, np.int16)
-        while frame_offset < frame_count:
-            if valid > 0:
-                all_shorts[frame_offset:frame_offset + valid] = buffer.read_fmt(f"{valid}h")
-                frame_offset += valid
-            if total - valid > 0:
+
+def _group_by_kind(values: dict) -> dict:
+    groups = defaultdict(list)
+    for bone_index, (kind, value) in values.items():
+        groups[kind].append((bone_index, value))
+    return groups
+
+
+def _gather_channels(channels: np.ndarray, items: list, frame_count: int) -> np.ndarray:
+    """Returns (bones, frames, 3) array of decoded channels, axes without data are zero."""
+    channel_ids = np.asarray([value for _, value in items], np.intp).reshape((-1, 3))
+    result = np.zeros((len(channel_ids), frame_count, 3), np.float32)
+    bone_ids, axes = np.nonzero(channel_ids >= 0)
+    result[bone_ids, :, axes] = channels[channel_ids[bone_ids, axes]]
+    return result
+
+
+class _RLEChannels:
+    """Collects run length encoded animation values of a section, all channels are expanded with one np.repeat.
+
+    Stream of a channel is a sequence of runs: valid and total counts (uint8), followed by valid int16 values.
+    Frames past valid repeat the last value written before them.
+    """
+
+    def __init__(self, frame_count: int):
+        self.frame_count = frame_count
+        self._values = bytearray()
+        self._counts: list[int] = []
+        self._scales: list[float] = []
+
+    def add(self, buffer: Buffer, offset: int, scale: float) -> int:
+        frame_count = self.frame_count
+        values = self._values
+        counts = self._counts
+        emitted = 0
+        with buffer.read_from_offset(offset):
+            frame_offset = 0
+            while frame_offset < frame_count:
+                valid, total = buffer.read_fmt("2B")
+                if valid == 0 and total == 0:
+                    break
+                if valid > 0:
+                    take = min(valid, frame_count - frame_offset)
+                    values += buffer.read(2 * valid)[:2 * take]
+                    counts.extend([1] * take)
+                    emitted += take
+                    frame_offset += valid
                 repeat_frames = total - valid
-                all_shorts[frame_offset:frame_offset + repeat_frames] = all_shorts[frame_offset - 1]
-                frame_offset += repeat_frames
-            valid, total = buffer.read_fmt("2B")
-        return all_shorts[:-1]
-
-    def _read_mdl_anim_values(self, buffer: Buffer, frame_count: int, scale: float):
-        values = self._read_rle_compressed_data(buffer, frame_count)
-        return values.astype(np.float32) * scale
+                if repeat_frames > 0 and frame_offset < frame_count:
+                    take = min(repeat_frames, frame_count - frame_offset)
+                    if emitted:
+                        counts[-1] += take
+                    else:
+                        values += b"\x00\x00"
+                        counts.append(take)
+                    emitted += take
+                    frame_offset += repeat_frames
+        if emitted < frame_count:
+            values += b"\x00\x00"
+            counts.append(frame_count - emitted)
+        self._scales.append(scale)
+        return len(self._scales) - 1
+
+    def expand(self) -> np.ndarray:
+        """Returns (channels, frames) float32 array of scaled values."""
+        if not self._scales:
+            return np.zeros((0, self.frame_count), np.float32)
+        shorts = np.repeat(np.frombuffer(self._values, "<i2"), self._counts)
+        shorts = shorts.reshape((len(self._scales), self.frame_count))
+        return shorts.astype(np.float32) * np.asarray(self._scales, np.float32)[:, None]
+
+
+_FRAME_VALUE_FORMATS = {
+    AniBoneFlags.CONST_ROT2: ("rot", Quat48S, ("<u2", (3,))),
+    AniBoneFlags.ANIM_ROT2: ("rot", Quat48S, ("<u2", (3,))),
+    AniBoneFlags.RAW_ROT: ("rot", Quat48, ("<u2", (3,))),
+    AniBoneFlags.ANIM_ROT: ("rot", Quat48, ("<u2", (3,))),
+    AniBoneFlags.RAW_POS: ("pos", None, ("<f2", (3,))),
+    AniBoneFlags.ANIM_POS: ("pos", None, ("<f2", (3,))),
+    AniBoneFlags.CONST_POS2: ("pos", None, ("<f4", (3,))),
+    AniBoneFlags.FULL_ANIM_POS: ("pos", None, ("<f4", (3,))),
+}
+
+
+def _read_frame_records(buffer: Buffer, bones: list[Bone], bone_flags: list[AniBoneFlags], frame_count: int,
+                        frame_buffer: np.ndarray, value_flags: tuple[AniBoneFlags, ...]):
+    """Every frame has the same layout: values of each bone in bone order, in value_flags order.
+    Frames are read as one structured array, values of the same kind are decoded for all bones at once."""
+    fields = []
+    bone_ids = {flag: [] for flag in value_flags}
+    for bone in bones:
+        flag = bone_flags[bone.bone_id]
+        for value_flag in value_flags:
+            if flag & value_flag:
+                fields.append((f"{bone.bone_id}_{value_flag.value}", *_FRAME_VALUE_FORMATS[value_flag][2]))
+                bone_ids[value_flag].append(bone.bone_id)
+    if not fields:
+        return
+    records = buffer.read_records(np.dtype(fields), frame_count)
+    # Applied in value_flags order, later values of a bone override earlier ones
+    for value_flag in value_flags:
+        ids = bone_ids[value_flag]
+        if not ids:
+            continue
+        target, quat_class, _ = _FRAME_VALUE_FORMATS[value_flag]
+        values = np.stack([records[f"{bone_id}_{value_flag.value}"] for bone_id in ids], axis=1)
+        if quat_class is not None:
+            values = quat_class.decode(values.reshape((-1, 3))).reshape((frame_count, len(ids), 4))
+        frame_buffer[target][:, ids] = values
@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Optional, Union
 
 from SourceIO.library.utils import Buffer, FileBuffer
 from .v6.vtx import Vtx as Vtx6
@@ -6,7 +6,8 @@ from .v7.vtx import Vtx as Vtx7
 from SourceIO.library.utils.tiny_path import TinyPath
 
 
-def open_vtx(filepath_or_object: Union[TinyPath, Buffer]) -> Vtx6:
+def open_vtx(filepath_or_object: Union[TinyPath, Buffer], lod: Optional[int] = None) -> Vtx6:
+    """Opens VTX of any supported version, only meshes of given lod are read if it is set."""
     buffer: Buffer
     if isinstance(filepath_or_object, TinyPath):
         buffer = FileBuffer(filepath_or_object)
@@ -17,6 +18,6 @@ def open_vtx(filepath_or_object: Union[TinyPath, Buffer]) -> Vtx6:
     version = buffer.read_int32()
     buffer.seek(0)
     if version == 6:
-        return Vtx6.from_buffer(filepath_or_object)
+        return Vtx6.from_buffer(buffer, lod)
     elif version == 7:
-        return Vtx7.from_buffer(filepath_or_object)
+        return Vtx7.from_buffer(buffer, lod)
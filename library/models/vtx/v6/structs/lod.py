@@ -11,13 +11,13 @@ class ModelLod:
     meshes: list[Mesh]
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, lod_id: int):
+    def from_buffer(cls, buffer: Buffer, lod_id: int, read_meshes: bool = True):
         entry = buffer.tell()
         mesh_count = buffer.read_uint32()
         mesh_offset = buffer.read_uint32()
         switch_point = buffer.read_float()
         meshes = []
-        if mesh_offset > 0:
+        if mesh_offset > 0 and read_meshes:
             with buffer.read_from_offset(entry + mesh_offset):
                 for _ in range(mesh_count):
                     mesh = Mesh.from_buffer(buffer)
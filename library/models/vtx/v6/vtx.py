@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 from SourceIO.library.utils import Buffer
@@ -14,13 +15,13 @@ class Vtx:
     material_replacement_lists: list[MaterialReplacementList]
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer):
+    def from_buffer(cls, buffer: Buffer, lod: Optional[int] = None):
         header = Header.from_buffer(buffer)
 
         buffer.seek(header.body_part_offset)
         body_parts = []
         for _ in range(header.body_part_count):
-            body_part = BodyPart.from_buffer(buffer)
+            body_part = BodyPart.from_buffer(buffer, lod)
             body_parts.append(body_part)
 
         buffer.seek(header.material_replacement_list_offset)
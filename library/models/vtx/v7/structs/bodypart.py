@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 from SourceIO.library.utils import Buffer
@@ -10,7 +11,7 @@ class BodyPart:
     models: list[Model]
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, extra8: bool = False):
+    def from_buffer(cls, buffer: Buffer, extra8: bool = False, lod: Optional[int] = None):
         entry = buffer.tell()
         model_count, model_offset = buffer.read_fmt('II')
 
@@ -18,6 +19,6 @@ class BodyPart:
         with buffer.save_current_offset():
             buffer.seek(entry + model_offset)
             for _ in range(model_count):
-                model = Model.from_buffer(buffer, extra8)
+                model = Model.from_buffer(buffer, extra8, lod)
                 models.append(model)
         return cls(models)
@@ -12,14 +12,14 @@ class ModelLod:
     meshes: list[Mesh]
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, lod_id: int, extra8: bool = False):
+    def from_buffer(cls, buffer: Buffer, lod_id: int, extra8: bool = False, read_meshes: bool = True):
         entry = buffer.tell()
         mesh_count = buffer.read_uint32()
         mesh_offset = buffer.read_uint32()
         switch_point = buffer.read_float()
         meshes = []
         with buffer.save_current_offset():
-            if mesh_offset > 0:
+            if mesh_offset > 0 and read_meshes:
                 buffer.seek(entry + mesh_offset)
                 for _ in range(mesh_count):
                     mesh = Mesh.from_buffer(buffer, extra8)
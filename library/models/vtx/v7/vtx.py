@@ -1,5 +1,6 @@
 import struct
 from dataclasses import dataclass
+from typing import Optional
 
 
 from SourceIO.library.utils import Buffer
@@ -15,19 +16,19 @@ class Vtx(Vtx6):
     material_replacement_lists: list[MaterialReplacementList]
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer):
+    def from_buffer(cls, buffer: Buffer, lod: Optional[int] = None):
         header = Header.from_buffer(buffer)
         try:
             buffer.seek(header.body_part_offset)
             body_parts = []
             for _ in range(header.body_part_count):
-                body_part = BodyPart.from_buffer(buffer)
+                body_part = BodyPart.from_buffer(buffer, lod=lod)
                 body_parts.append(body_part)
         except (struct.error, AssertionError):
             buffer.seek(header.body_part_offset)
             body_parts = []
             for _ in range(header.body_part_count):
-                body_part = BodyPart.from_buffer(buffer, True)
+                body_part = BodyPart.from_buffer(buffer, True, lod)
                 body_parts.append(body_part)
 
         buffer.seek(header.material_replacement_list_offset)
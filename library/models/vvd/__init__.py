@@ -1,14 +1,22 @@
 from dataclasses import dataclass
 from enum import IntEnum
+from typing import Optional
 
 import numpy as np
 import numpy.typing as npt
 
 from SourceIO.library.utils import Buffer
-from .fixup import Fixup
+from .fixup import FIXUP_DTYPE
 from .header import Header
 
 
+def _fixup_vertex_ids(vertex_index: np.ndarray, vertex_count: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(index, index + count) for every fixup."""
+    vertex_count = vertex_count.astype(np.int64)
+    run_starts = np.cumsum(vertex_count) - vertex_count
+    return np.repeat(vertex_index.astype(np.int64) - run_starts, vertex_count) + np.arange(vertex_count.sum())
+
+
 @dataclass
 class ExtraData:
     count: int
@@ -48,7 +56,8 @@ class Vvd:
     extra_data: dict[ExtraAttributeTypes, npt.NDArray]
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer) -> 'Vvd':
+    def from_buffer(cls, buffer: Buffer, lod: Optional[int] = None) -> 'Vvd':
+        """Builds vertex arrays of every LOD, or only of given lod, other LODs are left empty then."""
         assert buffer.size() > 0
         header = Header.from_buffer(buffer)
 
@@ -58,28 +67,23 @@ class Vvd:
                                  dtype=cls.vertex_t)
 
         lod_datas = []
-        for count in header.lod_vertex_count[:header.lod_count]:
+        for lod_id, count in enumerate(header.lod_vertex_count[:header.lod_count]):
+            if lod is not None and lod_id != lod:
+                count = 0
             lod_datas.append(np.zeros((count,), dtype=cls.vertex_t))
 
-        buffer.seek(header.fixup_table_offset)
-        fixups = [Fixup.from_buffer(buffer) for _ in range(header.fixup_count)]
-
         if header.fixup_count:
-            lod_offsets = np.zeros(len(lod_datas), dtype=np.uint32)
-            for lod_id in range(header.lod_count):
-                for fixup in fixups:
-                    if fixup.lod_index >= lod_id:
-                        lod_data = lod_datas[lod_id]
-                        assert fixup.vertex_index + fixup.vertex_count <= vertices.size, \
-                            f"{fixup.vertex_index + fixup.vertex_count}>{vertices.size}"
-                        lod_offset = lod_offsets[lod_id]
-                        vertex_index = fixup.vertex_index
-                        vertex_count = fixup.vertex_count
-                        lod_data[lod_offset:lod_offset + vertex_count] = vertices[
-                                                                         vertex_index:vertex_index + vertex_count]
-                        lod_offsets[lod_id] += fixup.vertex_count
-
-        else:
+            buffer.seek(header.fixup_table_offset)
+            fixups = buffer.read_records(FIXUP_DTYPE, header.fixup_count)
+            vertex_end = fixups["vertex_index"].astype(np.int64) + fixups["vertex_count"]
+            assert np.all(vertex_end <= vertices.size), f"{vertex_end.max()}>{vertices.size}"
+            for lod_id, lod_data in enumerate(lod_datas):
+                if lod is not None and lod_id != lod:
+                    continue
+                lod_fixups = fixups[fixups["lod_index"] >= lod_id]
+                vertex_ids = _fixup_vertex_ids(lod_fixups["vertex_index"], lod_fixups["vertex_count"])
+                lod_data[:len(vertex_ids)] = vertices[vertex_ids]
+        elif lod is None or lod == 0:
             lod_datas[0][:] = vertices[:]
 
         if header.tangent_data_offset > 0:
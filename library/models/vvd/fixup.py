@@ -1,7 +1,11 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 from SourceIO.library.utils import Buffer
 
+FIXUP_DTYPE = np.dtype([("lod_index", np.uint32), ("vertex_index", np.uint32), ("vertex_count", np.uint32)])
+
 
 @dataclass(slots=True)
 class Fixup:
@@ -0,0 +1,164 @@
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from SourceIO.library.shared.content_manager.path_index import normalize_index_key
+from SourceIO.library.utils import Buffer, MappedFileBuffer, MemoryBuffer
+
+DEFAULT_CACHE_BUDGET = 256 * 1024 * 1024
+# Mapped files smaller than this are copied, so the cache holds at most budget / threshold open mappings
+MAPPED_COPY_THRESHOLD = 1024 * 1024
+
+Payload = Union[bytes, memoryview]
+T = TypeVar('T')
+
+
+def get_cache_budget() -> int:
+    if budget := os.environ.get('SOURCEIO_CONTENT_CACHE_BYTES', None):
+        return int(budget)
+    return DEFAULT_CACHE_BUDGET
+
+
+def freeze_buffer(buffer: Buffer) -> Payload:
+    """Returns read-only contents of buffer, memory backed buffers and large mapped files are not copied."""
+    if isinstance(buffer, MappedFileBuffer) and buffer.size() < MAPPED_COPY_THRESHOLD:
+        data = bytes(buffer.data)
+        buffer.close()
+        return data
+    if isinstance(buffer, MemoryBuffer):
+        return buffer.data.toreadonly()
+    with buffer.save_current_offset():
+        buffer.seek(0)
+        data = buffer.read()
+    buffer.close()
+    return data
+
+
+def _payload_size(payload: Payload) -> int:
+    return payload.nbytes if isinstance(payload, memoryview) else len(payload)
+
+
+@dataclass(slots=True)
+class ContentCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size: int = 0
+    budget: int = 0
+
+
+class ContentCache:
+    """LRU cache of file payloads limited by total byte size. Every get returns a new Buffer over the payload,
+    so callers are free to seek or close what they got."""
+
+    def __init__(self, budget: int = DEFAULT_CACHE_BUDGET):
+        self._budget = budget
+        self._entries: OrderedDict[str, Payload] = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @budget.setter
+    def budget(self, value: int):
+        with self._lock:
+            self._budget = value
+            self._evict()
+
+    def get(self, key: str) -> Optional[Buffer]:
+        with self._lock:
+            payload = self._entries.get(key, None)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return MemoryBuffer(payload)
+
+    def put(self, key: str, payload: Payload) -> Buffer:
+        size = _payload_size(payload)
+        with self._lock:
+            if (old := self._entries.pop(key, None)) is not None:
+                self._size -= _payload_size(old)
+            if size <= self._budget:
+                self._entries[key] = payload
+                self._size += size
+                self._evict()
+        return MemoryBuffer(payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> ContentCacheStats:
+        with self._lock:
+            return ContentCacheStats(self.hits, self.misses, self.evictions,
+                                     len(self._entries), self._size, self._budget)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        while self._size > self._budget and self._entries:
+            _, payload = self._entries.popitem(last=False)
+            self._size -= _payload_size(payload)
+            self.evictions += 1
+
+
+@dataclass(slots=True)
+class ParsedCacheStats:
+    hits: int = 0
+    misses: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ParsedContentCache:
+    """Parsed files of the current session keyed by (kind, normalized path), negative results are cached too.
+    Parsers run outside the lock, if two threads parse the same file the first result is kept."""
+
+    def __init__(self):
+        self._entries: dict[tuple[str, str], Any] = {}
+        self._stats: dict[str, ParsedCacheStats] = {}
+        self._lock = Lock()
+
+    def get_or_parse(self, kind: str, filepath: str, parser: Callable[[], T]) -> T:
+        key = kind, normalize_index_key(filepath)
+        with self._lock:
+            stats = self._stats.setdefault(kind, ParsedCacheStats())
+            if key in self._entries:
+                stats.hits += 1
+                return self._entries[key]
+            stats.misses += 1
+        value = parser()
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value
+                stats.entries += 1
+            return self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def stats(self) -> dict[str, ParsedCacheStats]:
+        with self._lock:
+            return {kind: ParsedCacheStats(stats.hits, stats.misses, stats.entries)
+                    for kind, stats in self._stats.items()}
+
+    def __len__(self):
+        return len(self._entries)
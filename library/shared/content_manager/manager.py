@@ -2,7 +2,10 @@ from collections import Counter
 from hashlib import md5
 from typing import Optional, TypeVar, Union
 
+from SourceIO.library.shared.content_manager.content_cache import (ContentCache, ParsedContentCache, freeze_buffer,
+                                                                   get_cache_budget)
 from SourceIO.library.shared.content_manager.detectors import detect_game
+from SourceIO.library.shared.content_manager.path_index import ContentPathIndex, get_index_cache_dir, normalize_index_key
 from SourceIO.library.shared.content_manager.provider import ContentProvider
 from SourceIO.library.shared.content_manager.providers import register_provider
 from SourceIO.library.shared.content_manager.providers.hfs_provider import HFS1ContentProvider, HFS2ContentProvider
@@ -11,8 +14,8 @@ from SourceIO.library.shared.content_manager.providers.source1_gameinfo_provider
 from SourceIO.library.shared.content_manager.providers.source2_gameinfo_provider import Source2GameInfoProvider
 from SourceIO.library.shared.content_manager.providers.vpk_provider import VPKContentProvider
 from SourceIO.library.shared.content_manager.providers.zip_content_provider import ZIPContentProvider
-from SourceIO.library.utils import Buffer, FileBuffer, TinyPath, backwalk_file_resolver
-from SourceIO.library.utils.path_utilities import get_mod_path
+from SourceIO.library.utils import Buffer, MappedFileBuffer, TinyPath, backwalk_file_resolver
+from SourceIO.library.utils.path_utilities import get_mod_path, invalidate_directory_cache
 from SourceIO.library.utils.singleton import SingletonMeta
 from SourceIO.logger import SourceLogMan
 
@@ -22,9 +25,6 @@ logger = log_manager.get_logger('ContentManager')
 AnyContentDetector = TypeVar('AnyContentDetector', bound='ContentDetector')
 AnyContentProvider = TypeVar('AnyContentProvider', bound='ContentProvider')
 
-MAX_CACHE_SIZE = 16
-
-
 def get_loose_file_fs_root(path: TinyPath):
     return get_mod_path(path)
 
@@ -42,32 +42,40 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
     def check(self, filepath: TinyPath) -> bool:
         if filepath.is_absolute():
             return filepath.exists()
-        for child in self.children:
-            if child.check(filepath):
-                return True
-        return False
+        return self._lookup_owner(filepath) is not None
 
     def get_provider_from_path(self, filepath):
         if filepath.is_absolute():
             filepath = self.get_relative_path(filepath)
-        for child in self.children:
-            if provider := child.get_provider_from_path(filepath):
-                return provider
+        if filepath is None:
+            return None
+        return self._lookup_owner(filepath)
 
     def get_steamid_from_asset(self, asset_path: TinyPath) -> ContentProvider | None:
         if asset_path.is_absolute():
             asset_path = self.get_relative_path(asset_path)
         if asset_path is None:
             return None
-        for child in self.children:
-            if provider := child.get_steamid_from_asset(asset_path):
-                return provider
+        if (owner := self._lookup_owner(asset_path)) is not None:
+            return owner.steam_id or None
+
+    def _lookup_owner(self, filepath: TinyPath) -> Optional[ContentProvider]:
+        if (entry := self._index.lookup(filepath)) is not None:
+            _, owner, _ = entry
+            return owner
+        # File may have been added to a loose folder after it was indexed
+        for leaf, owner in self._index.volatile_providers():
+            if leaf.check(filepath):
+                return owner
+        return None
 
     def __init__(self):
         super().__init__(TinyPath("."))
         self.children: list[ContentProvider] = []
         self._steam_id = -1
-        self._cache: dict[TinyPath, Buffer] = {}
+        self.cache = ContentCache(get_cache_budget())
+        self.parsed_cache = ParsedContentCache()
+        self._index = ContentPathIndex(get_index_cache_dir())
 
     def _find_steam_appid(self, path: TinyPath):
         if self._steam_id != -1:
@@ -97,7 +105,7 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
         if providers:
             for provider in providers:
                 logger.info(f"Mounted: {provider}")
-            self.children.extend(providers)
+                self.add_child(provider)
             return
         self._find_steam_appid(scan_path)
         if scan_path.suffix == '.vpk':
@@ -136,6 +144,14 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
     def add_child(self, child: ContentProvider):
         if child not in self.children:
             self.children.append(child)
+            self._index.add_provider(child)
+
+    def invalidate_index(self):
+        """Re-scans all mounted providers, use after files were added to or removed from mounted folders."""
+        self.cache.clear()
+        self.parsed_cache.clear()
+        invalidate_directory_cache()
+        self._index.invalidate()
 
     def glob(self, pattern: str):
         for child in self.children:
@@ -144,21 +160,36 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
     def find_file(self, filepath: TinyPath) -> Buffer | None:
         if filepath.is_absolute():
             if filepath.exists():
-                return FileBuffer(filepath)
+                return MappedFileBuffer(filepath)
             return None
-        if (buffer := self._cache.get(filepath, None)) is not None:
-            if not buffer.closed:
-                buffer.seek(0)
-                return buffer
+        cache_key = normalize_index_key(filepath)
+        if (buffer := self.cache.get(cache_key)) is not None:
+            return buffer
         logger.debug(f'Requesting {filepath} file')
+        if (entry := self._index.lookup(filepath, resolve_suffixes=True)) is None:
+            # File may have been added to a loose folder after it was indexed
+            file, provider = self._find_file_volatile(filepath)
+        else:
+            provider, _, locator = entry
+            if (file := provider.find_file_by_locator(locator)) is None:
+                logger.debug(f'Index entry for {filepath} in {provider} is stale, falling back to full scan')
+                file, provider = self._find_file_slow(filepath)
+        if file is not None:
+            logger.debug(f'Found in {provider}!')
+            return self.cache.put(cache_key, freeze_buffer(file))
+        return None
+
+    def _find_file_volatile(self, filepath: TinyPath) -> tuple[Buffer | None, ContentProvider | None]:
+        for leaf, _ in self._index.volatile_providers():
+            if (file := leaf.find_file(filepath)) is not None:
+                return file, leaf
+        return None, None
+
+    def _find_file_slow(self, filepath: TinyPath) -> tuple[Buffer | None, ContentProvider | None]:
         for child in self.children:
             if (file := child.find_file(filepath)) is not None:
-                logger.debug(f'Found in {child}!')
-                self._cache[filepath] = file
-                if len(self._cache) > MAX_CACHE_SIZE:
-                    self._cache.pop(next(iter(self._cache.keys())))
-                return file
-        return None
+                return file, child
+        return None, None
 
     # TODO: MAYBE DEPRECATED
     def serialize(self):
@@ -179,11 +210,11 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
             if path.endswith('.vpk'):
                 provider = VPKContentProvider(t_path)
                 if provider not in self.children:
-                    self.children.append(register_provider(provider))
+                    self.add_child(register_provider(provider))
             elif path.endswith('.pk3'):
                 provider = ZIPContentProvider(t_path)
                 if provider not in self.children:
-                    self.children.append(register_provider(provider))
+                    self.add_child(register_provider(provider))
             elif path.endswith('.txt'):
                 try:
                     provider = Source1GameInfoProvider(t_path)
@@ -191,11 +222,11 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
                     logger.exception(f"Failed to parse gameinfo for {t_path}", ex)
                     continue
                 if provider not in self.children:
-                    self.children.append(register_provider(provider))
+                    self.add_child(register_provider(provider))
             elif path.endswith('.gi'):
                 provider = Source2GameInfoProvider(t_path)
                 if provider not in self.children:
-                    self.children.append(register_provider(provider))
+                    self.add_child(register_provider(provider))
             elif path.endswith('.bsp'):
                 from ...source1.bsp.bsp_file import open_bsp
                 if t_path.is_absolute():
@@ -203,26 +234,37 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
                 else:
                     prov = self.get_content_provider_from_asset_path(t_path)
                     full_path = prov.root / t_path
-                with FileBuffer(full_path) as f:
+                with MappedFileBuffer(full_path) as f:
                     bsp = open_bsp(t_path, f, self)
                     provider = bsp.get_lump('LUMP_PAK')
                 if provider and provider not in self.children:
-                    self.children.append(register_provider(provider))
+                    self.add_child(register_provider(provider))
             elif path.endswith('.hfs'):
                 provider = HFS1ContentProvider(t_path)
                 if provider not in self.children:
-                    self.children.append(register_provider(provider))
+                    self.add_child(register_provider(provider))
             elif name == 'hfs':
                 provider = HFS2ContentProvider(t_path)
                 if provider not in self.children:
-                    self.children.append(register_provider(provider))
+                    self.add_child(register_provider(provider))
             else:
                 provider = LooseFilesContentProvider(t_path)
                 if provider not in self.children:
-                    self.children.append(register_provider(provider))
+                    self.add_child(register_provider(provider))
 
     def clean(self):
+        logger.debug(f'Content cache stats: {self.cache.stats()}')
+        for kind, stats in self.parsed_cache.stats().items():
+            logger.debug(f'Parsed {kind} cache: {stats.hit_rate:.1%} hit rate, {stats}')
         self.children.clear()
+        self.cache.clear()
+        self.parsed_cache.clear()
+        self._index.clear()
+        invalidate_directory_cache()
+        from SourceIO.library.source2.utils.ntro_reader import clear_plan_cache
+        clear_plan_cache()
+        from SourceIO.library.source1.bsp.lumps.entity_lump import clear_encoding_cache
+        clear_encoding_cache()
         self._steam_id = -1
 
     @property
@@ -0,0 +1,192 @@
+import json
+import os
+import platform
+from hashlib import md5
+from typing import Iterator, Optional
+
+from SourceIO.library.shared.content_manager.provider import ContentProvider
+from SourceIO.library.utils import TinyPath
+from SourceIO.logger import SourceLogMan
+
+log_manager = SourceLogMan()
+logger = log_manager.get_logger('ContentPathIndex')
+
+INDEX_VERSION = 1
+
+
+def get_index_cache_dir() -> TinyPath:
+    if cache_dir := os.environ.get('SOURCEIO_CACHE_DIR', None):
+        return TinyPath(cache_dir)
+    if platform.system() == "Windows":
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return TinyPath(base) / 'SourceIO' / 'path_index'
+
+
+def normalize_index_key(filepath: str) -> str:
+    return str(filepath).replace('\\', '/').lower().lstrip('/')
+
+
+def _iter_key_suffixes(key: str) -> Iterator[str]:
+    # Mirrors pop_path_back in backwalk_file_resolver: "hl2/materials/a.vmt" -> "materials/a.vmt" -> "a.vmt"
+    yield key
+    while '/' in key:
+        key = key[key.index('/') + 1:]
+        yield key
+
+
+class ContentPathIndex:
+    """Maps lowercased relative paths to the leaf provider that serves them.
+
+    Providers that can enumerate their content (see ContentProvider.index_files) are indexed once when mounted,
+    later providers never override earlier ones, so lookup order matches ContentManager child order.
+    Providers that cannot be enumerated are probed directly, but only the ones mounted before the indexed winner.
+    Files added to volatile providers after indexing are not in the index, callers probe volatile_providers on a miss.
+    Hits in volatile providers are checked on disk, removed files are evicted in favour of the next provider.
+    """
+
+    def __init__(self, cache_dir: Optional[TinyPath] = None):
+        self.cache_dir = cache_dir
+        self._slots: list[tuple[ContentProvider, ContentProvider]] = []
+        self._slot_ids: dict[int, int] = {}
+        self._unindexed_slots: list[int] = []
+        self._volatile_slots: list[int] = []
+        self._entries: dict[str, tuple[int, str]] = {}
+        # Entries of providers that resolve path suffixes only, so a provider without it can not shadow them
+        self._suffix_entries: dict[str, tuple[int, str]] = {}
+        # Later entries hidden by a volatile provider, they take over when its file is gone
+        self._shadowed: dict[str, list[tuple[int, str]]] = {}
+
+    def clear(self):
+        self._slots.clear()
+        self._slot_ids.clear()
+        self._unindexed_slots.clear()
+        self._volatile_slots.clear()
+        self._entries.clear()
+        self._suffix_entries.clear()
+        self._shadowed.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add_provider(self, provider: ContentProvider):
+        for leaf in provider.leaf_providers():
+            if id(leaf) in self._slot_ids:
+                continue
+            slot = len(self._slots)
+            self._slots.append((leaf, provider))
+            self._slot_ids[id(leaf)] = slot
+            files = self._load_or_build(leaf)
+            if files is None:
+                self._unindexed_slots.append(slot)
+                continue
+            if leaf.index_volatile:
+                self._volatile_slots.append(slot)
+            entries = self._entries
+            shadowed = self._shadowed
+            volatile_slots = set(self._volatile_slots)
+            for key, locator in files.items():
+                if (existing := entries.get(key, None)) is None:
+                    entries[key] = (slot, locator)
+                elif existing[0] in volatile_slots:
+                    shadowed.setdefault(key, []).append((slot, locator))
+            if leaf.resolves_path_suffixes:
+                suffix_entries = self._suffix_entries
+                for key, locator in files.items():
+                    if key not in suffix_entries:
+                        suffix_entries[key] = (slot, locator)
+
+    def volatile_providers(self) -> list[tuple[ContentProvider, ContentProvider]]:
+        """Returns (leaf provider, owning child provider) of indexed providers that may have gained files since."""
+        return [self._slots[slot] for slot in self._volatile_slots]
+
+    def lookup(self, filepath: TinyPath, resolve_suffixes: bool = False
+               ) -> Optional[tuple[ContentProvider, ContentProvider, str]]:
+        """Returns (leaf provider, owning child provider, locator) or None when nothing serves the file.
+        With resolve_suffixes providers that resolve path suffixes also match filepath without leading components,
+        same as their find_file does."""
+        key = normalize_index_key(filepath)
+        hit = self._get_entry(self._entries, key)
+        if resolve_suffixes:
+            suffixes = _iter_key_suffixes(key)
+            next(suffixes)
+            for suffix in suffixes:
+                suffix_hit = self._get_entry(self._suffix_entries, suffix)
+                if suffix_hit is not None and (hit is None or suffix_hit[0] < hit[0]):
+                    hit = suffix_hit
+        indexed_slot = hit[0] if hit is not None else len(self._slots)
+        for slot in self._unindexed_slots:
+            if slot >= indexed_slot:
+                break
+            leaf, owner = self._slots[slot]
+            if leaf.check(filepath):
+                return leaf, owner, str(filepath)
+        if hit is None:
+            return None
+        leaf, owner = self._slots[hit[0]]
+        return leaf, owner, hit[1]
+
+    def _get_entry(self, entries: dict[str, tuple[int, str]], key: str) -> Optional[tuple[int, str]]:
+        while (hit := entries.get(key, None)) is not None:
+            leaf = self._slots[hit[0]][0]
+            if not leaf.index_volatile or leaf.check(TinyPath(hit[1])):
+                return hit
+            # File was removed from a loose folder after it was indexed
+            shadowed = self._shadowed.get(key, None) if entries is self._entries else None
+            if shadowed:
+                entries[key] = shadowed.pop(0)
+            else:
+                del entries[key]
+        return None
+
+    def invalidate(self):
+        """Drops in-memory and on-disk entries for all mounted providers and re-indexes them."""
+        owners = []
+        for _, owner in self._slots:
+            if owner not in owners:
+                owners.append(owner)
+        for leaf, _ in self._slots:
+            if (cache_file := self._cache_file(leaf)) is not None and cache_file.exists():
+                try:
+                    os.remove(cache_file)
+                except OSError as ex:
+                    logger.warn(f"Failed to remove stale index {cache_file}: {ex}")
+        self.clear()
+        for owner in owners:
+            self.add_provider(owner)
+
+    def _cache_file(self, provider: ContentProvider) -> Optional[TinyPath]:
+        if self.cache_dir is None or not provider.index_persistent:
+            return None
+        name = md5(f"{provider.__class__.__name__}:{provider.filepath}".encode("utf8")).hexdigest()
+        return self.cache_dir / f"{name}.json"
+
+    def _load_or_build(self, provider: ContentProvider) -> Optional[dict[str, str]]:
+        cache_file = self._cache_file(provider)
+        fingerprint = provider.index_fingerprint() if cache_file is not None else None
+        if cache_file is not None and fingerprint is not None and cache_file.exists():
+            try:
+                with cache_file.open('r', encoding='utf8') as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION and data.get("fingerprint") == fingerprint:
+                    logger.debug(f"Loaded path index for {provider}")
+                    return data["files"]
+            except (OSError, ValueError, KeyError) as ex:
+                logger.warn(f"Failed to load path index for {provider}: {ex}")
+
+        files = provider.index_files()
+        if files is None:
+            return None
+        files = {normalize_index_key(key): locator for key, locator in files}
+        logger.debug(f"Indexed {len(files)} files in {provider}")
+        if cache_file is not None and fingerprint is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_file = TinyPath(cache_file + '.tmp')
+                with tmp_file.open('w', encoding='utf8') as f:
+                    json.dump({"version": INDEX_VERSION, "fingerprint": fingerprint, "files": files}, f)
+                os.replace(tmp_file, cache_file)
+            except OSError as ex:
+                logger.warn(f"Failed to save path index for {provider}: {ex}")
+        return files
@@ -1,8 +1,9 @@
+import os
 from abc import abstractmethod
-from typing import Iterator, Optional
+from typing import Iterable, Iterator, Optional
 
 from SourceIO.library.shared.app_id import SteamAppId
-from SourceIO.library.utils import Buffer, FileBuffer, TinyPath, corrected_path
+from SourceIO.library.utils import Buffer, FileBuffer, MappedFileBuffer, TinyPath, corrected_path
 from SourceIO.logger import SourceLogMan
 
 log_manager = SourceLogMan()
@@ -12,7 +13,7 @@ logger = log_manager.get_logger('ContentManager')
 def find_file_generic(root: TinyPath, filepath: TinyPath) -> Buffer | None:
     filepath = corrected_path(root / filepath)
     if filepath.exists():
-        return FileBuffer(filepath)
+        return MappedFileBuffer(filepath)
     else:
         return None
 
@@ -42,6 +43,13 @@ def is_relative_to(path: TinyPath, *other):
 
 
 class ContentProvider:
+    # Whether ContentPathIndex should persist this provider's file listing on disk
+    index_persistent = False
+    # Whether files can appear after the provider was indexed, index misses then probe it directly
+    index_volatile = False
+    # Whether find_file also matches paths with leading components dropped, see backwalk_file_resolver
+    resolves_path_suffixes = False
+
     @classmethod
     def class_name(cls):
         return cls.__name__
@@ -76,6 +84,24 @@ class ContentProvider:
     def get_steamid_from_asset(self, asset_path: TinyPath) -> SteamAppId | None:
         ...
 
+    def leaf_providers(self) -> list['ContentProvider']:
+        return [self]
+
+    def index_files(self) -> Optional[Iterable[tuple[str, str]]]:
+        """Enumerates (relative path, locator) pairs of every file this provider serves.
+        Returns None when the content cannot be listed cheaply, such provider is probed on every lookup instead."""
+        return None
+
+    def index_fingerprint(self):
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return None
+        return [str(self.filepath), stat.st_mtime_ns, stat.st_size]
+
+    def find_file_by_locator(self, locator: str) -> Buffer | None:
+        return self.find_file(TinyPath(locator))
+
     @property
     @abstractmethod
     def root(self) -> TinyPath:
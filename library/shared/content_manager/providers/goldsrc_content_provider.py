@@ -24,6 +24,10 @@ class GoldSrcContentProvider(LooseFilesContentProvider):
             return None
         return find_file_generic(self.root, filepath)
 
+    def index_files(self):
+        # use_hd can be toggled between imports, so this provider is always probed directly
+        return None
+
 
 class GoldSrcWADContentProvider(ContentProvider):
     def __init__(self, filepath: TinyPath, steamapp_id: SteamAppId = SteamAppId.UNKNOWN):
@@ -41,6 +41,9 @@ class HFS2ContentProvider(ContentProvider):
         if file:
             return file
 
+    def index_files(self) -> Iterator[tuple[str, str]]:
+        return ((file_name, file_name) for file_name in self.hfs_archive.files.keys())
+
     def glob(self, pattern: str) -> Iterator[tuple[TinyPath, Buffer]]:
         for file_name in self.hfs_archive.files.keys():
             if fnmatch.fnmatch(file_name, pattern):
@@ -81,6 +84,9 @@ class HFS1ContentProvider(ContentProvider):
         if file:
             return file
 
+    def index_files(self) -> Iterator[tuple[str, str]]:
+        return ((file_name, file_name) for file_name in self.hfs_archive.entries.keys())
+
     def glob(self, pattern: str):
         for file_name in self.hfs_archive.entries.keys():
             if fnmatch.fnmatch(file_name, pattern):
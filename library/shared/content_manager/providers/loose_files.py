@@ -1,16 +1,22 @@
+import os
 from typing import Iterator, Optional, Union
 
 from SourceIO.library.shared.content_manager.provider import ContentProvider, glob_generic
-from SourceIO.library.utils import Buffer, FileBuffer, TinyPath, backwalk_file_resolver, corrected_path
+from SourceIO.library.utils import Buffer, MappedFileBuffer, TinyPath, backwalk_file_resolver, corrected_path
 from SourceIO.library.shared.app_id import SteamAppId
 
+MAX_INDEXED_FILES = 500_000
+
 
 class LooseFilesContentProvider(ContentProvider):
+    index_persistent = True
+    index_volatile = True
+    resolves_path_suffixes = True
+
     def check(self, filepath: TinyPath) -> bool:
-        filepath = corrected_path(filepath)
         if filepath.is_absolute():
-            return filepath.exists()
-        return (self.root / filepath).exists()
+            return corrected_path(filepath).exists()
+        return corrected_path(self.root / filepath).exists()
 
     def get_relative_path(self, filepath: TinyPath):
         filepath = corrected_path(filepath)
@@ -25,7 +31,6 @@ class LooseFilesContentProvider(ContentProvider):
         return None
 
     def get_steamid_from_asset(self, asset_path: TinyPath) -> SteamAppId | None:
-        asset_path = corrected_path(asset_path)
         if self.check(asset_path):
             return self.steam_id
         return None
@@ -45,7 +50,38 @@ class LooseFilesContentProvider(ContentProvider):
     def find_file(self, filepath: Union[str, TinyPath]) -> Optional[Buffer]:
         file = backwalk_file_resolver(self.filepath, filepath)
         if file and file.is_file():
-            return FileBuffer(file)
+            return MappedFileBuffer(file)
+
+    def find_file_by_locator(self, locator: str) -> Optional[Buffer]:
+        file = self.root / locator
+        if file.is_file():
+            return MappedFileBuffer(file)
+
+    def index_files(self) -> Optional[list[tuple[str, str]]]:
+        root = str(self.root)
+        if not os.path.isdir(root):
+            return None
+        files = []
+        for dirpath, _, filenames in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root).replace("\\", "/")
+            prefix = "" if rel_dir == "." else rel_dir + "/"
+            files.extend((prefix + filename, prefix + filename) for filename in filenames)
+            if len(files) > MAX_INDEXED_FILES:
+                return None
+        return files
+
+    def index_fingerprint(self):
+        # Top level directories (materials, models, maps...) change mtime when assets are added to them
+        root = str(self.root)
+        try:
+            fingerprint = [root, os.stat(root).st_mtime_ns]
+            with os.scandir(root) as it:
+                for entry in sorted(it, key=lambda e: e.name):
+                    if entry.is_dir():
+                        fingerprint.append([entry.name, entry.stat().st_mtime_ns])
+        except OSError:
+            return None
+        return fingerprint
 
     def glob(self, pattern: str) -> Iterator[tuple[TinyPath, Buffer]]:
         yield from glob_generic(self.root, pattern)
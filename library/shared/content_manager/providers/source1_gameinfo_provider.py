@@ -84,6 +84,12 @@ class Source1GameInfoProvider(ContentProvider):
         if self.check(asset_path):
             return self.steam_id
 
+    def leaf_providers(self) -> list[ContentProvider]:
+        providers = []
+        for mount in self.mount:
+            providers.extend(mount.leaf_providers())
+        return providers
+
     def find_file(self, filepath: TinyPath) -> Optional[Buffer]:
         for mount in self.mount:
             file = mount.find_file(filepath)
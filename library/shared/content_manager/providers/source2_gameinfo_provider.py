@@ -83,6 +83,12 @@ class Source2GameInfoProvider(ContentProvider):
     def name(self) -> str:
         return self.filesystem.get("game", self.root.stem)
 
+    def leaf_providers(self) -> list[ContentProvider]:
+        providers = []
+        for mount in self.mount:
+            providers.extend(mount.leaf_providers())
+        return providers
+
     def find_file(self, filepath: TinyPath) -> Optional[Buffer]:
         for mount in self.mount:
             file = mount.find_file(filepath)
@@ -1,3 +1,4 @@
+import struct
 from typing import Iterator, Optional
 
 from SourceIO.library.shared.app_id import SteamAppId
@@ -9,8 +10,54 @@ from SourceIO.logger import SourceLogMan
 log_manager = SourceLogMan()
 logger = log_manager.get_logger('VpkProvider')
 
+VPK_SIGNATURE = 0x55AA1234
+_VPK_HEADER = struct.Struct('<3I')
+# CRC, preload size, archive index, entry offset, entry length, terminator
+_VPK_ENTRY = struct.Struct('<IHHIIH')
+
+
+def read_vpk_directory(filepath: TinyPath) -> Optional[list[str]]:
+    """Lists files of a VPK v1/v2 directory tree, returns None for other formats (Respawn VPKs and alike)."""
+    with open(filepath, 'rb') as f:
+        header = f.read(_VPK_HEADER.size)
+        if len(header) < _VPK_HEADER.size:
+            return None
+        signature, version, tree_size = _VPK_HEADER.unpack(header)
+        if signature != VPK_SIGNATURE or version not in (1, 2):
+            return None
+        if version == 2:
+            f.seek(16, 1)
+        tree = f.read(tree_size)
+
+    files = []
+    offset = 0
+
+    def read_string() -> str:
+        nonlocal offset
+        end = tree.index(b'\x00', offset)
+        value = tree[offset:end].decode('utf8', 'replace')
+        offset = end + 1
+        return value
+
+    # Tree is grouped by extension, then by directory, " " stands for an empty one
+    try:
+        while extension := read_string():
+            suffix = '' if extension == ' ' else '.' + extension
+            while directory := read_string():
+                prefix = '' if directory == ' ' else directory.strip('/') + '/'
+                while filename := read_string():
+                    preload_size = _VPK_ENTRY.unpack_from(tree, offset)[1]
+                    offset += _VPK_ENTRY.size + preload_size
+                    files.append(prefix + ('' if filename == ' ' else filename) + suffix)
+    except (ValueError, struct.error):
+        logger.warn(f'Malformed directory tree in {filepath}')
+        return None
+    return files
+
 
 class VPKContentProvider(ContentProvider):
+    index_persistent = True
+
     def __init__(self, filepath: TinyPath, override_steamid=SteamAppId.UNKNOWN):
         super().__init__(filepath)
         self._override_steamid = override_steamid
@@ -39,6 +86,16 @@ class VPKContentProvider(ContentProvider):
         self.vpk_archive = Vpk.from_path(self.filepath)
         self._initialized = True
 
+    def index_files(self) -> Optional[list[tuple[str, str]]]:
+        try:
+            files = read_vpk_directory(self.filepath)
+        except OSError as ex:
+            logger.warn(f'Failed to read directory of {self.filepath}: {ex}')
+            return None
+        if files is None:
+            return None
+        return [(file, file) for file in files]
+
     def glob(self, pattern: str) -> Iterator[tuple[TinyPath, Buffer]]:
         self._init()
         for key, data in self.vpk_archive.glob(pattern):
@@ -30,12 +30,21 @@ class ZIPContentProvider(ContentProvider):
 
     def find_file(self, filepath: TinyPath) -> Optional[Buffer]:
         if filepath.as_posix().lower() in self._cache:
-            return MemoryBuffer(self._zip_file.read(self._cache[filepath.as_posix().lower()]))
+            return self._read_member(self._cache[filepath.as_posix().lower()])
+
+    def find_file_by_locator(self, locator: str) -> Optional[Buffer]:
+        return self._read_member(locator)
+
+    def index_files(self) -> Iterator[tuple[str, str]]:
+        return self._cache.items()
 
     def glob(self, pattern: str) -> Iterator[tuple[TinyPath, Buffer]]:
         matches = fnmatch.filter(self._cache.keys(), pattern)
         for match in matches:
-            yield TinyPath(match), MemoryBuffer(self._zip_file.read(self._cache[match]))
+            yield TinyPath(match), self._read_member(self._cache[match])
+
+    def _read_member(self, name: str) -> Buffer:
+        return MemoryBuffer(self._zip_file.read(name))
 
     @property
     def root(self) -> TinyPath:
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from SourceIO.library.source1.bsp.datatypes.texture_data import TextureData
+from SourceIO.library.source1.bsp.datatypes.texture_info import TextureInfo
+from SourceIO.library.utils.file_utils import StructArray
+
+
+@dataclass(slots=True)
+class BrushMesh:
+    """Flat polygon mesh of a brush model, arrays can be passed to foreach_set as is.
+
+    vertex_ids are BSP vertex ids of mesh vertices, tex_info_ids hold texture info of every polygon.
+    """
+    vertex_ids: np.ndarray
+    positions: np.ndarray
+    loop_starts: np.ndarray
+    loop_totals: np.ndarray
+    loop_vertices: np.ndarray
+    uvs: np.ndarray
+    lightmap_uvs: np.ndarray
+    tex_info_ids: np.ndarray
+
+    @property
+    def polygon_count(self):
+        return len(self.loop_starts)
+
+
+def get_texture_info_arrays(texture_info: Sequence[TextureInfo], texture_data: Sequence[TextureData]
+                            ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns texture vectors (N, 2, 4), lightmap vectors (N, 2, 4) and texture sizes (N, 2) of every texture info.
+    Missing texture sizes fall back to 512."""
+    if isinstance(texture_info, StructArray):
+        records = texture_info.records
+        texture_vectors = records['texture_vectors'].astype(np.float64)
+        lightmap_vectors = records['lightmap_vectors'].astype(np.float64)
+        texture_data_ids = records['texture_data_id']
+    else:
+        texture_vectors = np.array([info.texture_vectors for info in texture_info], np.float64).reshape((-1, 2, 4))
+        lightmap_vectors = np.array([info.lightmap_vectors for info in texture_info], np.float64).reshape((-1, 2, 4))
+        texture_data_ids = np.array([info.texture_data_id for info in texture_info], np.int64)
+    sizes = np.array([(data.width or 512, data.height or 512) for data in texture_data], np.float64).reshape((-1, 2))
+    return texture_vectors, lightmap_vectors, sizes[texture_data_ids]
+
+
+def _project(positions: np.ndarray, vectors: np.ndarray, sizes: np.ndarray):
+    uvs = np.einsum('nj,nij->ni', positions, vectors[:, :, :3]) + vectors[:, :, 3]
+    uvs /= sizes
+    uvs[:, 1] = 1 - uvs[:, 1]
+    return uvs
+
+
+def build_brush_mesh(face_columns: np.ndarray, surf_edges: np.ndarray, edges: np.ndarray, vertices: np.ndarray,
+                     texture_info: tuple[np.ndarray, np.ndarray, np.ndarray],
+                     skip_tex_info_ids: Iterable[int] = ()) -> BrushMesh:
+    """Builds polygons of faces from face_columns (see get_face_columns), displacement faces are skipped.
+
+    Same topology as walking the faces one by one: repeated vertices of a face are dropped and winding is reversed.
+    Only vertices referenced by polygons end up in the mesh, in BSP vertex order.
+    """
+    texture_vectors, lightmap_vectors, texture_sizes = texture_info
+    keep = face_columns['disp_info_id'] == -1
+    if skip_tex_info_ids:
+        keep &= ~np.isin(face_columns['tex_info_id'], np.fromiter(skip_tex_info_ids, np.int64))
+    face_columns = face_columns[keep]
+    tex_info_ids = face_columns['tex_info_id'].astype(np.int64)
+    edge_counts = face_columns['edge_count'].astype(np.int64)
+    face_count = len(face_columns)
+    total = int(edge_counts.sum())
+
+    # Index of every used surfedge: first_edge of owning face + position inside that face
+    face_ids = np.repeat(np.arange(face_count, dtype=np.int64), edge_counts)
+    face_starts = np.cumsum(edge_counts) - edge_counts
+    surf_edge_ids = face_columns['first_edge'].astype(np.int64)[face_ids] - face_starts[face_ids] + np.arange(total)
+    used_surf_edges = surf_edges[surf_edge_ids]
+    reverse = (used_surf_edges <= 0).astype(np.intp)
+    loop_vertex_ids = edges[np.abs(used_surf_edges), reverse].astype(np.int64)
+
+    # Drop repeated vertices inside a face, first occurrence wins
+    _, first = np.unique(face_ids * len(vertices) + loop_vertex_ids, return_index=True)
+    if len(first) != total:
+        first.sort()
+        face_ids = face_ids[first]
+        loop_vertex_ids = loop_vertex_ids[first]
+        edge_counts = np.bincount(face_ids, minlength=face_count)
+        face_starts = np.cumsum(edge_counts) - edge_counts
+        total = len(first)
+
+    # Reverse winding of every face
+    loop_ends = face_starts + edge_counts - 1
+    order = loop_ends[face_ids] - (np.arange(total) - face_starts[face_ids])
+    loop_vertex_ids = loop_vertex_ids[order]
+
+    used = np.zeros(len(vertices), np.bool_)
+    used[loop_vertex_ids] = True
+    vertex_ids = np.flatnonzero(used)
+    remap = np.zeros(len(vertices), np.uint32)
+    remap[vertex_ids] = np.arange(len(vertex_ids), dtype=np.uint32)
+
+    loop_positions = vertices[loop_vertex_ids].astype(np.float64)
+    loop_tex_info = tex_info_ids[face_ids]
+    sizes = texture_sizes[loop_tex_info]
+    uvs = _project(loop_positions, texture_vectors[loop_tex_info], sizes)
+    lightmap_uvs = _project(loop_positions, lightmap_vectors[loop_tex_info], sizes)
+
+    return BrushMesh(vertex_ids, vertices[vertex_ids],
+                     face_starts.astype(np.uint32), edge_counts.astype(np.uint32),
+                     remap[loop_vertex_ids],
+                     uvs.astype(np.float32), lightmap_uvs.astype(np.float32), tex_info_ids)
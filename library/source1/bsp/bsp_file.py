@@ -1,9 +1,11 @@
-from typing import Optional, Type
+from concurrent.futures import Executor, ThreadPoolExecutor
+from threading import Lock, RLock
+from typing import Iterable, Optional, Type
 
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.shared.content_manager import ContentManager
-from SourceIO.library.source1.bsp.lump import RavenLumpInfo, LumpTag, LumpInfo, Lump
-from SourceIO.library.utils import Buffer, FileBuffer
+from SourceIO.library.source1.bsp.lump import RavenLumpInfo, LumpInfo, Lump, resolve_lump_class
+from SourceIO.library.utils import Buffer, MappedFileBuffer
 from SourceIO.library.utils.tiny_path import TinyPath
 from SourceIO.logger import SourceLogMan
 
@@ -37,6 +39,9 @@ class BSPFile:
         self.revision = 0
         self.content_manager = content_manager
         self.steam_app_id = content_manager.get_steamid_from_asset(filepath) or SteamAppId.UNKNOWN
+        self._lumps_lock = Lock()
+        self._lump_locks: dict[str, RLock] = {}
+        self._buffer_lock = Lock()
 
     @classmethod
     def from_buffer(cls, filepath: TinyPath, buffer: Buffer, content_manager: ContentManager,
@@ -59,56 +64,60 @@ class BSPFile:
         return self
 
     def get_lump(self, lump_name):
-        if lump_name in self.lumps:
-            return self.lumps[lump_name]
-        else:
-            matches: list[tuple[Type[Lump], LumpTag]] = []
-            for sub in Lump.all_subclasses():
-                sub: Type[Lump]
-                for dep in sub.tags:
-                    if dep.lump_name == lump_name:
-                        if dep.bsp_version is not None and dep.bsp_version > self.version:
-                            continue
-                        if dep.steam_id is not None and dep.steam_id != self.steam_app_id:
-                            continue
-                        if dep.lump_version is not None and dep.lump_version != self.lumps_info[dep.lump_id].version:
-                            continue
-                        matches.append((sub, dep))
-            best_matches = []
-            for match_sub, match_dep in matches:
-                if match_dep.lump_id >= len(self.lumps_info):
-                    continue
-                lump = self.lumps_info[match_dep.lump_id]
-                rank = 0
-                if match_dep.bsp_version is not None and match_dep.bsp_version == self.version:
-                    rank += 2
-                elif match_dep.bsp_version is not None and match_dep.bsp_version > self.version:
-                    rank += 1
-                if match_dep.steam_id is not None and match_dep.steam_id == self.steam_app_id:
-                    rank += 1
-                if match_dep.lump_version is not None and match_dep.lump_version == lump.version:
-                    rank += 1
-                best_matches.append((rank, match_sub, match_dep))
-            if not best_matches:
-                return
-            best_matches = list(sorted(best_matches, key=lambda a: a[0]))
-            _, sub, dep = best_matches[-1]
-
-            parsed_lump = self.parse_lump(sub, dep.lump_id, dep.lump_name)
-            self.lumps[lump_name] = parsed_lump
+        if (lump := self.lumps.get(lump_name, None)) is not None:
+            return lump
+        with self._lumps_lock:
+            lump_lock = self._lump_locks.setdefault(lump_name, RLock())
+        # Per lump lock, so concurrent requests for the same lump parse it only once
+        with lump_lock:
+            if lump_name in self.lumps:
+                return self.lumps[lump_name]
+            resolved = self._resolve_lump_class(lump_name)
+            if resolved is None:
+                return None
+            sub, lump_id = resolved
+            parsed_lump = self.parse_lump(sub, lump_id, lump_name)
+            with self._lumps_lock:
+                self.lumps[lump_name] = parsed_lump
             return parsed_lump
 
+    def prefetch(self, lump_names: Iterable[str], executor: Optional[Executor] = None,
+                 max_workers: Optional[int] = None) -> dict[str, Optional[Lump]]:
+        """Decompresses and parses lumps concurrently, later get_lump calls return them from cache.
+        LZMA decompression and numpy based parsing release the GIL, so independent lumps overlap on a thread pool."""
+        lump_names = [name for name in dict.fromkeys(lump_names) if name not in self.lumps]
+        if not lump_names:
+            return {}
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="BSPLump") as pool:
+                return self.prefetch(lump_names, pool)
+        futures = {name: executor.submit(self.get_lump, name) for name in lump_names}
+        lumps = {}
+        for name, future in futures.items():
+            try:
+                lumps[name] = future.result()
+            except Exception as e:
+                # Leave it to the get_lump call of whoever actually needs this lump to fail
+                logger.exception(f"Failed to prefetch {name}", e)
+        return lumps
+
+    def _resolve_lump_class(self, lump_name) -> Optional[tuple[Type[Lump], int]]:
+        return resolve_lump_class(lump_name, self.version, self.steam_app_id, self.lumps_info)
+
     def _get_lump_buffer(self, lump_id: int, lump_info: LumpInfo) -> Buffer:
         base_path = self.filepath.parent
         lump_path = base_path / f'{self.filepath.name}.{lump_id:04x}.bsp_lump'
 
         if lump_path.exists():
-            return FileBuffer(lump_path)
+            return MappedFileBuffer(lump_path)
 
+        # Slicing a file backed buffer seeks it, so it must not happen on two threads at once
+        with self._buffer_lock:
+            lump_buffer = self.buffer.slice(lump_info.offset, lump_info.size)
         if not lump_info.compressed:
-            return self.buffer.slice(lump_info.offset, lump_info.size)
+            return lump_buffer
         else:
-            buffer = Lump.decompress_lump(self.buffer.slice(lump_info.offset, lump_info.size))
+            buffer = Lump.decompress_lump(lump_buffer)
             assert buffer.size() == lump_info.decompressed_size
             return buffer
 
@@ -116,13 +125,14 @@ class BSPFile:
         base_path = self.filepath.parent
         lump_path = base_path / f'{self.filepath.stem}_l_{lump_id}.lmp'
         if lump_path.exists():
-            buffer = FileBuffer(lump_path)
+            buffer = MappedFileBuffer(lump_path)
             lump_info = LumpInfo.from_buffer(buffer, lump_id, self.is_l4d2)
             self.lumps_info[lump_id] = lump_info
             buffer.seek(lump_info.offset)
 
             parsed_lump = lump_class(lump_info).parse(buffer, self)
-            self.lumps[lump_id] = parsed_lump
+            with self._lumps_lock:
+                self.lumps[lump_id] = parsed_lump
             return parsed_lump
 
         if self.lumps_info[lump_id].size != 0:
@@ -130,7 +140,8 @@ class BSPFile:
             buffer = self._get_lump_buffer(lump_id, lump_info)
 
             parsed_lump = lump_class(lump_info).parse(buffer, self)
-            self.lumps[lump_id] = parsed_lump
+            with self._lumps_lock:
+                self.lumps[lump_id] = parsed_lump
             return parsed_lump
 
 
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
 from SourceIO.library.utils.file_utils import Buffer
 
@@ -10,6 +12,12 @@ class RavenBrush:
     side_count: int
     shader_id: int
 
+    dtypes = {None: np.dtype([('side_offset', '<i4'), ('side_count', '<i4'), ('shader_id', '<i4')])}
+
+    @classmethod
+    def from_record(cls, values: tuple, version: int):
+        return cls(*values)
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: BSPFile):
         return cls(*buffer.read_fmt("3i"))
@@ -21,6 +29,12 @@ class RavenBrushSide:
     shader_id: int
     face_id: int
 
+    dtypes = {None: np.dtype([('plane_id', '<i4'), ('shader_id', '<i4'), ('face_id', '<i4')])}
+
+    @classmethod
+    def from_record(cls, values: tuple, version: int):
+        return cls(*values)
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: BSPFile):
         return cls(*buffer.read_fmt("3i"))
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from enum import IntEnum
 
+import numpy as np
+
 from SourceIO.library.shared.types import Vector2, Vector3
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
 from SourceIO.library.utils.file_utils import Buffer
@@ -26,6 +28,38 @@ class Face:
     first_prim_id: int
     smoothing_groups: int
 
+    dtypes = {
+        2: np.dtype([
+            ('plane_index', '<u4'), ('side', '<u2'), ('on_node', '<u2'),
+            ('first_edge', '<u4'), ('edge_count', '<u4'), ('tex_info_id', '<u4'), ('disp_info_id', '<i4'),
+            ('surface_fog_volume_id', '<u4'), ('styles', 'u1', (4,)), ('light_offset', '<i4'), ('area', '<f4'),
+            ('lightmap_texture_mins_in_luxels', '<i4', (2,)), ('lightmap_texture_size_in_luxels', '<i4', (2,)),
+            ('orig_face', '<i4'), ('prim_count', '<u4'), ('first_prim_id', '<u4'), ('smoothing_groups', '<u4'),
+        ]),
+        None: np.dtype([
+            ('plane_index', '<u2'), ('side', 'u1'), ('on_node', 'u1'),
+            ('first_edge', '<u4'), ('edge_count', '<i2'), ('tex_info_id', '<i2'), ('disp_info_id', '<i2'),
+            ('surface_fog_volume_id', '<i2'), ('styles', 'i1', (4,)), ('light_offset', '<i4'), ('area', '<f4'),
+            ('lightmap_texture_mins_in_luxels', '<i4', (2,)), ('lightmap_texture_size_in_luxels', '<i4', (2,)),
+            ('orig_face', '<i4'), ('prim_count', '<u2'), ('first_prim_id', '<u2'), ('smoothing_groups', '<i4'),
+        ]),
+    }
+
+    @classmethod
+    def from_record(cls, values: tuple, version: int):
+        (plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id, surface_fog_volume_id,
+         styles, light_offset, area, lightmap_texture_mins_in_luxels, lightmap_texture_size_in_luxels,
+         orig_face, prim_count, first_prim_id, smoothing_groups) = values
+        if version == 2:
+            styles = tuple(styles.tolist())
+            prim_count = (prim_count >> 1) & 0x7FFFFFFF
+        else:
+            styles = styles.tolist()
+        return cls(plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id,
+                   surface_fog_volume_id, styles, light_offset, area,
+                   tuple(lightmap_texture_mins_in_luxels.tolist()), tuple(lightmap_texture_size_in_luxels.tolist()),
+                   orig_face, prim_count, first_prim_id, smoothing_groups)
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: BSPFile):
         if version == 2:
@@ -69,6 +103,26 @@ class Face:
 
 
 class VFace1(Face):
+    dtypes = {
+        None: np.dtype([
+            ('plane_index', '<u4'), ('side', 'u1'), ('on_node', 'u1'), ('unk', '<u2'),
+            ('first_edge', '<u4'), ('edge_count', '<u4'), ('tex_info_id', '<u4'), ('disp_info_id', '<u4'),
+            ('surface_fog_volume_id', '<u4'), ('styles', 'i1', (4,)), ('light_offset', '<i4'), ('area', '<f4'),
+            ('lightmap_texture_mins_in_luxels', '<i4', (2,)), ('lightmap_texture_size_in_luxels', '<i4', (2,)),
+            ('orig_face', '<u4'), ('prim_count', '<u4'), ('first_prim_id', '<u4'), ('smoothing_groups', '<u4'),
+        ])
+    }
+
+    @classmethod
+    def from_record(cls, values: tuple, version: int):
+        (plane_index, side, on_node, _, first_edge, edge_count, tex_info_id, disp_info_id, surface_fog_volume_id,
+         styles, light_offset, area, lightmap_texture_mins_in_luxels, lightmap_texture_size_in_luxels,
+         orig_face, prim_count, first_prim_id, smoothing_groups) = values
+        return cls(plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id,
+                   surface_fog_volume_id, styles.tolist(), light_offset, area,
+                   tuple(lightmap_texture_mins_in_luxels.tolist()), tuple(lightmap_texture_size_in_luxels.tolist()),
+                   orig_face, prim_count, first_prim_id, smoothing_groups)
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: BSPFile):
         (plane_index, side, on_node, unk, first_edge, edge_count, tex_info_id, disp_info_id, surface_fog_volume_id,
@@ -84,6 +138,28 @@ class VFace1(Face):
 
 
 class VFace2(VFace1):
+    # Extra int after styles ends up as fifth style entry, same as in from_buffer
+    dtypes = {
+        None: np.dtype([
+            ('plane_index', '<u4'), ('side', 'u1'), ('on_node', 'u1'), ('unk', '<u2'),
+            ('first_edge', '<u4'), ('edge_count', '<u4'), ('tex_info_id', '<u4'), ('disp_info_id', '<u4'),
+            ('surface_fog_volume_id', '<u4'), ('styles', 'i1', (4,)), ('style_extra', '<i4'),
+            ('light_offset', '<i4'), ('area', '<f4'),
+            ('lightmap_texture_mins_in_luxels', '<i4', (2,)), ('lightmap_texture_size_in_luxels', '<i4', (2,)),
+            ('orig_face', '<u4'), ('prim_count', '<u4'), ('first_prim_id', '<u4'), ('smoothing_groups', '<u4'),
+        ])
+    }
+
+    @classmethod
+    def from_record(cls, values: tuple, version: int):
+        (plane_index, side, on_node, _, first_edge, edge_count, tex_info_id, disp_info_id, surface_fog_volume_id,
+         styles, style_extra, light_offset, area, lightmap_texture_mins_in_luxels, lightmap_texture_size_in_luxels,
+         orig_face, prim_count, first_prim_id, smoothing_groups) = values
+        return cls(plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id,
+                   surface_fog_volume_id, styles.tolist() + [style_extra], light_offset, area,
+                   tuple(lightmap_texture_mins_in_luxels.tolist()), tuple(lightmap_texture_size_in_luxels.tolist()),
+                   orig_face, prim_count, first_prim_id, smoothing_groups)
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: BSPFile):
         (plane_index, side, on_node, unk, first_edge, edge_count, tex_info_id, disp_info_id, surface_fog_volume_id,
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 from SourceIO.library.shared.types import Vector3
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
 from SourceIO.library.utils.file_utils import Buffer
@@ -15,6 +17,24 @@ class Node:
     face_count: int
     area: int
 
+    dtypes = {
+        1: np.dtype([
+            ('plane_index', '<i4'), ('childes_id', '<i4', (2,)), ('min', '<f4', (3,)), ('max', '<f4', (3,)),
+            ('first_face', '<u4'), ('face_count', '<u4'), ('area', '<i2'),
+        ]),
+        None: np.dtype({
+            'names': ['plane_index', 'childes_id', 'min', 'max', 'first_face', 'face_count', 'area'],
+            'formats': ['<i4', ('<i4', (2,)), ('<i2', (3,)), ('<i2', (3,)), '<i2', '<i2', '<i2'],
+            'itemsize': 32
+        }),
+    }
+
+    @classmethod
+    def from_record(cls, values: tuple, version: int):
+        plane_index, childes_id, b_min, b_max, first_face, face_count, area = values
+        return cls(plane_index, tuple(childes_id.tolist()), tuple(b_min.tolist()), tuple(b_max.tolist()),
+                   first_face, face_count, area)
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: BSPFile):
         plane_index = buffer.read_int32()
@@ -32,6 +52,13 @@ class Node:
 
 
 class VNode(Node):
+    dtypes = {
+        None: np.dtype([
+            ('plane_index', '<i4'), ('childes_id', '<i4', (2,)), ('min', '<i4', (3,)), ('max', '<i4', (3,)),
+            ('first_face', '<i4'), ('face_count', '<i4'), ('area', '<i4'),
+        ]),
+    }
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: BSPFile):
         plane_index = buffer.read_int32()
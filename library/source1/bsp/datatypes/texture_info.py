@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from enum import IntFlag
 
+import numpy as np
+
 from SourceIO.library.shared.types import Vector4
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
 from SourceIO.library.utils.file_utils import Buffer
@@ -29,6 +31,25 @@ class TextureInfo:
     flags: SurfaceInfo
     texture_data_id: int
 
+    # Keyed by BSP version, (20, 4) maps have 24 unknown bytes before flags
+    dtypes = {
+        (20, 4): np.dtype([
+            ('texture_vectors', '<f4', (2, 4)), ('lightmap_vectors', '<f4', (2, 4)), ('unk', 'u1', (24,)),
+            ('flags', '<u4'), ('texture_data_id', '<i4'),
+        ]),
+        None: np.dtype([
+            ('texture_vectors', '<f4', (2, 4)), ('lightmap_vectors', '<f4', (2, 4)),
+            ('flags', '<u4'), ('texture_data_id', '<i4'),
+        ]),
+    }
+
+    @classmethod
+    def from_record(cls, values: tuple, version: tuple[int, int]):
+        texture_vectors, lightmap_vectors, *_, flags, texture_data_id = values
+        return cls(tuple(tuple(row) for row in texture_vectors.tolist()),
+                   tuple(tuple(row) for row in lightmap_vectors.tolist()),
+                   SurfaceInfo(flags), texture_data_id)
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: BSPFile):
         texture_vectors = (buffer.read_fmt('4f'), buffer.read_fmt('4f'))
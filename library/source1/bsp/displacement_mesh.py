@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from SourceIO.library.source1.bsp.datatypes.displacement import DispInfo
+from SourceIO.library.source1.bsp.datatypes.texture_data import TextureData
+from SourceIO.library.source1.bsp.datatypes.texture_info import TextureInfo
+
+
+@dataclass(slots=True)
+class DisplacementMesh:
+    """All displacements of a map merged into one triangle mesh, in DispInfo order.
+
+    Vertices of displacement n start at vertex_offsets[n], triangle_displacements maps triangles back to DispInfo.
+    Multiblend arrays are None when the map has no multiblend data, displacements without it are zero filled.
+    """
+    positions: np.ndarray
+    uvs: np.ndarray
+    alpha: np.ndarray
+    triangles: np.ndarray
+    vertex_offsets: np.ndarray
+    triangle_displacements: np.ndarray
+    multiblend: Optional[np.ndarray] = None
+    alphablend: Optional[np.ndarray] = None
+    multiblend_colors: Optional[np.ndarray] = None
+
+
+def _grid_triangles(power: int) -> np.ndarray:
+    """Triangles of one displacement grid, diagonals alternate the same way vbsp builds them."""
+    edge_vertices = (1 << power) + 1
+    rows, cols = np.divmod(np.arange((edge_vertices - 1) ** 2, dtype=np.uint32), edge_vertices - 1)
+    index = rows * edge_vertices + cols
+    below = index + edge_vertices
+    odd = (index & 1).astype(np.bool_)
+    triangles = np.empty((len(index), 2, 3), np.uint32)
+    triangles[:, 0] = np.where(odd[:, None],
+                               np.stack([index, index + 1, below], 1),
+                               np.stack([index, below + 1, below], 1))
+    triangles[:, 1] = np.where(odd[:, None],
+                               np.stack([index + 1, below + 1, below], 1),
+                               np.stack([index, index + 1, below + 1], 1))
+    return triangles.reshape((-1, 3))
+
+
+def _find_start_corners(corners: np.ndarray, start_positions: np.ndarray) -> np.ndarray:
+    """Index of face corner matching DispInfo.start_position, nearest corner if none of them is close enough."""
+    close = np.isclose(corners, start_positions[:, None, :], 0.5e-2).all(axis=2)
+    nearest = np.linalg.norm(corners - start_positions[:, None, :], axis=2).argmin(axis=1)
+    return np.where(close.any(axis=1), close.argmax(axis=1), nearest)
+
+
+def build_displacements(infos: Sequence[DispInfo], face_columns: np.ndarray,
+                        surf_edges: np.ndarray, edges: np.ndarray, vertices: np.ndarray, disp_vertices: np.ndarray,
+                        texture_info: Sequence[TextureInfo], texture_data: Sequence[TextureData],
+                        multiblends: Optional[np.ndarray] = None) -> DisplacementMesh:
+    """Subdivides every displacement, displacements of the same power are processed together.
+
+    disp_vertices is the record array of LUMP_DISP_VERTS, multiblends the one of LUMP_DISP_MULTIBLEND.
+    UVs use texture view size and are V flipped, positions are in map units.
+    """
+    info_count = len(infos)
+    powers = np.array([info.power for info in infos], np.int64)
+    disp_vert_starts = np.array([info.disp_vert_start for info in infos], np.int64)
+    start_positions = np.array([info.start_position for info in infos], np.float32).reshape((-1, 3))
+    source_faces = face_columns[np.array([info.map_face for info in infos], np.int64)]
+
+    vertex_counts = ((1 << powers) + 1) ** 2
+    vertex_offsets = np.cumsum(vertex_counts) - vertex_counts
+    triangle_counts = (1 << powers) ** 2 * 2
+    triangle_offsets = np.cumsum(triangle_counts) - triangle_counts
+    vertex_total = int(vertex_counts.sum())
+
+    tex_info_ids = source_faces['tex_info_id'].astype(np.int64)
+    used_tex_infos = np.unique(tex_info_ids)
+    texture_vectors = np.zeros((len(used_tex_infos), 2, 4), np.float64)
+    view_sizes = np.zeros((len(used_tex_infos), 2), np.float64)
+    for n, tex_info_id in enumerate(used_tex_infos.tolist()):
+        tex_info = texture_info[tex_info_id]
+        tex_data = texture_data[tex_info.texture_data_id]
+        texture_vectors[n] = tex_info.texture_vectors
+        view_sizes[n] = tex_data.view_width, tex_data.view_height
+    tex_slots = np.searchsorted(used_tex_infos, tex_info_ids)
+
+    positions = np.zeros((vertex_total, 3), np.float32)
+    uvs = np.zeros((vertex_total, 2), np.float32)
+    alpha = np.zeros(vertex_total, np.float32)
+    triangles = np.zeros((int(triangle_counts.sum()), 3), np.uint32)
+    triangle_displacements = np.repeat(np.arange(info_count, dtype=np.uint32), triangle_counts)
+
+    for power in np.unique(powers).tolist():
+        group = np.flatnonzero(powers == power)
+        edge_vertices = (1 << power) + 1
+        grid_size = edge_vertices * edge_vertices
+
+        # First four surfedges of every source face are its corners
+        faces = source_faces[group]
+        surf_edge_ids = faces['first_edge'].astype(np.int64)[:, None] + np.arange(4)
+        used_surf_edges = surf_edges[surf_edge_ids]
+        corners = vertices[edges[np.abs(used_surf_edges), (used_surf_edges <= 0).astype(np.intp)]]
+
+        start = _find_start_corners(corners, start_positions[group])
+        rows = np.arange(len(group))[:, None]
+        corner_0, corner_1, corner_2, corner_3 = (corners[rows, (start[:, None] + k) & 3][:, 0] for k in range(4))
+
+        steps = np.arange(edge_vertices, dtype=np.float32) / (edge_vertices - 1)
+        left_ends = corner_0[:, None, :] + (corner_1 - corner_0)[:, None, :] * steps[None, :, None]
+        right_ends = corner_3[:, None, :] + (corner_2 - corner_3)[:, None, :] * steps[None, :, None]
+        grid = (left_ends[:, :, None, :]
+                + (right_ends - left_ends)[:, :, None, :] * steps[None, None, :, None]).reshape((-1, grid_size, 3))
+
+        vectors = texture_vectors[tex_slots[group]]
+        sizes = view_sizes[tex_slots[group]]
+        grid_uvs = np.einsum('gvj,gij->gvi', grid, vectors[:, :, :3]) + vectors[:, None, :, 3]
+        grid_uvs /= sizes[:, None, :]
+        grid_uvs[:, :, 1] = 1 - grid_uvs[:, :, 1]
+
+        disp_ids = disp_vert_starts[group][:, None] + np.arange(grid_size)
+        targets = (vertex_offsets[group][:, None] + np.arange(grid_size)).ravel()
+        positions[targets] = (grid + disp_vertices['position'][disp_ids] * disp_vertices['dist'][disp_ids]
+                              ).reshape((-1, 3))
+        uvs[targets] = grid_uvs.reshape((-1, 2))
+        alpha[targets] = disp_vertices['alpha'][disp_ids].ravel()
+
+        grid_triangles = _grid_triangles(power)
+        triangle_targets = (triangle_offsets[group][:, None] + np.arange(len(grid_triangles))).ravel()
+        triangles[triangle_targets] = (grid_triangles[None, :, :]
+                                       + vertex_offsets[group][:, None, None].astype(np.uint32)).reshape((-1, 3))
+
+    mesh = DisplacementMesh(positions, uvs, alpha, triangles, vertex_offsets, triangle_displacements)
+    if multiblends is not None:
+        # Multiblend lump only stores entries for displacements flagged with it, in DispInfo order
+        has_multiblend = np.array([info.has_multiblend for info in infos], np.bool_)
+        if has_multiblend.any():
+            mesh.multiblend = np.zeros((vertex_total, 4), np.float32)
+            mesh.alphablend = np.zeros((vertex_total, 4), np.float32)
+            mesh.multiblend_colors = np.zeros((vertex_total, 4, 3), np.float32)
+            targets = np.concatenate([np.arange(vertex_offsets[n], vertex_offsets[n] + vertex_counts[n])
+                                      for n in np.flatnonzero(has_multiblend)])
+            blends = multiblends[:len(targets)]
+            targets = targets[:len(blends)]
+            mesh.multiblend[targets] = blends['multiblend']
+            mesh.alphablend[targets] = blends['alphablend']
+            mesh.multiblend_colors[targets] = blends['multiblend_colors']
+    return mesh
@@ -1,11 +1,14 @@
 import lzma
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Optional, Type, Union
+from typing import Any, Iterator, Optional, Sequence, Type, Union
 
 from SourceIO.library.shared.app_id import SteamAppId
-from SourceIO.library.utils.file_utils import Buffer, MemoryBuffer
+from SourceIO.library.utils.file_utils import Buffer, MemoryBuffer, get_record_dtype
 from SourceIO.library.utils.math_utilities import sizeof_fmt
 
+# Upper bound for a single decompressed chunk, keeps peak memory close to the decompressed lump size
+LZMA_CHUNK_SIZE = 1024 * 1024
 
 
 @dataclass(slots=True)
@@ -17,6 +20,12 @@ class LumpTag:
     steam_id: Optional[SteamAppId] = field(default=None)
 
 
+# lump_name -> every (lump class, tag) registered for it, filled by lump_tag as lump modules get imported
+LUMP_REGISTRY: dict[str, list[tuple[Type['Lump'], LumpTag]]] = defaultdict(list)
+# (lump_name, bsp_version, steam_id, versions of candidate lumps) -> (lump class, lump id) or None
+_RESOLVED_LUMPS: dict[tuple, Optional[tuple[Type['Lump'], int]]] = {}
+
+
 def lump_tag(lump_id, lump_name,
              lump_version: Optional[int] = None,
              bsp_version: Optional[Union[int, tuple[int, int]]] = None,
@@ -28,12 +37,54 @@ def lump_tag(lump_id, lump_name,
             bsp_version_ = (bsp_version,)
         else:
             bsp_version_ = bsp_version
-        klass.tags.append(LumpTag(lump_id, lump_name, lump_version, bsp_version_, steam_id))
+        tag = LumpTag(lump_id, lump_name, lump_version, bsp_version_, steam_id)
+        klass.tags.append(tag)
+        LUMP_REGISTRY[lump_name].append((klass, tag))
+        _RESOLVED_LUMPS.clear()
         return klass
 
     return loader
 
 
+def resolve_lump_class(lump_name: str, bsp_version, steam_id,
+                       lumps_info: Sequence[Optional['AbstractLump']]) -> Optional[tuple[Type['Lump'], int]]:
+    """Picks the best ranked lump class registered for lump_name, result is memoized per header signature."""
+    candidates = LUMP_REGISTRY.get(lump_name, None)
+    if not candidates:
+        return None
+    lump_versions = tuple(lumps_info[tag.lump_id].version
+                          if tag.lump_id < len(lumps_info) and lumps_info[tag.lump_id] is not None else None
+                          for _, tag in candidates)
+    key = (lump_name, bsp_version, steam_id, lump_versions)
+    if key in _RESOLVED_LUMPS:
+        return _RESOLVED_LUMPS[key]
+
+    best_match = None
+    best_rank = -1
+    for (sub, tag), lump_version in zip(candidates, lump_versions):
+        if tag.lump_id >= len(lumps_info):
+            continue
+        if tag.bsp_version is not None and tag.bsp_version > bsp_version:
+            continue
+        if tag.steam_id is not None and tag.steam_id != steam_id:
+            continue
+        if tag.lump_version is not None and tag.lump_version != lump_version:
+            continue
+        rank = 0
+        if tag.bsp_version is not None and tag.bsp_version == bsp_version:
+            rank += 2
+        if tag.steam_id is not None:
+            rank += 1
+        if tag.lump_version is not None:
+            rank += 1
+        # Ties go to the last registered class, same as stable sort by rank did
+        if rank >= best_rank:
+            best_rank = rank
+            best_match = sub, tag.lump_id
+    _RESOLVED_LUMPS[key] = best_match
+    return best_match
+
+
 @dataclass(slots=True)
 class AbstractLump:
     id: int
@@ -101,33 +152,79 @@ class Lump:
     # def parse(self, buffer: Buffer, bsp: 'BSPFile'):
     #     return self
 
+    def read_structures(self, buffer: Buffer, data_class: Type, bsp: 'BSPFile',
+                        record_version: Any = None) -> Sequence:
+        """Reads data_class items until the end of the lump.
+        Classes with numpy dtype for record_version(lump version by default) are decoded with a single frombuffer."""
+        if record_version is None:
+            record_version = self.version
+        if (dtype := get_record_dtype(data_class, record_version)) is not None:
+            return buffer.read_structure_array(buffer.tell(), buffer.remaining() // dtype.itemsize,
+                                               data_class, record_version)
+        items = []
+        while buffer:
+            items.append(data_class.from_buffer(buffer, self.version, bsp))
+        return items
+
     # noinspection PyUnresolvedReferences,PyProtectedMember
     @staticmethod
     def decompress_lump(buffer: Buffer) -> Buffer:
+        decompressed_size, compressed_size, filter_properties = Lump.read_lzma_header(buffer)
+        decompressed_buffer = bytearray(decompressed_size)
+        offset = 0
+        for chunk in Lump._iter_lzma_chunks(buffer, decompressed_size, compressed_size, filter_properties):
+            decompressed_buffer[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        assert decompressed_size == offset, 'Decompressed data does not match the expected size'
+        return MemoryBuffer(decompressed_buffer)
+
+    @staticmethod
+    def read_lzma_header(buffer: Buffer) -> tuple[int, int, dict]:
         magic = buffer.read_fourcc()
         assert magic == 'LZMA', f'Invalid LZMA compressed header: {magic}'
 
         decompressed_size = buffer.read_uint32()
         compressed_size = buffer.read_uint32()
         filter_properties = lzma._decode_filter_properties(lzma.FILTER_LZMA1, buffer.read(5))
+        return decompressed_size, compressed_size, filter_properties
 
-        compressed_buffer = buffer.read(compressed_size)
-        chunks: list[bytes] = []
+    @staticmethod
+    def iter_decompress_lump(buffer: Buffer, chunk_size: int = LZMA_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yields decompressed data in chunks of at most chunk_size bytes, reading compressed data incrementally."""
+        decompressed_size, compressed_size, filter_properties = Lump.read_lzma_header(buffer)
+        yield from Lump._iter_lzma_chunks(buffer, decompressed_size, compressed_size, filter_properties, chunk_size)
 
-        while True:
-            decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=(filter_properties,))
+    @staticmethod
+    def _iter_lzma_chunks(buffer: Buffer, decompressed_size: int, compressed_size: int, filter_properties: dict,
+                          chunk_size: int = LZMA_CHUNK_SIZE) -> Iterator[bytes]:
+        remaining_output = decompressed_size
+        remaining_input = compressed_size
+        pending = b""
+        stream_id = 0
+        decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=(filter_properties,))
+        while remaining_output > 0:
+            if decompressor.eof:
+                pending = decompressor.unused_data
+                if not pending and not remaining_input:
+                    break
+                stream_id += 1
+                decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=(filter_properties,))
+            data = b""
+            if decompressor.needs_input:
+                if not pending:
+                    if not remaining_input:
+                        break
+                    pending = buffer.read(min(chunk_size, remaining_input))
+                    if not pending:
+                        break  # Truncated lump, size check is up to the caller.
+                    remaining_input -= len(pending)
+                data, pending = pending, b""
             try:
-                result = decompressor.decompress(compressed_buffer)
+                result = decompressor.decompress(data, max_length=min(chunk_size, remaining_output))
             except lzma.LZMAError:
-                if not chunks:
-                    raise  # Error on the first iteration; bail out.
+                if stream_id == 0:
+                    raise  # Error in the first stream; bail out.
                 break  # Leftover data is not a valid LZMA/XZ stream; ignore it.
-            chunks.append(result)
-            compressed_buffer = decompressor.unused_data
-            if not compressed_buffer:
-                break
-            assert decompressor.eof, 'Compressed data ended before the end-of-stream marker was reached'
-
-        decompressed_buffer = b"".join(chunks)[:decompressed_size]
-        assert decompressed_size == len(decompressed_buffer), 'Decompressed data does not match the expected size'
-        return MemoryBuffer(decompressed_buffer)
+            if result:
+                remaining_output -= len(result)
+                yield result
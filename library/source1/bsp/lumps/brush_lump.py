@@ -1,3 +1,5 @@
+from typing import Sequence
+
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.source1.bsp import Lump, LumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
@@ -10,11 +12,10 @@ class RavenBrushLump(Lump):
 
     def __init__(self, lump_info: LumpInfo):
         super().__init__(lump_info)
-        self.brushes: list[RavenBrush] = []
+        self.brushes: Sequence[RavenBrush] = []
 
     def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.brushes.append(RavenBrush.from_buffer(buffer, self.version, bsp))
+        self.brushes = self.read_structures(buffer, RavenBrush, bsp)
         return self
 
 
@@ -23,9 +24,8 @@ class RavenBrushSidesLump(Lump):
 
     def __init__(self, lump_info: LumpInfo):
         super().__init__(lump_info)
-        self.brush_sides: list[RavenBrushSide] = []
+        self.brush_sides: Sequence[RavenBrushSide] = []
 
     def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.brush_sides.append(RavenBrushSide.from_buffer(buffer, self.version, bsp))
+        self.brush_sides = self.read_structures(buffer, RavenBrushSide, bsp)
         return self
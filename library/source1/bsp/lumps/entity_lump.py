@@ -1,35 +1,110 @@
+import hashlib
+import re
+from typing import Iterator, Optional
+
 import charset_normalizer
 
 from SourceIO.library.source1.bsp import Lump, LumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
 from SourceIO.library.utils import Buffer
-from SourceIO.library.utils.kv_parser import ValveKeyValueParser
+from SourceIO.library.utils.kv_parser import KVDataProxy, ValveKeyValueParser
 from SourceIO.library.utils.s1_keyvalues import KVParser
 from SourceIO.library.utils.tiny_path import TinyPath
 from SourceIO.logger import SourceLogMan
 
 log_manager = SourceLogMan()
 
+CHARSET_SAMPLE_SIZE = 64 * 1024
+
+_NON_ASCII = re.compile(rb'[\x80-\xff]')
+_CONTROL_TO_SPACE = str.maketrans({chr(i): " " for i in range(0xA)})
+# (lump path, lump size, sample hash) -> detected encoding
+_encoding_cache: dict[tuple[str, int, bytes], str] = {}
+
+
+def clear_encoding_cache():
+    _encoding_cache.clear()
+
+
+def detect_entity_lump_encoding(data: bytes, cache_key: Optional[str] = None) -> str:
+    """ASCII and UTF-8 are checked first, charset detection only runs on a sample when both of them fail.
+    With cache_key, detection result is reused for the same lump content (size and sample)."""
+    if data.isascii():
+        return 'ascii'
+    try:
+        data.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    # Entity lumps are mostly ASCII, so sample around the first byte that is not
+    first = _NON_ASCII.search(data).start()
+    sample_start = max(0, first - CHARSET_SAMPLE_SIZE // 4)
+    sample = data[sample_start:sample_start + CHARSET_SAMPLE_SIZE]
+    key = None
+    if cache_key is not None:
+        key = cache_key, len(data), hashlib.blake2b(sample, digest_size=16).digest()
+        if (encoding := _encoding_cache.get(key, None)) is not None:
+            return encoding
+    best = charset_normalizer.from_bytes(sample).best()
+    encoding = 'latin-1' if best is None else best.encoding
+    if key is not None:
+        _encoding_cache[key] = encoding
+    return encoding
+
+
+def decode_entity_lump(data: bytes, cache_key: Optional[str] = None) -> tuple[str, str]:
+    """Returns decoded lump and its encoding."""
+    encoding = detect_entity_lump_encoding(data, cache_key)
+    return data.decode(encoding, "ignore"), encoding
+
 
 @lump_tag(0, 'LUMP_ENTITIES')
 class EntityLump(Lump):
+    """Entities are parsed on demand: iter_entities yields them while parsing, entities parses the whole lump.
+    Both share the parsed entities, so the lump is parsed only once. A malformed lump is logged and ends the
+    entities at the last one parsed before the error."""
+
     def __init__(self, lump_info: LumpInfo):
         super().__init__(lump_info)
-        self.entities = []
+        self._entities: list[dict] = []
+        self._pending: Optional[Iterator[dict]] = None
         self._logger = log_manager.get_logger("Entity Lump")
 
+    @property
+    def entities(self) -> list[dict]:
+        while self._parse_next():
+            pass
+        return self._entities
+
+    def iter_entities(self) -> Iterator[dict]:
+        index = 0
+        while index < len(self._entities) or self._parse_next():
+            yield self._entities[index]
+            index += 1
+
     def parse(self, buffer: Buffer, bsp: BSPFile):
-        buffer = buffer.read(-1).strip(b"\x00")
-        chaset = charset_normalizer.from_bytes(buffer)
-        self._logger.info(f"Detected {chaset.best().encoding!r} encoding in entity lump")
-        buffer = buffer.decode(chaset.best().encoding, "ignore")
-        buffer = buffer.translate(str.maketrans({chr(i): " " for i in range(0xA)}))
-        parser = ValveKeyValueParser(buffer_and_name=(buffer, 'EntityLump'), self_recover=True, array_of_blocks=True)
-        parser.parse()
-        for ent in parser.tree:
-            self.entities.append(ent.to_dict())
+        data = buffer.read(-1).strip(b"\x00")
+        text, encoding = decode_entity_lump(data, str(bsp.filepath))
+        self._logger.info(f"Using {encoding!r} encoding for entity lump")
+        text = text.translate(_CONTROL_TO_SPACE)
+        parser = ValveKeyValueParser(buffer_and_name=(text, 'EntityLump'), self_recover=True, array_of_blocks=True)
+        self._pending = (KVDataProxy(node).to_dict() for node in parser.iter_parse())
         return self
 
+    def _parse_next(self) -> bool:
+        if self._pending is None:
+            return False
+        try:
+            entity = next(self._pending, None)
+        except Exception as e:
+            self._logger.exception(f"Failed to parse entity lump after {len(self._entities)} entities", e)
+            entity = None
+        if entity is None:
+            self._pending = None
+            return False
+        self._entities.append(entity)
+        return True
+
 
 @lump_tag(24, 'LUMP_ENTITYPARTITIONS', bsp_version=29)
 class EntityPartitionsLump(Lump):
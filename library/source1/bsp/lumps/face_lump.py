@@ -1,79 +1,79 @@
+from typing import Sequence, Type
+
+import numpy as np
+
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.source1.bsp import Lump, LumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
 from SourceIO.library.source1.bsp.datatypes.face import Face, VFace1, VFace2, RavenFace
 from SourceIO.library.utils import Buffer
+from SourceIO.library.utils.file_utils import StructArray
 
-@lump_tag(7, 'LUMP_FACES')
-class FaceLump(Lump):
-    def __init__(self, lump_info: LumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
+# Used when faces were not decoded in bulk, wide enough for every face version
+FACE_COLUMNS_DTYPE = np.dtype([
+    ('plane_index', '<i8'), ('side', '<i8'), ('on_node', '<i8'),
+    ('first_edge', '<i8'), ('edge_count', '<i8'), ('tex_info_id', '<i8'), ('disp_info_id', '<i8'),
+    ('surface_fog_volume_id', '<i8'), ('light_offset', '<i8'), ('area', '<f4'),
+    ('lightmap_texture_mins_in_luxels', '<i8', (2,)), ('lightmap_texture_size_in_luxels', '<i8', (2,)),
+    ('orig_face', '<i8'), ('prim_count', '<i8'), ('first_prim_id', '<i8'), ('smoothing_groups', '<i8'),
+])
 
-    def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.faces.append(Face.from_buffer(buffer, self.version, bsp))
-        return self
 
+def get_face_columns(faces: Sequence[Face]) -> np.ndarray:
+    """Returns faces as numpy structured array, field names match Face attributes.
+    Bulk decoded faces are returned without copying or creating Face objects."""
+    if isinstance(faces, StructArray):
+        return faces.records
+    columns = np.zeros(len(faces), FACE_COLUMNS_DTYPE)
+    for name in FACE_COLUMNS_DTYPE.names:
+        columns[name] = [getattr(face, name) for face in faces]
+    return columns
+
+
+class BaseFaceLump(Lump):
+    face_class: Type[Face] = Face
 
-@lump_tag(27, 'LUMP_ORIGINALFACES')
-class OriginalFaceLump(Lump):
     def __init__(self, lump_info: LumpInfo):
         super().__init__(lump_info)
-        self.faces: list[Face] = []
+        self.faces: Sequence[Face] = []
 
     def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.faces.append(Face.from_buffer(buffer, self.version, bsp))
+        self.faces = self.read_structures(buffer, self.face_class, bsp)
         return self
 
+    @property
+    def columns(self) -> np.ndarray:
+        return get_face_columns(self.faces)
 
-@lump_tag(7, 'LUMP_FACES', 1, steam_id=SteamAppId.VINDICTUS)
-class VFaceLump1(Lump):
-    def __init__(self, lump_info: LumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
 
-    def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.faces.append(VFace1.from_buffer(buffer, self.version, bsp))
-        return self
+@lump_tag(7, 'LUMP_FACES')
+class FaceLump(BaseFaceLump):
+    pass
 
 
-@lump_tag(7, 'LUMP_FACES', 2, steam_id=SteamAppId.VINDICTUS)
-class VFaceLump2(Lump):
-    def __init__(self, lump_info: LumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
+@lump_tag(27, 'LUMP_ORIGINALFACES')
+class OriginalFaceLump(BaseFaceLump):
+    pass
 
-    def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.faces.append(VFace2.from_buffer(buffer, self.version, bsp))
-        return self
 
+@lump_tag(7, 'LUMP_FACES', 1, steam_id=SteamAppId.VINDICTUS)
+class VFaceLump1(BaseFaceLump):
+    face_class = VFace1
 
-@lump_tag(27, 'LUMP_ORIGINALFACES', 1, steam_id=SteamAppId.VINDICTUS)
-class VOriginalFaceLump(Lump):
-    def __init__(self, lump_info: LumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
 
-    def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.faces.append(VFace1.from_buffer(buffer, self.version, bsp))
-        return self
+@lump_tag(7, 'LUMP_FACES', 2, steam_id=SteamAppId.VINDICTUS)
+class VFaceLump2(BaseFaceLump):
+    face_class = VFace2
 
 
-@lump_tag(27, 'LUMP_ORIGINALFACES', 2, steam_id=SteamAppId.VINDICTUS)
-class VOriginalFaceLump(Lump):
-    def __init__(self, lump_info: LumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
+@lump_tag(27, 'LUMP_ORIGINALFACES', 1, steam_id=SteamAppId.VINDICTUS)
+class VOriginalFaceLump1(BaseFaceLump):
+    face_class = VFace1
 
-    def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.faces.append(VFace2.from_buffer(buffer, self.version, bsp))
-        return self
+
+@lump_tag(27, 'LUMP_ORIGINALFACES', 2, steam_id=SteamAppId.VINDICTUS)
+class VOriginalFaceLump(BaseFaceLump):
+    face_class = VFace2
 
 
 @lump_tag(13, 'LUMP_FACES', steam_id=SteamAppId.SOLDIERS_OF_FORTUNE2, bsp_version=(1, 0))
@@ -1,3 +1,5 @@
+from typing import Sequence
+
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.source1.bsp import Lump, LumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
@@ -10,12 +12,10 @@ class NodeLump(Lump):
 
     def __init__(self, lump_info: LumpInfo):
         super().__init__(lump_info)
-        self.nodes: list[Node] = []
+        self.nodes: Sequence[Node] = []
 
     def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            plane = Node.from_buffer(buffer, self.version, bsp)
-            self.nodes.append(plane)
+        self.nodes = self.read_structures(buffer, Node, bsp)
         return self
 
 
@@ -24,10 +24,8 @@ class VNodeLump(Lump):
 
     def __init__(self, lump_info: LumpInfo):
         super().__init__(lump_info)
-        self.nodes: list[VNode] = []
+        self.nodes: Sequence[VNode] = []
 
     def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            plane = VNode.from_buffer(buffer, self.version, bsp)
-            self.nodes.append(plane)
+        self.nodes = self.read_structures(buffer, VNode, bsp)
         return self
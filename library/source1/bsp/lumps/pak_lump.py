@@ -1,28 +1,128 @@
+import lzma
+import struct
 import zipfile
+import zlib
+from dataclasses import dataclass
 from io import BytesIO
+from typing import Optional
 
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.shared.content_manager.providers.zip_content_provider import ZIPContentProvider
 from SourceIO.library.source1.bsp import Lump, LumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
-from SourceIO.library.utils import Buffer
+from SourceIO.library.utils import Buffer, MemoryBuffer
 from SourceIO.library.utils.tiny_path import TinyPath
+from SourceIO.logger import SourceLogMan
+
+log_manager = SourceLogMan()
+logger = log_manager.get_logger('PakLump')
+
+_EOCD = struct.Struct('<4s4H2IH')
+_CENTRAL_HEADER = struct.Struct('<4s6H3I5H2I')
+_LOCAL_HEADER = struct.Struct('<4s5H3I2H')
+_ZIP64_MARKER = 0xFFFFFFFF
+
+
+@dataclass(slots=True)
+class PakMember:
+    name: str
+    method: int
+    flags: int
+    compressed_size: int
+    file_size: int
+    header_offset: int
+
+
+def _read_central_directory(data: memoryview) -> Optional[dict[str, PakMember]]:
+    """Parses the zip central directory only, returns None for archives that need zipfile (zip64, multi-disk)."""
+    tail_start = max(0, len(data) - _EOCD.size - 0xFFFF)
+    eocd_pos = bytes(data[tail_start:]).rfind(b'PK\x05\x06')
+    if eocd_pos == -1 or tail_start + eocd_pos + _EOCD.size > len(data):
+        return None
+    eocd_pos += tail_start
+    _, disk, _, disk_entry_count, entry_count, cd_size, cd_offset, _ = _EOCD.unpack_from(data, eocd_pos)
+    if disk != 0 or disk_entry_count != entry_count:
+        return None
+    if cd_offset == _ZIP64_MARKER or cd_size == _ZIP64_MARKER:
+        return None
+    cd_start = eocd_pos - cd_size
+    # Same fixup zipfile does, handles archives whose offsets are not relative to the start of the lump
+    concat = cd_start - cd_offset
+
+    members = {}
+    offset = cd_start
+    for _ in range(entry_count):
+        (magic, _, _, flags, method, _, _, _, compressed_size, file_size,
+         name_size, extra_size, comment_size, _, _, _, header_offset) = _CENTRAL_HEADER.unpack_from(data, offset)
+        if magic != b'PK\x01\x02':
+            return None
+        if _ZIP64_MARKER in (compressed_size, file_size, header_offset):
+            return None
+        offset += _CENTRAL_HEADER.size
+        name = bytes(data[offset:offset + name_size]).decode('utf8' if flags & 0x800 else 'cp437')
+        offset += name_size + extra_size + comment_size
+        members[name] = PakMember(name, method, flags, compressed_size, file_size, header_offset + concat)
+    return members
 
 
 @lump_tag(40, 'LUMP_PAK')
 class PakLump(Lump, ZIPContentProvider):
+    """Embedded zip, only the central directory is parsed. Members are served from the lump buffer on request,
+    stored members are returned as views without copying."""
 
     def __init__(self, lump_info: LumpInfo):
         super().__init__(lump_info)
         self.filepath = None
         self._steamapp_id = SteamAppId.UNKNOWN
         self._zip_file = None
+        self._data: Optional[memoryview] = None
+        self._members: dict[str, PakMember] = {}
+        self._fallback_zip: Optional[zipfile.ZipFile] = None
         self._cache = {}
 
     def parse(self, buffer: Buffer, bsp: BSPFile):
         self.filepath = bsp.filepath
-        if self._zip_file is None:
-            zip_data = BytesIO(buffer.read())
-            self._zip_file = zipfile.ZipFile(zip_data)
-            self._cache = {TinyPath(a.lower()).as_posix(): a for a in self._zip_file.NameToInfo}
+        if self._data is None and self._zip_file is None:
+            data = buffer.data if isinstance(buffer, MemoryBuffer) else memoryview(buffer.read())
+            members = _read_central_directory(data)
+            if members is None:
+                logger.debug(f"Falling back to zipfile for pak lump of {bsp.filepath}")
+                self._zip_file = zipfile.ZipFile(BytesIO(data))
+                names = self._zip_file.NameToInfo
+            else:
+                self._data = data
+                self._members = names = members
+            self._cache = {TinyPath(a.lower()).as_posix(): a for a in names}
         return self
+
+    def _read_member(self, name: str) -> Buffer:
+        if self._zip_file is not None:
+            return super()._read_member(name)
+        member = self._members[name]
+        data = self._data
+        magic, *_, name_size, extra_size = _LOCAL_HEADER.unpack_from(data, member.header_offset)
+        if magic != b'PK\x03\x04':
+            raise zipfile.BadZipFile(f'Bad local header for {name!r}')
+        data_offset = member.header_offset + _LOCAL_HEADER.size + name_size + extra_size
+        payload = data[data_offset:data_offset + member.compressed_size]
+        if member.flags & 0x1:
+            return self._read_member_fallback(name)
+        if member.method == zipfile.ZIP_STORED:
+            return MemoryBuffer(payload)
+        if member.method == zipfile.ZIP_DEFLATED:
+            return MemoryBuffer(zlib.decompress(payload, -15, member.file_size))
+        if member.method == zipfile.ZIP_LZMA:
+            # 2 bytes of lzma sdk version, 2 bytes of properties size, then properties and raw LZMA1 stream
+            props_size, = struct.unpack_from('<H', payload, 2)
+            # Private helper, but it is the same one zipfile uses to decode these properties
+            filter_properties = lzma._decode_filter_properties(lzma.FILTER_LZMA1, bytes(payload[4:4 + props_size]))
+            decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=(filter_properties,))
+            return MemoryBuffer(decompressor.decompress(payload[4 + props_size:], member.file_size))
+        return self._read_member_fallback(name)
+
+    def _read_member_fallback(self, name: str) -> Buffer:
+        """Reads members with compression methods not handled above (bzip2 and alike) through zipfile."""
+        if self._fallback_zip is None:
+            logger.debug(f"Opening pak lump of {self.filepath} with zipfile for {name!r}")
+            self._fallback_zip = zipfile.ZipFile(BytesIO(self._data))
+        return MemoryBuffer(self._fallback_zip.read(name))
@@ -1,3 +1,5 @@
+from typing import Sequence
+
 from SourceIO.library.source1.bsp import Lump, LumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
 from SourceIO.library.source1.bsp.datatypes.texture_data import RespawnTextureData, TextureData
@@ -10,11 +12,10 @@ class TextureInfoLump(Lump):
 
     def __init__(self, lump_info: LumpInfo):
         super().__init__(lump_info)
-        self.texture_info: list[TextureInfo] = []
+        self.texture_info: Sequence[TextureInfo] = []
 
     def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            self.texture_info.append(TextureInfo.from_buffer(buffer, self.version, bsp))
+        self.texture_info = self.read_structures(buffer, TextureInfo, bsp, record_version=bsp.version)
         return self
 
 
@@ -1,6 +1,7 @@
 import traceback
+from copy import deepcopy
 from math import radians
-from typing import Union
+from typing import Optional, Union
 
 from SourceIO.library.shared.content_manager import ContentManager
 from SourceIO.library.utils import Buffer, TinyPath
@@ -29,13 +30,20 @@ class VMT:
             self.shader = "FAILED_TO_LOAD"
             self.data = KVDataProxy([])
 
+    def copy(self) -> 'VMT':
+        """Independent copy, shaders are free to modify it without touching the cached material."""
+        vmt = VMT.__new__(VMT)
+        vmt._usage_report = set()
+        vmt.shader = self.shader
+        vmt.data = KVDataProxy(deepcopy(self.data.data))
+        return vmt
+
     def _postprocess(self, content_manager: ContentManager):
         if self.shader == 'patch':
-            original_material = content_manager.find_file(TinyPath(self.get_string('include')))
-            if not original_material:
+            patched_vmt = load_vmt(content_manager, TinyPath(self.get_string('include')))
+            if patched_vmt is None:
                 logger.error(f'Failed to find original material {self.get_string("include")!r}')
                 return
-            patched_vmt = VMT(original_material, self.get_string('include'), content_manager)
             if 'insert' in self:
                 patch_data = self.get('insert', {})
                 patched_vmt.data.merge(patch_data)
@@ -146,3 +154,17 @@ class VMT:
                 print(f'Unhandled {name}')
 
         return matrix
+
+
+def load_vmt(content_manager: ContentManager, material_path: TinyPath) -> Optional[VMT]:
+    """Finds and parses material at most once per content manager session, patch chains and conditions are
+    resolved before caching. Returns a copy of the cached material or None if file was not found."""
+
+    def _parse():
+        buffer = content_manager.find_file(material_path)
+        if buffer is None:
+            return None
+        return VMT(buffer, str(material_path), content_manager)
+
+    vmt = content_manager.parsed_cache.get_or_parse('vmt', material_path, _parse)
+    return vmt.copy() if vmt is not None else None
@@ -1,7 +1,7 @@
 import numpy as np
 
 from SourceIO.library.shared.content_manager import ContentManager
-from SourceIO.library.source1.vmt import VMT
+from SourceIO.library.source1.vmt import load_vmt
 from SourceIO.library.utils import TinyPath
 from SourceIO.library.utils.rustlib import load_vtf_texture
 from SourceIO.logger import SourceLogMan
@@ -43,10 +43,9 @@ def convert_skybox_to_equiangular(skyname: str, content_manager: ContentManager,
     max_s = 0
     use_hdr = False
     for k, n in sides_names.items():
-        file_path = content_manager.find_file(TinyPath(f'materias/skybox/{skyname}{n}.vmt'))
-        if not file_path:
+        material = load_vmt(content_manager, TinyPath(f'materias/skybox/{skyname}{n}.vmt'))
+        if material is None:
             raise SkyboxException(f'Failed to find skybox material {skyname}{n}')
-        material = VMT(file_path, f'skybox/{skyname}{n}', content_manager)
         use_hdr |= bool(material.get_string('$hdrbasetexture', material.get_string('$hdrcompressedtexture', False)))
         texture_path = material.get_string('$basetexture', None)
         if texture_path is None:
@@ -74,12 +73,9 @@ def convert_skybox_to_equiangular(skyname: str, content_manager: ContentManager,
     hdr_alpha_texture = None
     if use_hdr:
         for k, n in sides_names.items():
-            file_path = content_manager.find_file(TinyPath(f'materials/skybox/{skyname}_hdr{n}.vmt'))
-            if file_path is None:
-                file_path = content_manager.find_file(TinyPath(f'materials/skybox/{skyname}{n}.vmt'))
-                material = VMT(file_path, f'skybox/{skyname}{n}', content_manager)
-            else:
-                material = VMT(file_path, f'skybox/{skyname}_hdr{n}', content_manager)
+            material = load_vmt(content_manager, TinyPath(f'materials/skybox/{skyname}_hdr{n}.vmt'))
+            if material is None:
+                material = load_vmt(content_manager, TinyPath(f'materials/skybox/{skyname}{n}.vmt'))
             texture_path = material.get_string('$hdrbasetexture',
                                                material.get_string('$hdrcompressedTexture',
                                                                    material.get_string(
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 import numpy as np
 
@@ -11,6 +12,7 @@ class IndexBuffer:
     index_count: int
     index_size: int
     data: MemoryBuffer
+    _indices: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
 
     @classmethod
     def from_buffer(cls, buffer: Buffer) -> 'IndexBuffer':
@@ -33,6 +35,9 @@ class IndexBuffer:
         return IndexBuffer(data["m_nElementCount"], data["m_nElementSizeInBytes"], MemoryBuffer(data["m_pData"].tobytes()))
 
     def get_indices(self):
-        index_dtype = np.uint32 if self.index_size == 4 else np.uint16
-        indices = np.frombuffer(self.data.data, index_dtype)
-        return indices.reshape((-1, 3))
+        if self._indices is None:
+            index_dtype = np.uint32 if self.index_size == 4 else np.uint16
+            indices = np.frombuffer(self.data.data, index_dtype).reshape((-1, 3))
+            indices.flags.writeable = False
+            self._indices = indices
+        return self._indices
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 import numpy as np
 
@@ -82,6 +83,7 @@ class VertexBuffer:
     vertex_size: int
     data: MemoryBuffer
     attributes: list[VertexAttribute]
+    _vertices: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
 
     @classmethod
     def from_buffer(cls, buffer: Buffer) -> 'VertexBuffer':
@@ -127,8 +129,12 @@ class VertexBuffer:
         return np.dtype(struct)
 
     def get_vertices(self):
-        np_dtype = self.generate_numpy_dtype()
-        return np.frombuffer(self.data.data, np_dtype, self.vertex_count)
+        # Decoded once, every draw call sharing this buffer gets the same read-only view
+        if self._vertices is None:
+            vertices = np.frombuffer(self.data.data, self.generate_numpy_dtype(), self.vertex_count)
+            vertices.flags.writeable = False
+            self._vertices = vertices
+        return self._vertices
 
     def __str__(self) -> str:
         return f'<VertexBuffer ' \
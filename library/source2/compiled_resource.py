@@ -1,7 +1,9 @@
 import warnings
 from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Optional, Type, TypeVar, Union, Collection
+from threading import Lock, RLock
+from typing import Optional, Type, TypeVar, Union, Collection, Iterable, Mapping
 
 from SourceIO.library.shared.content_manager import ContentManager
 from SourceIO.library.source2.blocks.all_blocks import guess_block_type
@@ -11,6 +13,10 @@ from SourceIO.library.source2.blocks.resource_introspection_manifest.manifest im
 from SourceIO.library.source2.compiled_file_header import CompiledHeader, BlockInfo
 from SourceIO.library.source2.utils.ntro_reader import NTROBuffer
 from SourceIO.library.utils import Buffer, MemoryBuffer, TinyPath
+from SourceIO.logger import SourceLogMan
+
+log_manager = SourceLogMan()
+logger = log_manager.get_logger('CompiledResource')
 
 CompiledResourceT = TypeVar("CompiledResourceT", bound="CompiledResource")
 BlockT = TypeVar("BlockT", bound="BaseBlock")
@@ -23,14 +29,26 @@ class CompiledResource:
     _buffer: Buffer
     _filepath: TinyPath
     _header: CompiledHeader
-    _blocks: dict[int, BaseBlock] = field(default_factory=lambda: defaultdict(None))
+    _blocks: dict[int, BaseBlock] = field(default_factory=dict)
+    _block_index: dict[str, list[int]] = field(init=False, repr=False, compare=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False, compare=False)
+    _block_locks: dict[int, RLock] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        block_index = defaultdict(list)
+        for block_id, block in enumerate(self._header.blocks):
+            block_index[block.name].append(block_id)
+        self._block_index = dict(block_index)
 
     @property
     def name(self):
         return self._filepath.stem
 
+    def _read_block_data(self, info_block: BlockInfo) -> memoryview:
+        # View into the resource buffer, blocks never copy their data out of it
+        return self._buffer.data[info_block.absolute_offset:info_block.absolute_offset + info_block.size]
+
     def _get_block(self, block_class: Type[BlockT] | None, info_block: BlockInfo) -> BlockT | None:
-        self._buffer.seek(info_block.absolute_offset)
         block_class = block_class or guess_block_type(info_block.name)
         if block_class is None:
             warnings.warn(f"Block of type {info_block.name} is not supported")
@@ -39,61 +57,101 @@ class CompiledResource:
         if self.has_block(block_name="NTRO") and info_block.name not in _SKIP_BLOCKS:
             ntro = self.get_block(ResourceIntrospectionManifest, block_name="NTRO")
             resource_list = self.get_block(ResourceExternalReferenceList, block_name="RERL")
-            self._buffer.seek(info_block.absolute_offset)
-            buffer = NTROBuffer(self._buffer.read(info_block.size), ntro.info, {v.hash: v.name for v in resource_list})
+            buffer = NTROBuffer(self._read_block_data(info_block), ntro.info,
+                                {v.hash: v.name for v in resource_list})
         else:
-            self._buffer.seek(info_block.absolute_offset)
-            buffer = NTROBuffer(self._buffer.read(info_block.size), None, None)
+            buffer = NTROBuffer(self._read_block_data(info_block), None, None)
         data_block = block_class.from_buffer(buffer)
         data_block.custom_name = info_block.name
         return data_block
 
+    def _get_cached_block(self, block_class: Type[BlockT] | None, block_id: int) -> BlockT | None:
+        data_block = self._blocks.get(block_id, None)
+        if data_block is not None and (block_class is None or isinstance(data_block, block_class)):
+            return data_block
+        return None
+
+    def _decode_block(self, block_class: Type[BlockT] | None, block_id: int) -> BlockT | None:
+        if (data_block := self._get_cached_block(block_class, block_id)) is not None:
+            return data_block
+        info_block = self._header.blocks[block_id]
+        with self._lock:
+            block_lock = self._block_locks.setdefault(block_id, RLock())
+        # Per block lock, so concurrent requests for the same block decode it only once
+        with block_lock:
+            if (data_block := self._get_cached_block(block_class, block_id)) is not None:
+                return data_block
+            data_block = self._get_block(block_class, info_block)
+            if data_block is not None:
+                self._blocks[block_id] = data_block
+            return data_block
+
     def get_block(self,
                   block_class: Type[BlockT] | None,
                   *,
                   block_id: Optional[int] = None,
                   block_name: Optional[str] = None) -> BlockT | None:
-
-        if data_block := self._blocks.get(block_id):
-            return data_block
-
         if block_id is not None:
             if block_id == -1:
                 return None
             if block_id == DATA_BLOCK:
                 block_id = len(self._header.blocks) - 1
-            if data_block := self._blocks.get(block_id):
-                return data_block
-            data_block = self._get_block(block_class, self._header.blocks[block_id])
-            self._blocks[block_id] = data_block
-            return data_block
+            return self._decode_block(block_class, block_id)
         elif block_name is not None:
-            for block in self._header.blocks:
-                if block.name == block_name:
-                    return self._get_block(block_class, block)
-            return None
+            block_ids = self._block_index.get(block_name, None)
+            if not block_ids:
+                return None
+            return self._decode_block(block_class, block_ids[0])
         else:
             raise ValueError("Either block_id or block_name must be provided")
 
     def get_blocks(self,
                    block_class: Type[BlockT] | None,
                    block_name: str) -> Collection[BlockT]:
-        blocks = []
-        for block in self._header.blocks:
-            if block.name == block_name:
-                data_block = self._get_block(block_class, block)
-                blocks.append(data_block)
-        return blocks
+        return [self._decode_block(block_class, block_id) for block_id in self._block_index.get(block_name, [])]
 
     def has_block(self, block_name: str) -> bool:
-        for block in self._header.blocks:
-            if block.name == block_name:
-                return True
-        return False
+        return block_name in self._block_index
+
+    def prefetch_blocks(self, blocks: Union[Iterable[str], Mapping[str, Type[BaseBlock]]],
+                        executor: Optional[Executor] = None,
+                        max_workers: Optional[int] = None) -> dict[str, list[BaseBlock]]:
+        """Decodes every block with given names concurrently, later get_block(s) calls return them from cache.
+        Names can be mapped to the block class callers will request them with, otherwise the class is guessed.
+        KV3 decompression releases the GIL, so heavy blocks (DATA, VBIB, MBUF, MRPH, PHYS) overlap on a thread pool."""
+        if not isinstance(blocks, Mapping):
+            blocks = dict.fromkeys(blocks, None)
+        jobs = [(name, block_class, block_id)
+                for name, block_class in blocks.items()
+                for block_id in self._block_index.get(name, [])
+                if self._get_cached_block(block_class, block_id) is None]
+        if not jobs:
+            return {}
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Source2Block") as pool:
+                return self.prefetch_blocks(blocks, pool)
+        # Introspection blocks are needed by every other block, decode them once up front instead of in every worker
+        if self.has_block("NTRO"):
+            self.get_block(ResourceIntrospectionManifest, block_name="NTRO")
+            self.get_block(ResourceExternalReferenceList, block_name="RERL")
+        futures = [(name, block_id, executor.submit(self._decode_block, block_class, block_id))
+                   for name, block_class, block_id in jobs]
+        decoded = defaultdict(list)
+        for name, block_id, future in futures:
+            try:
+                decoded[name].append(future.result())
+            except Exception as e:
+                # Leave it to the get_block call of whoever actually needs this block to fail
+                logger.exception(f"Failed to prefetch {name} block #{block_id} of {self._filepath}", e)
+        return dict(decoded)
 
     @classmethod
     def from_buffer(cls, buffer: Buffer, filename: TinyPath):
-        inmemory_buffer = MemoryBuffer(buffer.read())
+        if isinstance(buffer, MemoryBuffer):
+            # Share memory of the source (mmap, vpk entry, cached payload) instead of copying the whole file
+            inmemory_buffer = MemoryBuffer(buffer.data[buffer.tell():].toreadonly())
+        else:
+            inmemory_buffer = MemoryBuffer(buffer.read())
         header = CompiledHeader.from_buffer(inmemory_buffer)
         return cls(inmemory_buffer, filename, header)
 
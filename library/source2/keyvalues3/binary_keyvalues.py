@@ -5,9 +5,13 @@ import numpy as np
 
 from SourceIO.library.utils import Buffer, MemoryBuffer, WritableMemoryBuffer
 from SourceIO.library.utils.rustlib import LZ4ChainDecoder, lz4_decompress, zstd_decompress_stream, zstd_decompress
+from .columnar_decoder import KV3ColumnarDecoder, TYPE_FORMAT_V1, TYPE_FORMAT_V3, TYPE_FORMAT_V5
 from .enums import *
 from .types import *
 
+# Binary KV3 v1-v5 are decoded with KV3ColumnarDecoder, set to False to use the per value reader functions instead
+USE_COLUMNAR_DECODER = True
+
 
 class UnsupportedVersion(Exception):
     pass
@@ -59,7 +63,8 @@ def _legacy_block_decompress(in_buffer: Buffer) -> Buffer:
     return out_buffer
 
 
-def read_valve_keyvalue3(buffer: Buffer) -> AnyKVType:
+def read_valve_keyvalue3(buffer: Buffer, lazy: bool = False) -> AnyKVType:
+    """lazy: objects are returned as LazyObject and their nested containers are decoded on access (not for VKV3)"""
     sig = buffer.read(4)
     if not KV3Signatures.is_valid(sig):
         raise BufferError("Not a KV3 buffer")
@@ -68,15 +73,15 @@ def read_valve_keyvalue3(buffer: Buffer) -> AnyKVType:
     if sig == KV3Signatures.VKV_LEGACY:
         return read_legacy(encoding, buffer)
     elif sig == KV3Signatures.KV3_V1:
-        return read_v1(encoding, buffer)
+        return read_v1(encoding, buffer, lazy)
     elif sig == KV3Signatures.KV3_V2:
-        return read_v2(encoding, buffer)
+        return read_v2(encoding, buffer, lazy)
     elif sig == KV3Signatures.KV3_V3:
-        return read_v3(encoding, buffer)
+        return read_v3(encoding, buffer, lazy)
     elif sig == KV3Signatures.KV3_V4:
-        return read_v4(encoding, buffer)
+        return read_v4(encoding, buffer, lazy)
     elif sig == KV3Signatures.KV3_V5:
-        return read_v5(encoding, buffer)
+        return read_v5(encoding, buffer, lazy)
 
 
 @dataclass
@@ -346,6 +351,26 @@ def _read_type_v3(context: KV3ContextNew):
     return KV3Type(data_type), specifier
 
 
+def _read_type_v5(context: KV3ContextNew):
+    t = context.types_buffer.read_int8()
+    mask = 63
+    if t >= 0:
+        specific_type = Specifier.UNSPECIFIED
+        pass
+    else:
+        specific_type = Specifier(context.types_buffer.read_uint8())
+    if t & 0x40 != 0:
+        raise NotImplementedError(f"t & 0x40 != 0: {t & 0x40}")
+        # f = KV3TypeFlag(context.types_buffer.read_uint8())
+    return KV3Type(t & mask), specific_type
+
+
+def _decode_root(context: KV3ContextNew, type_format: int, lazy: bool) -> AnyKVType:
+    if USE_COLUMNAR_DECODER or lazy:
+        return KV3ColumnarDecoder(context, type_format, lazy).decode()
+    return context.read_value(context)
+
+
 def split_buffer(data_buffer: Buffer, bytes_count: int, short_count: int, int_count: int, double_count: int,
                  force_align=False):
     bytes_buffer = MemoryBuffer(data_buffer.read(bytes_count))
@@ -398,7 +423,7 @@ def read_legacy(encoding: bytes, buffer: Buffer):
     return root
 
 
-def read_v1(encoding: bytes, buffer: Buffer):
+def read_v1(encoding: bytes, buffer: Buffer, lazy: bool = False):
     compression_method = buffer.read_uint32()
 
     bytes_count = buffer.read_uint32()
@@ -435,11 +460,10 @@ def read_v1(encoding: bytes, buffer: Buffer):
 
         active_buffer=kv_buffer
     )
-    root = context.read_value(context)
-    return root
+    return _decode_root(context, TYPE_FORMAT_V1, lazy)
 
 
-def read_v2(encoding: bytes, buffer: Buffer):
+def read_v2(encoding: bytes, buffer: Buffer, lazy: bool = False):
     compression_method = buffer.read_uint32()
     compression_dict_id = buffer.read_uint16()
     compression_frame_size = buffer.read_uint16()
@@ -560,11 +584,10 @@ def read_v2(encoding: bytes, buffer: Buffer):
         read_value=_read_value_legacy,
         active_buffer=buffers
     )
-    root = context.read_value(context)
-    return root
+    return _decode_root(context, TYPE_FORMAT_V1, lazy)
 
 
-def read_v3(encoding: bytes, buffer: Buffer):
+def read_v3(encoding: bytes, buffer: Buffer, lazy: bool = False):
     compression_method = buffer.read_uint32()
     compression_dict_id = buffer.read_uint16()
     compression_frame_size = buffer.read_uint16()
@@ -649,11 +672,10 @@ def read_v3(encoding: bytes, buffer: Buffer):
         read_value=_read_value_legacy,
         active_buffer=kv_buffer
     )
-    root = context.read_value(context)
-    return root
+    return _decode_root(context, TYPE_FORMAT_V3, lazy)
 
 
-def read_v4(encoding: bytes, buffer: Buffer):
+def read_v4(encoding: bytes, buffer: Buffer, lazy: bool = False):
     compression_method = buffer.read_uint32()
     compression_dict_id = buffer.read_uint16()
     compression_frame_size = buffer.read_uint16()
@@ -743,11 +765,10 @@ def read_v4(encoding: bytes, buffer: Buffer):
         read_value=_read_value_legacy,
         active_buffer=kv_buffer
     )
-    root = context.read_value(context)
-    return root
+    return _decode_root(context, TYPE_FORMAT_V3, lazy)
 
 
-def read_v5(encoding: bytes, buffer: Buffer):
+def read_v5(encoding: bytes, buffer: Buffer, lazy: bool = False):
     compression_method = buffer.read_uint32()
     compression_dict_id = buffer.read_uint16()
     compression_frame_size = buffer.read_uint16()
@@ -842,19 +863,6 @@ def read_v5(encoding: bytes, buffer: Buffer):
             assert buffer.read_uint32() == 0xFFEEDD00
         blocks_buffer = MemoryBuffer(block_data)
 
-    def _read_type(context: KV3ContextNew):
-        t = context.types_buffer.read_int8()
-        mask = 63
-        if t >= 0:
-            specific_type = Specifier.UNSPECIFIED
-            pass
-        else:
-            specific_type = Specifier(context.types_buffer.read_uint8())
-        if t & 0x40 != 0:
-            raise NotImplementedError(f"t & 0x40 != 0: {t & 0x40}")
-            # f = KV3TypeFlag(context.types_buffer.read_uint8())
-        return KV3Type(t & mask), specific_type
-
     context = KV3ContextNew(
         strings=strings,
         buffer0=kv_buffer0,
@@ -863,12 +871,11 @@ def read_v5(encoding: bytes, buffer: Buffer):
         object_member_count_buffer=object_member_count_buffer,
         binary_blob_sizes=block_sizes,
         binary_blob_buffer=blocks_buffer,
-        read_type=_read_type,
+        read_type=_read_type_v5,
         read_value=_read_value_legacy,
         active_buffer=kv_buffer1
     )
-    root = context.read_value(context)
-    return root
+    return _decode_root(context, TYPE_FORMAT_V5, lazy)
 
 
 def decompress_lz4_chain(buffer: Buffer, decompressed_block_sizes: list[int], compressed_block_sizes: list[int],
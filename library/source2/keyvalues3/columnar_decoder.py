@@ -0,0 +1,442 @@
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+
+from SourceIO.library.utils import Buffer
+from . import types as kv3_types
+from .enums import KV3Type, Specifier
+from .types import *
+
+if TYPE_CHECKING:
+    from .binary_keyvalues import KV3ContextNew
+
+# Layouts of the type stream, see _read_type_legacy, _read_type_v3 and _read_type_v5
+TYPE_FORMAT_V1 = 1
+TYPE_FORMAT_V3 = 3
+TYPE_FORMAT_V5 = 5
+
+_UNSPECIFIED = Specifier.UNSPECIFIED
+
+# Plain ints, comparing against enum members is noticeably slower in the hot loop
+_ARRAY = int(KV3Type.ARRAY)
+_ARRAY_TYPED = int(KV3Type.ARRAY_TYPED)
+_ARRAY_TYPED_BYTE_LENGTH = int(KV3Type.ARRAY_TYPED_BYTE_LENGTH)
+_ARRAY_TYPED_BYTE_LENGTH2 = int(KV3Type.ARRAY_TYPED_BYTE_LENGTH2)
+_BINARY_BLOB = int(KV3Type.BINARY_BLOB)
+_BOOLEAN = int(KV3Type.BOOLEAN)
+_BOOLEAN_FALSE = int(KV3Type.BOOLEAN_FALSE)
+_BOOLEAN_TRUE = int(KV3Type.BOOLEAN_TRUE)
+_DOUBLE = int(KV3Type.DOUBLE)
+_DOUBLE_ONE = int(KV3Type.DOUBLE_ONE)
+_DOUBLE_ZERO = int(KV3Type.DOUBLE_ZERO)
+_FLOAT = int(KV3Type.FLOAT)
+_INT16 = int(KV3Type.INT16)
+_INT32 = int(KV3Type.INT32)
+_INT64 = int(KV3Type.INT64)
+_INT64_ONE = int(KV3Type.INT64_ONE)
+_INT64_ZERO = int(KV3Type.INT64_ZERO)
+_INT8 = int(KV3Type.INT8)
+_NULL = int(KV3Type.NULL)
+_OBJECT = int(KV3Type.OBJECT)
+_STRING = int(KV3Type.STRING)
+_UINT16 = int(KV3Type.UINT16)
+_UINT32 = int(KV3Type.UINT32)
+_UINT64 = int(KV3Type.UINT64)
+_UINT8 = int(KV3Type.UINT8)
+
+
+def _flag_to_specifier(flag: int) -> Specifier:
+    if flag & 1:
+        return Specifier.RESOURCE
+    elif flag & 2:
+        return Specifier.RESOURCE_NAME
+    elif flag & 8:
+        return Specifier.PANORAMA
+    elif flag & 16:
+        return Specifier.SOUNDEVENT
+    elif flag & 32:
+        return Specifier.SUBCLASS
+    return Specifier.UNSPECIFIED
+
+
+_CONTAINER_TYPES = frozenset((_OBJECT, _ARRAY, _ARRAY_TYPED, _ARRAY_TYPED_BYTE_LENGTH, _ARRAY_TYPED_BYTE_LENGTH2))
+_CONSTANT_TYPES = frozenset((_NULL, _BOOLEAN_TRUE, _BOOLEAN_FALSE, _INT64_ZERO, _INT64_ONE, _DOUBLE_ZERO, _DOUBLE_ONE))
+
+_FLAG_SPECIFIERS = [_flag_to_specifier(flag) for flag in range(256)]
+_SPECIFIERS = {int(specifier): specifier for specifier in Specifier}
+
+_TYPED_ARRAY_CONSTANTS = {
+    KV3Type.DOUBLE_ZERO: (np.zeros, np.float64),
+    KV3Type.DOUBLE_ONE: (np.ones, np.float64),
+    KV3Type.INT64_ZERO: (np.zeros, np.int64),
+    KV3Type.INT64_ONE: (np.ones, np.int64),
+}
+
+
+class _Stream:
+    """One of the KV3 value sub-buffers viewed as an array of fixed size items with a cursor in item units."""
+    __slots__ = ('raw', 'pos', 'u8', 'i16', 'u16', 'i32', 'u32', 'f32', 'i64', 'u64', 'f64')
+
+    def __init__(self, buffer: Buffer, itemsize: int):
+        raw = buffer.data
+        if raw.format != 'B':
+            raw = raw.cast('B')
+        self.raw = raw
+        self.pos = buffer.tell() // itemsize
+        self.u8 = raw
+        if itemsize == 2:
+            self.i16 = raw.cast('h')
+            self.u16 = raw.cast('H')
+        elif itemsize == 4:
+            self.i32 = raw.cast('i')
+            self.u32 = raw.cast('I')
+            self.f32 = raw.cast('f')
+        elif itemsize == 8:
+            self.i64 = raw.cast('q')
+            self.u64 = raw.cast('Q')
+            self.f64 = raw.cast('d')
+
+    def read_array(self, dtype, count: int) -> np.ndarray:
+        itemsize = np.dtype(dtype).itemsize
+        array = np.frombuffer(self.raw, dtype, count, self.pos * itemsize)
+        self.pos += count
+        return array
+
+
+class _Columns:
+    __slots__ = ('bytes', 'shorts', 'ints', 'doubles')
+
+    def __init__(self, byte_stream: _Stream, short_stream: Optional[_Stream], int_stream: _Stream,
+                 double_stream: _Stream):
+        self.bytes = byte_stream
+        self.shorts = short_stream
+        self.ints = int_stream
+        self.doubles = double_stream
+
+
+class KV3ColumnarDecoder:
+    """Decodes a binary KV3 tree by walking the type stream once and indexing into typed views of the
+    byte/short/int/double sub-buffers, instead of going through a reader function and struct.unpack per scalar.
+
+    Produces the same tree as KV3ContextNew.read_value, wrapper types are kept since loaders rely on them,
+    but specifier is only assigned when it differs from the class default.
+    Legacy (VKV3) streams interleave everything in one buffer and are not supported.
+
+    In lazy mode objects are returned as LazyObject: member names are indexed in one pass and container members
+    (objects, arrays) are skipped over, recording stream positions so they can be decoded when accessed."""
+
+    def __init__(self, context: 'KV3ContextNew', type_format: int, lazy: bool = False):
+        self._stream_cache: dict[int, _Stream] = {}
+        self._strings = context.strings
+        self._columns0 = self._make_columns(context.buffer0)
+        self._columns1 = self._make_columns(context.buffer1)
+        self._active = self._columns1 if context.active_buffer is context.buffer1 else self._columns0
+        self._counts = self._make_stream(context.object_member_count_buffer, 4)
+        self._types = context.types_buffer.data
+        self._type_pos = context.types_buffer.tell()
+        self._type_format = type_format
+        self._type_mask = 0x7F if type_format == TYPE_FORMAT_V1 else 0x3F
+        self._blob_sizes = context.binary_blob_sizes
+        self._blob_id = 0
+        self._blobs = self._make_stream(context.binary_blob_buffer, 1)
+        self._setitem = Object.__setitem__ if kv3_types.DEBUGGING else dict.__setitem__
+        self._lazy = lazy
+        self._streams = list(self._stream_cache.values())
+
+    def _make_stream(self, buffer: Optional[Buffer], itemsize: int) -> Optional[_Stream]:
+        if buffer is None:
+            return None
+        # Same Buffer object may back several roles (member counts live in the int buffer before v5)
+        if (stream := self._stream_cache.get(id(buffer), None)) is None:
+            stream = self._stream_cache[id(buffer)] = _Stream(buffer, itemsize)
+        return stream
+
+    def _make_columns(self, buffers) -> _Columns:
+        return _Columns(self._make_stream(buffers.byte_buffer, 1),
+                        self._make_stream(buffers.short_buffer, 2),
+                        self._make_stream(buffers.int_buffer, 4),
+                        self._make_stream(buffers.double_buffer, 8))
+
+    def decode(self) -> AnyKVType:
+        return self.read_value()
+
+    def _save_state(self) -> tuple:
+        return (self._type_pos, self._blob_id, self._active is self._columns0,
+                tuple(stream.pos for stream in self._streams))
+
+    def _decode_at(self, state: tuple) -> AnyKVType:
+        self._type_pos, self._blob_id, use_columns0, positions = state
+        self._active = self._columns0 if use_columns0 else self._columns1
+        for stream, pos in zip(self._streams, positions):
+            stream.pos = pos
+        return self.read_value()
+
+    def _read_type(self) -> tuple[int, Specifier]:
+        types = self._types
+        pos = self._type_pos
+        data_type = types[pos]
+        pos += 1
+        specifier = _UNSPECIFIED
+        if self._type_format == TYPE_FORMAT_V5:
+            if data_type & 0x80:
+                specifier = _SPECIFIERS.get(types[pos], None) or Specifier(types[pos])
+                pos += 1
+            if data_type & 0x40:
+                raise NotImplementedError(f"t & 0x40 != 0: {data_type & 0x40}")
+            data_type &= 63
+        elif data_type & 0x80:
+            data_type &= self._type_mask
+            specifier = _FLAG_SPECIFIERS[types[pos]]
+            pos += 1
+        self._type_pos = pos
+        return data_type, specifier
+
+    def read_value(self) -> AnyKVType:
+        data_type, specifier = self._read_type()
+        return self._read(data_type, specifier)
+
+    def _read(self, data_type: int, specifier: Specifier) -> Any:
+        if data_type == _OBJECT:
+            counts = self._counts
+            member_count = counts.u32[counts.pos]
+            counts.pos += 1
+            if self._lazy:
+                return self._read_lazy_object(member_count, specifier)
+            strings = self._strings
+            setitem = self._setitem
+            obj = Object()
+            for i in range(member_count):
+                ints = self._active.ints
+                name_id = ints.i32[ints.pos]
+                ints.pos += 1
+                setitem(obj, strings[name_id] if name_id != -1 else str(i), self.read_value())
+            if specifier is not _UNSPECIFIED:
+                obj.specifier = specifier
+            return obj
+
+        active = self._active
+        if data_type == _STRING:
+            ints = active.ints
+            str_id = ints.i32[ints.pos]
+            ints.pos += 1
+            value = String(self._strings[str_id] if str_id != -1 else '')
+        elif data_type == _INT32:
+            ints = active.ints
+            value = Int32(ints.i32[ints.pos])
+            ints.pos += 1
+        elif data_type == _FLOAT:
+            ints = active.ints
+            value = Float(ints.f32[ints.pos])
+            ints.pos += 1
+        elif data_type == _DOUBLE:
+            doubles = active.doubles
+            value = Double(doubles.f64[doubles.pos])
+            doubles.pos += 1
+        elif data_type == _ARRAY:
+            ints = active.ints
+            count = ints.i32[ints.pos]
+            ints.pos += 1
+            return Array([self.read_value() for _ in range(count)])
+        elif data_type == _ARRAY_TYPED:
+            ints = active.ints
+            count = ints.u32[ints.pos]
+            ints.pos += 1
+            return self._read_typed_array(count, specifier)
+        elif data_type == _ARRAY_TYPED_BYTE_LENGTH:
+            byte_stream = active.bytes
+            count = byte_stream.u8[byte_stream.pos]
+            byte_stream.pos += 1
+            return self._read_typed_array(count, specifier)
+        elif data_type == _ARRAY_TYPED_BYTE_LENGTH2:
+            byte_stream = active.bytes
+            count = byte_stream.u8[byte_stream.pos]
+            byte_stream.pos += 1
+            assert specifier == Specifier.UNSPECIFIED, f"Unsupported specifier {specifier!r}"
+            self._active = self._columns0
+            array = self._read_typed_array(count, specifier)
+            self._active = self._columns1
+            return array
+        elif data_type == _BOOLEAN:
+            byte_stream = active.bytes
+            value = Bool(byte_stream.u8[byte_stream.pos] == 1)
+            byte_stream.pos += 1
+        elif data_type == _NULL:
+            return None
+        elif data_type == _BOOLEAN_TRUE:
+            return Bool(True)
+        elif data_type == _BOOLEAN_FALSE:
+            return Bool(False)
+        elif data_type == _INT64_ZERO:
+            return Int64(0)
+        elif data_type == _INT64_ONE:
+            return Int64(1)
+        elif data_type == _DOUBLE_ZERO:
+            return Double(0.0)
+        elif data_type == _DOUBLE_ONE:
+            return Double(1.0)
+        elif data_type == _UINT32:
+            ints = active.ints
+            value = UInt32(ints.u32[ints.pos])
+            ints.pos += 1
+        elif data_type == _INT64:
+            doubles = active.doubles
+            value = Int64(doubles.i64[doubles.pos])
+            doubles.pos += 1
+        elif data_type == _UINT64:
+            doubles = active.doubles
+            value = UInt64(doubles.u64[doubles.pos])
+            doubles.pos += 1
+        elif data_type == _INT16:
+            shorts = active.shorts
+            value = Int32(shorts.i16[shorts.pos])
+            shorts.pos += 1
+        elif data_type == _UINT16:
+            shorts = active.shorts
+            value = UInt32(shorts.u16[shorts.pos])
+            shorts.pos += 1
+        elif data_type == _INT8:
+            # Read as unsigned, same as _read_int8
+            byte_stream = active.bytes
+            value = Int32(byte_stream.u8[byte_stream.pos])
+            byte_stream.pos += 1
+        elif data_type == _UINT8:
+            byte_stream = active.bytes
+            value = UInt32(byte_stream.u8[byte_stream.pos])
+            byte_stream.pos += 1
+        elif data_type == _BINARY_BLOB:
+            value = self._read_blob()
+        else:
+            raise NotImplementedError(f"Reader for {data_type!r} not implemented")
+        if specifier is not _UNSPECIFIED:
+            value.specifier = specifier
+        return value
+
+    def _read_lazy_object(self, member_count: int, specifier: Specifier) -> LazyObject:
+        strings = self._strings
+        obj = LazyObject()
+        for i in range(member_count):
+            ints = self._active.ints
+            name_id = ints.i32[ints.pos]
+            ints.pos += 1
+            name = strings[name_id] if name_id != -1 else str(i)
+            state = self._save_state()
+            data_type, member_specifier = self._read_type()
+            if data_type in _CONTAINER_TYPES:
+                self._skip(data_type)
+                dict.__setitem__(obj, name, PendingValue(self._decode_at, state))
+            else:
+                dict.__setitem__(obj, name, self._read(data_type, member_specifier))
+        if specifier is not _UNSPECIFIED:
+            obj.specifier = specifier
+        return obj
+
+    def _skip_value(self):
+        self._skip(self._read_type()[0])
+
+    def _skip(self, data_type: int):
+        """Advances the streams past a value of data_type without building it."""
+        active = self._active
+        if data_type == _OBJECT:
+            counts = self._counts
+            member_count = counts.u32[counts.pos]
+            counts.pos += 1
+            for _ in range(member_count):
+                self._active.ints.pos += 1
+                self._skip_value()
+        elif data_type in (_STRING, _INT32, _FLOAT, _UINT32):
+            active.ints.pos += 1
+        elif data_type in (_DOUBLE, _INT64, _UINT64):
+            active.doubles.pos += 1
+        elif data_type in (_BOOLEAN, _INT8, _UINT8):
+            active.bytes.pos += 1
+        elif data_type in (_INT16, _UINT16):
+            active.shorts.pos += 1
+        elif data_type == _ARRAY:
+            ints = active.ints
+            count = ints.i32[ints.pos]
+            ints.pos += 1
+            for _ in range(count):
+                self._skip_value()
+        elif data_type == _ARRAY_TYPED:
+            ints = active.ints
+            count = ints.u32[ints.pos]
+            ints.pos += 1
+            self._skip_typed_array(count)
+        elif data_type == _ARRAY_TYPED_BYTE_LENGTH:
+            byte_stream = active.bytes
+            count = byte_stream.u8[byte_stream.pos]
+            byte_stream.pos += 1
+            self._skip_typed_array(count)
+        elif data_type == _ARRAY_TYPED_BYTE_LENGTH2:
+            byte_stream = active.bytes
+            count = byte_stream.u8[byte_stream.pos]
+            byte_stream.pos += 1
+            self._active = self._columns0
+            self._skip_typed_array(count)
+            self._active = self._columns1
+        elif data_type == _BINARY_BLOB:
+            if self._blob_sizes is not None:
+                self._blobs.pos += self._blob_sizes[self._blob_id]
+                self._blob_id += 1
+            else:
+                ints = active.ints
+                size = ints.i32[ints.pos]
+                ints.pos += 1
+                active.bytes.pos += size
+        elif data_type not in _CONSTANT_TYPES:
+            raise NotImplementedError(f"Reader for {data_type!r} not implemented")
+
+    def _skip_typed_array(self, count: int):
+        data_type = self._read_type()[0]
+        active = self._active
+        if data_type in _TYPED_ARRAY_CONSTANTS:
+            return
+        elif data_type in (_DOUBLE, _INT64, _UINT64):
+            active.doubles.pos += count
+        elif data_type in (_INT32, _UINT32):
+            active.ints.pos += count
+        else:
+            for _ in range(count):
+                self._skip(data_type)
+
+    def _read_blob(self) -> BinaryBlob:
+        if self._blob_sizes is not None:
+            expected_size = self._blob_sizes[self._blob_id]
+            self._blob_id += 1
+            if expected_size == 0:
+                return BinaryBlob(b"")
+            blobs = self._blobs
+            data = blobs.raw[blobs.pos:blobs.pos + expected_size]
+            blobs.pos += len(data)
+            assert len(data) == expected_size, "Binary blob is smaller than expected"
+            return BinaryBlob(data)
+        active = self._active
+        ints = active.ints
+        size = ints.i32[ints.pos]
+        ints.pos += 1
+        byte_stream = active.bytes
+        data = byte_stream.raw[byte_stream.pos:byte_stream.pos + size]
+        byte_stream.pos += len(data)
+        return BinaryBlob(data)
+
+    def _read_typed_array(self, count: int, specifier: Specifier):
+        data_type, data_specifier = self._read_type()
+        active = self._active
+        if (constant := _TYPED_ARRAY_CONSTANTS.get(data_type, None)) is not None:
+            factory, dtype = constant
+            return factory(count, dtype)
+        elif data_type == _DOUBLE:
+            return active.doubles.read_array(np.float64, count)
+        elif data_type == _INT64:
+            return active.doubles.read_array(np.int64, count)
+        elif data_type == _UINT64:
+            return active.doubles.read_array(np.uint64, count)
+        elif data_type == _INT32:
+            return active.ints.read_array(np.int32, count)
+        elif data_type == _UINT32:
+            return active.ints.read_array(np.uint32, count)
+        array = TypedArray(KV3Type(data_type), data_specifier,
+                           [self._read(data_type, data_specifier) for _ in range(count)])
+        if specifier is not _UNSPECIFIED:
+            array.specifier = specifier
+        return array
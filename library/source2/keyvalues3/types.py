@@ -1,7 +1,7 @@
 import abc
 from functools import partial
 from types import NoneType
-from typing import Collection, Optional, TypeVar
+from typing import Any, Callable, Collection, Optional, TypeVar
 
 import numpy as np
 
@@ -123,6 +123,94 @@ class Object(BaseType, dict):
         return {k: v.to_dict() for (k, v) in self.items()}
 
 
+class PendingValue:
+    """Placeholder for a value that is decoded on first access, see LazyMembersMixin."""
+    __slots__ = ('_loader', '_state')
+
+    def __init__(self, loader: Callable[[Any], Any], state: Any):
+        self._loader = loader
+        self._state = state
+
+    def resolve(self):
+        return self._loader(self._state)
+
+    def __repr__(self):
+        return '<pending>'
+
+
+class LazyMembersMixin:
+    """Mixin for dict based containers that may hold PendingValue members.
+    Members are decoded and stored on first access, iterating values or items decodes everything."""
+
+    def _resolve_key(self, key):
+        value = dict.__getitem__(self, key)
+        if type(value) is PendingValue:
+            value = value.resolve()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __getitem__(self, item):
+        if isinstance(item, tuple):
+            for key in item:
+                if dict.__contains__(self, key):
+                    return self._resolve_key(key)
+            raise KeyError(item)
+        else:
+            return self._resolve_key(item)
+
+    def __iter__(self):
+        # Defined so dict(obj) and {**obj} go through __getitem__ instead of copying placeholders
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            return self._resolve_key(key)
+        return default
+
+    def setdefault(self, key, default=None):
+        if dict.__contains__(self, key):
+            return self._resolve_key(key)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *default):
+        if dict.__contains__(self, key):
+            self._resolve_key(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self.materialize()
+        return dict.popitem(self)
+
+    def materialize(self):
+        for key in dict.keys(self):
+            self._resolve_key(key)
+        return self
+
+    def raw_items(self):
+        """Items without decoding pending members."""
+        return dict.items(self)
+
+    def values(self):
+        return dict.values(self.materialize())
+
+    def items(self):
+        return dict.items(self.materialize())
+
+    def copy(self):
+        return dict.copy(self.materialize())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyMembersMixin):
+            other.materialize()
+        return dict.__eq__(self.materialize(), other)
+
+    __hash__ = None
+
+
+class LazyObject(LazyMembersMixin, Object):
+    pass
+
+
 class Array(BaseType, list[T]):
     def __init__(self, initial: Optional[list[T]] = None):
         super(Array, self).__init__(initial)
@@ -177,6 +265,6 @@ class TypedArray(BaseType, list[T]):
 
 AnyKVType = Object | NullObject | String | Bool | Int64 | Int32 | UInt64 | UInt32 | Double | Float | BinaryBlob | Array | TypedArray
 
-__all__ = ['BaseType', 'Object', 'NullObject', 'String', 'Bool',
+__all__ = ['BaseType', 'Object', 'LazyObject', 'LazyMembersMixin', 'PendingValue', 'NullObject', 'String', 'Bool',
            'Int64', 'UInt32', 'UInt64', 'Int32', 'Double', 'Float',
            'BinaryBlob', 'Array', 'TypedArray', 'AnyKVType']
@@ -1,8 +1,17 @@
 import math
+from dataclasses import dataclass
+from typing import Collection, Optional
 
 import numpy as np
 
-from SourceIO.library.utils import Buffer, MemoryBuffer
+from SourceIO.library.utils import MemoryBuffer
+from SourceIO.logger import SourceLogMan
+
+log_manager = SourceLogMan()
+logger = log_manager.get_logger('Source2 Animations')
+
+
+_QUAT_SCALE = math.sin(math.pi / 4.0) / 16384
 
 
 class _Decoder:
@@ -38,48 +47,86 @@ class _Decoder:
         else:
             raise NotImplementedError(f"Unknown decoder type {self.name}")
 
-    def read_element(self, reader: Buffer):
-        if 'O' in self._type:
-            return self._read_quat(reader.read(6))
-        elif 'Y' in self._type:
-            count = int(self._type[:-1])
-            return [reader.read_half() for _ in range(count)]
+    def decode(self, data: memoryview, count: int) -> np.ndarray:
+        """Decodes count packed elements at once, returns (count, components) float32 array."""
+        if self._type == 'O':
+            return _decode_quaternions(np.frombuffer(data, '<u2', count * 3).reshape((-1, 3)))
+        elif self._type == '3Y':
+            return np.frombuffer(data, '<f2', count * 3).reshape((-1, 3)).astype(np.float32)
+        elif self._type == '3f':
+            return np.frombuffer(data, '<f4', count * 3).reshape((-1, 3)).copy()
         else:
-            return reader.read_fmt(self._type)
-
-    @staticmethod
-    def _read_quat(data):
-
-        i1 = data[0] + ((data[1] & 63) << 8)
-        i2 = data[2] + ((data[3] & 63) << 8)
-        i3 = data[4] + ((data[5] & 63) << 8)
-
-        # Signs
-        s1 = data[1] & 128
-        s2 = data[3] & 128
-        s3 = data[5] & 128
-
-        c = math.sin(math.pi / 4.0) / 16384
-        t1 = math.sin(math.pi / 4.0)
-        x = c * (i1 - 16384) if (data[1] & 64) == 0 else c * i1
-        y = c * (i2 - 16384) if (data[3] & 64) == 0 else c * i2
-        z = c * (i3 - 16384) if (data[5] & 64) == 0 else c * i3
-
-        w = math.sqrt(1 - (x * x) - (y * y) - (z * z))
-
-        # Apply sign 3:
-        if s3 == 128:
-            w *= -1
-
-        # Apply sign 1 and 2
-        if s1 == 128:
-            return (y, z, w, x) if s2 == 128 else (z, w, x, y)
-
-        return (w, x, y, z) if s2 == 128 else (x, y, z, w)
-
-
-def parse_anim_data(anim_block: dict, agroup_block: dict):
-    print("Parsing animation data")
+            return np.frombuffer(data, '<f4', count).reshape((-1, 1)).copy()
+
+
+def _decode_quaternions(packed: np.ndarray) -> np.ndarray:
+    """48 bit quaternions: three 14 bit components, bit 14 selects the component bias,
+    bit 15 of the first two words selects which component was dropped, of the last one the sign of it."""
+    values = (packed & 0x3FFF).astype(np.float32)
+    values -= np.where(packed & 0x4000, 0, 16384).astype(np.float32)
+    values *= _QUAT_SCALE
+    w = np.sqrt(np.maximum(1 - np.einsum('ij,ij->i', values, values), 0))
+    w[(packed[:, 2] & 0x8000) != 0] *= -1
+    xyzw = np.concatenate((values, w[:, None]), axis=1)
+    # (x, y, z, w) rotated right by dropped component index
+    shift = ((packed[:, 0] >> 15) * 2 + (packed[:, 1] >> 15)).astype(np.intp)
+    order = (np.arange(4)[None, :] - shift[:, None]) % 4
+    return np.take_along_axis(xyzw, order, axis=1)
+
+
+@dataclass(slots=True)
+class SegmentData:
+    decoder_name: str
+    channel_class: str
+    variable_name: str
+    element_names: list[str]
+    values: np.ndarray  # (frames, elements, components)
+
+    def frame_values(self, frame_id: int) -> np.ndarray:
+        # Static segments hold a single frame, used for every frame of the block
+        if frame_id >= len(self.values):
+            frame_id = 0
+        return self.values[frame_id]
+
+
+def decode_segment(segment, decode_key, decoder_array) -> Optional[SegmentData]:
+    """Decodes every frame of a segment into (frames, elements, components) array."""
+    container = MemoryBuffer(segment['m_container'])
+    if not container.size():
+        return None
+    local_channel = segment['m_nLocalChannel']
+    data_channel = decode_key['m_dataChannelArray'][local_channel]
+    element_bones = np.zeros(decode_key['m_nChannelElements'], dtype=np.uint32)
+    element_bones[np.asarray(data_channel['m_nElementIndexArray'], np.intp)] = np.arange(
+        len(data_channel['m_nElementIndexArray']), dtype=np.uint32)
+
+    d = decoder_array[container.read_int16()]
+    decoder = _Decoder(d['m_szName'], d['m_nType'], d['m_nVersion'])
+    cardinality = container.read_int16()
+    bone_count = container.read_int16()
+    total_size = container.read_int16()
+    elements = np.frombuffer(container.read(2 * bone_count), dtype=np.uint16)
+
+    stride = decoder.size * bone_count
+    frame_count = container.remaining() // stride if stride else 0
+    if frame_count == 0:
+        return None
+    data = container.data[container.tell():container.tell() + frame_count * stride]
+    values = decoder.decode(data, frame_count * bone_count).reshape((frame_count, bone_count, -1))
+
+    bone_names = data_channel['m_szElementNameArray']
+    element_names = [bone_names[bone] for bone in element_bones[elements].tolist()]
+    return SegmentData(decoder.name, data_channel['m_szChannelClass'], data_channel['m_szVariableName'],
+                       element_names, values)
+
+
+def parse_anim_data(anim_block: dict, agroup_block: dict, names: Optional[Collection[str]] = None):
+    """Decodes animations of anim_block, only the ones listed in names if given.
+
+    Not called by the Blender importer yet, Source2 animation import is still a TODO item.
+    The old ValveCompiledModelLoader.load_animations (commented out in blender_bindings/source2/vmdl_loader.py)
+    shows the intended use: ANIM and AGRP blocks from CTRL['embedded_animation'] go in here,
+    and Frame.bone_data 'Position'/'Angle' values become armature pose keyframes."""
     anim_array = anim_block['m_animArray']
     animations: list[Animation] = []
     if len(anim_array) == 0:
@@ -88,66 +135,52 @@ def parse_anim_data(anim_block: dict, agroup_block: dict):
     decoder_array = anim_block['m_decoderArray']
     segment_array = anim_block['m_segmentArray']
     decode_key = agroup_block['m_decodeKey']
+    # Segments are shared between frames and animations, each is decoded once
+    segment_cache: dict[int, Optional[SegmentData]] = {}
     for anim in anim_array:
-        print(f"Parsing {anim['m_name']}")
-        animations.append(parse_anim(anim, decode_key, decoder_array, segment_array))
+        if names is not None and anim['m_name'] not in names:
+            continue
+        logger.debug(f"Parsing {anim['m_name']}")
+        animations.append(parse_anim(anim, decode_key, decoder_array, segment_array, segment_cache))
+    logger.info(f"Parsed {len(animations)} animations, {len(segment_cache)} segments")
     return animations
 
 
-def parse_anim(anim_desc, decode_key, decoder_array, segment_array):
+def parse_anim(anim_desc, decode_key, decoder_array, segment_array,
+               segment_cache: Optional[dict[int, Optional[SegmentData]]] = None):
+    if segment_cache is None:
+        segment_cache = {}
     p_data = anim_desc['m_pData']
     frame_block_array = p_data['m_frameblockArray']
     frame_count = p_data['m_nFrames']
     animation = Animation(anim_desc['m_name'], anim_desc['fps'])
+    blocks = []
+    for frame_block in frame_block_array:
+        segments = []
+        for segment_index in frame_block['m_segmentIndexArray']:
+            if segment_index not in segment_cache:
+                segment_cache[segment_index] = decode_segment(segment_array[segment_index], decode_key,
+                                                              decoder_array)
+            if (segment := segment_cache[segment_index]) is not None:
+                segments.append(segment)
+        blocks.append((frame_block['m_nStartFrame'], frame_block['m_nEndFrame'], segments))
+
     for frame_id in range(frame_count):
         frame = Frame()
-        for frame_block in frame_block_array:
-            start = frame_block['m_nStartFrame']
-            end = frame_block['m_nEndFrame']
+        for start, end, segments in blocks:
             if start <= frame_id <= end:
-                for segment_index in frame_block['m_segmentIndexArray']:
-                    parse_segment(min(max(frame_id - start, 0), frame_count),
-                                  frame,
-                                  segment_array[segment_index],
-                                  decode_key,
-                                  decoder_array)
+                for segment in segments:
+                    parse_segment(min(max(frame_id - start, 0), frame_count), frame, segment)
         animation.add_frame(frame)
     return animation
 
 
-def parse_segment(frame_id, frame: 'Frame', segment, decode_key, decoder_array):
-    local_channel = segment['m_nLocalChannel']
-    data_channel = decode_key['m_dataChannelArray'][local_channel]
-    container = MemoryBuffer(segment['m_container'])
-
-    element_index_array = data_channel['m_nElementIndexArray']
-    element_bones = np.zeros(decode_key['m_nChannelElements'], dtype=np.uint32)
-
-    for i, index in enumerate(element_index_array):
-        element_bones[index] = i
-
-    if container.size():
-        d = decoder_array[container.read_int16()]
-        decoder = _Decoder(d['m_szName'], d['m_nType'], d['m_nVersion'])
-        # print(f"Reading {d}")
-        cardinality = container.read_int16()
-        bone_count = container.read_int16()
-        total_size = container.read_int16()
-
-        elements = np.frombuffer(container.read(2 * bone_count), dtype=np.uint16)
-
-        if container.tell() + (decoder.size * frame_id * bone_count) < container.size():
-            container.skip(decoder.size * frame_id * bone_count)
-
-        bone_names = data_channel['m_szElementNameArray']
-        channel_name = data_channel['m_szChannelClass']
-        channel_attr_name = data_channel['m_szVariableName']
-
-        for bone_id in range(bone_count):
-            bone = element_bones[elements[bone_id]]
-            value = decoder.read_element(container)
-            frame.set_attribute(bone_names[bone], channel_name, channel_attr_name,
-                                (decoder.name,value ))
+def parse_segment(frame_id, frame: 'Frame', segment: SegmentData):
+    channel_name = segment.channel_class
+    channel_attr_name = segment.variable_name
+    decoder_name = segment.decoder_name
+    for bone_name, value in zip(segment.element_names, segment.frame_values(frame_id).tolist()):
+        frame.set_attribute(bone_name, channel_name, channel_attr_name, (decoder_name, value))
 
 
 class Frame:
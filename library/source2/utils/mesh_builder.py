@@ -0,0 +1,168 @@
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Optional
+
+import numpy as np
+
+from SourceIO.library.source2.blocks.vertex_index_buffer import IndexBuffer, VertexBuffer
+from SourceIO.library.source2.common import convert_normals, convert_normals_2
+
+
+class RenderMeshDrawPrimitiveFlags(IntEnum):
+    NONE = 0x0,
+    UseShadowFastPath = 0x1,
+    UseCompressedNormalTangent = 0x2,
+    IsOccluder = 0x4,
+    InputLayoutIsNotMatchedToMaterial = 0x8,
+    HasBakedLightingFromVertexStream = 0x10,
+    HasBakedLightingFromLightmap = 0x20,
+    CanBatchWithDynamicShaderConstants = 0x40,
+    DrawLast = 0x80,
+    HasPerInstanceBakedLightingData = 0x100,
+
+
+def use_compressed_normals(draw_call: dict):
+    if draw_call.get('m_bUseCompressedNormalTangent', False):
+        return True
+    if "m_nFlags" not in draw_call:
+        return False
+    flags = draw_call["m_nFlags"]
+    if isinstance(flags, int):
+        return flags & RenderMeshDrawPrimitiveFlags.UseCompressedNormalTangent
+    else:
+        return "MESH_DRAW_FLAGS_USE_COMPRESSED_NORMAL_TANGENT" in flags or "USE_COMPRESSED_NORMAL_TANGENT" in flags
+
+
+def convert_to_float32(uv_array: np.ndarray):
+    if uv_array.dtype == np.float32 or uv_array.dtype == np.float16:
+        return uv_array
+    dtype_info = np.iinfo(uv_array.dtype)
+    dtype_min, dtype_max = dtype_info.min, dtype_info.max
+
+    if uv_array.shape[1] == 4:
+        uv_array = uv_array[:, :2]
+
+    if dtype_info.kind == 'u':  # Unsigned type
+        return (uv_array.astype(np.float32) - dtype_min) / (dtype_max - dtype_min)
+    else:  # Signed type
+        return (uv_array.astype(np.float32) - dtype_min) / (dtype_max - dtype_min) * 2 - 1
+
+
+def compact_indices(indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Same result as np.unique(indices, return_inverse=True) for non-negative indices, in linear time.
+    Returns sorted ids of used vertices and indices remapped into them, shaped as triangles."""
+    flat = indices.ravel()
+    if flat.size == 0:
+        return np.empty(0, np.intp), np.empty((0, 3), np.uint32)
+    used = np.zeros(int(flat.max()) + 1, np.bool_)
+    used[flat] = True
+    used_ids = np.flatnonzero(used)
+    remap = np.empty(used.size, np.uint32)
+    remap[used_ids] = np.arange(used_ids.size, dtype=np.uint32)
+    return used_ids, remap[flat].reshape((-1, 3))
+
+
+def decode_blend_weights(vertices: np.ndarray, vertex_buffer: VertexBuffer
+                         ) -> tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Returns (bone indices, weights) of vertices, indices are local to the mesh remapping table."""
+    has_weights = vertex_buffer.has_attribute('BLENDWEIGHT')
+    has_indicies = vertex_buffer.has_attribute('BLENDINDICES')
+    if not has_indicies:
+        return None, None
+
+    indices_array = vertices["BLENDINDICES"]
+    if indices_array.dtype == np.uint8:
+        indices_array = indices_array.astype(np.uint32)
+    elif indices_array.dtype == np.uint16:
+        indices_array = indices_array.view(np.uint8).astype(np.uint32).reshape(-1, 8)
+    elif has_weights and indices_array.dtype == np.int16:
+        indices_array = indices_array.view(np.uint8).astype(np.uint32).reshape(-1, 8)
+    elif has_weights and indices_array.dtype == np.int32:
+        indices_array = indices_array.view(np.uint16).astype(np.uint32).reshape(-1, 8)
+    else:
+        raise NotImplementedError(f"Blendindices of type {indices_array.dtype} not supported")
+
+    if not has_weights:
+        return indices_array, np.ones_like(indices_array, dtype=np.float32)
+    blendweights = vertices["BLENDWEIGHT"]
+    if blendweights.dtype == np.uint8:
+        weights_array = blendweights.astype(np.float32)
+    elif blendweights.dtype == np.uint16:
+        weights_array = blendweights.view(np.uint8).astype(np.float32).reshape(-1, 8)
+    else:
+        raise NotImplementedError(f"Blendweights of type {blendweights.dtype} not supported")
+    return indices_array, weights_array / 255
+
+
+@dataclass(slots=True)
+class DrawCallMesh:
+    vertex_ids: np.ndarray
+    indices: np.ndarray
+    positions: np.ndarray
+    normals: Optional[np.ndarray] = None
+    uvs: dict[str, np.ndarray] = field(default_factory=dict)
+    colors: Optional[np.ndarray] = None
+    bone_indices: Optional[np.ndarray] = None
+    bone_weights: Optional[np.ndarray] = None
+
+    @property
+    def vertex_count(self):
+        return len(self.positions)
+
+
+class MeshBuilder:
+    """Turns draw calls of a Source 2 mesh into per draw call numpy arrays, without any Blender dependency.
+
+    Vertex ids are relative to the draw call base vertex, UVs are float32 with V flipped.
+    """
+
+    def __init__(self, vertex_buffers: list[VertexBuffer], index_buffers: list[IndexBuffer], scale: float = 1.0):
+        self.vertex_buffers = vertex_buffers
+        self.index_buffers = index_buffers
+        self.scale = scale
+
+    def get_buffers(self, draw_call: dict) -> tuple[VertexBuffer, IndexBuffer]:
+        assert len(draw_call['m_vertexBuffers']) == 1
+        vertex_buffer = self.vertex_buffers[draw_call['m_vertexBuffers'][0]['m_hBuffer']]
+        index_buffer = self.index_buffers[draw_call['m_indexBuffer']['m_hBuffer']]
+        return vertex_buffer, index_buffer
+
+    def build(self, draw_call: dict) -> DrawCallMesh:
+        assert draw_call['m_nPrimitiveType'] in [5, 'RENDER_PRIM_TRIANGLES']
+        vertex_buffer, index_buffer = self.get_buffers(draw_call)
+        base_vertex = draw_call['m_nBaseVertex']
+        start_index = draw_call['m_nStartIndex'] // 3
+        index_count = draw_call['m_nIndexCount'] // 3
+
+        part_indices = index_buffer.get_indices()[start_index:start_index + index_count]
+        vertex_ids, indices = compact_indices(part_indices)
+        used_vertices = vertex_buffer.get_vertices()[base_vertex:][vertex_ids]
+
+        mesh = DrawCallMesh(vertex_ids, indices, used_vertices['POSITION'] * self.scale)
+        if vertex_buffer.has_attribute('NORMAL'):
+            normals = used_vertices['NORMAL']
+            if use_compressed_normals(draw_call):
+                if normals.dtype == np.uint32:
+                    normals = convert_normals_2(normals)
+                else:
+                    normals = convert_normals(normals)
+            mesh.normals = normals
+        for uv_id in range(16):
+            attrib_name = "TEXCOORD" if uv_id == 0 else f"TEXCOORD_{uv_id}"
+            if not vertex_buffer.has_attribute(attrib_name):
+                continue
+            uv_layer = used_vertices[attrib_name].copy()
+            if uv_layer.shape[1] < 2:
+                continue
+            if uv_layer.shape[1] == 4:
+                layers = {attrib_name: convert_to_float32(uv_layer[:, :2]),
+                          attrib_name + "_2": convert_to_float32(uv_layer[:, 2:])}
+            else:
+                layers = {attrib_name: convert_to_float32(uv_layer)}
+            for name, layer in layers.items():
+                layer[:, 1] = np.subtract(1, layer[:, 1])
+                mesh.uvs[name] = layer
+        if vertex_buffer.has_attribute('COLOR'):
+            mesh.colors = used_vertices['COLOR']
+        mesh.bone_indices, mesh.bone_weights = decode_blend_weights(used_vertices, vertex_buffer)
+        return mesh
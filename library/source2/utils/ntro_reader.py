@@ -1,6 +1,7 @@
+import struct
 from abc import ABC
-from dataclasses import dataclass
-from typing import Union, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Union
 
 import numpy as np
 
@@ -13,6 +14,36 @@ from SourceIO.library.utils import MemoryBuffer, Buffer
 from SourceIO.library.utils.file_utils import MemorySlice
 
 
+_NTRO_TO_KV3 = {
+    KeyValueDataType.STRUCT: KV3Type.OBJECT,
+    KeyValueDataType.ENUM: KV3Type.STRING,
+    KeyValueDataType.EXTERNAL_REFERENCE: KV3Type.STRING,
+    KeyValueDataType.STRING: KV3Type.STRING,
+    KeyValueDataType.BYTE: KV3Type.INT32,
+    KeyValueDataType.UBYTE: KV3Type.UINT32,
+    KeyValueDataType.SHORT: KV3Type.INT32,
+    KeyValueDataType.USHORT: KV3Type.UINT32,
+    KeyValueDataType.INTEGER: KV3Type.INT32,
+    KeyValueDataType.UINTEGER: KV3Type.UINT32,
+    KeyValueDataType.INT64: KV3Type.INT64,
+    KeyValueDataType.UINT64: KV3Type.UINT64,
+    KeyValueDataType.FLOAT: KV3Type.DOUBLE,
+
+    KeyValueDataType.VECTOR2: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.VECTOR3: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.VECTOR4: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.QUATERNION: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.Fltx4: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.COLOR: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.BOOLEAN: KV3Type.BOOLEAN,
+    KeyValueDataType.NAME: KV3Type.STRING,
+    KeyValueDataType.Matrix3x4: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.Matrix3x4a: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.CTransform: KV3Type.ARRAY_TYPED,
+    KeyValueDataType.Vector4D_44: KV3Type.ARRAY_TYPED,
+}
+
+
 @dataclass
 class ResourceIntrospectionInfo:
     version: int
@@ -23,6 +54,7 @@ class ResourceIntrospectionInfo:
     enum_lookup: dict[str | int, Enum]
 
     resource_list: dict[int, str]
+    _plans: Optional[dict[int, 'StructPlan']] = field(default=None, repr=False, compare=False)
 
     def struct_by_pos(self, pos: int) -> Struct:
         return self.structs[pos]
@@ -37,247 +69,323 @@ class ResourceIntrospectionInfo:
         return self.enum_lookup[e_id]
 
     def read_struct(self, buffer: Buffer, struct: Struct) -> Union[NullObject, Object]:
-        data = Object()
+        struct_start = buffer.tell()
+        data = self.get_plan(struct).read(self, buffer, buffer.data, struct_start)
+        buffer.seek(struct_start + struct.disc_size)
+        return data
+
+    def get_plan(self, struct: Struct) -> 'StructPlan':
+        if self._plans is None:
+            self._plans = _PLAN_CACHE.setdefault(self.introspection_key(), {})
+        if (plan := self._plans.get(struct.id, None)) is None:
+            plan = self._plans[struct.id] = StructPlan(self, struct)
+        return plan
+
+    def introspection_key(self) -> tuple:
+        """Identifies the struct and enum layouts, compiled plans are shared between resources with the same key.
+        Enum values are part of it, as plans capture them when compiled."""
+        return (self.version,
+                tuple((st.id, st.name, st.disc_crc, st.user_version, st.disc_size, st.alignment, st.parent_struct_id,
+                       tuple((m.name, m.count, m.stride_offset, m.data_type, m.type, tuple(m.indirection_bytes))
+                             for m in st.members.values()))
+                      for st in self.structs),
+                tuple((en.id, en.name, en.disc_crc, en.user_version,
+                       tuple((value, enum_value.name) for value, enum_value in en.values.items()))
+                      for en in self.enums))
+
+
+_PLAN_CACHE: dict[tuple, dict[int, 'StructPlan']] = {}
+
+
+def clear_plan_cache():
+    _PLAN_CACHE.clear()
+
+
+_UINT32 = struct.Struct('<I')
+_UINT64 = struct.Struct('<Q')
+_OFFSET_AND_COUNT = struct.Struct('<2I')
+
+# Plain scalars: struct format, KV3 wrapper, numpy dtype
+_SCALAR_TYPES = {
+    KeyValueDataType.UBYTE: ('B', UInt32, np.uint8),
+    KeyValueDataType.BYTE: ('b', Int32, np.int8),
+    KeyValueDataType.SHORT: ('h', Int32, np.int16),
+    KeyValueDataType.USHORT: ('H', UInt32, np.uint16),
+    KeyValueDataType.INTEGER: ('i', Int32, np.int32),
+    KeyValueDataType.UINTEGER: ('I', UInt32, np.uint32),
+    KeyValueDataType.INT64: ('q', Int64, np.int64),
+    KeyValueDataType.UINT64: ('Q', UInt64, np.uint64),
+    KeyValueDataType.FLOAT: ('f', Double, np.float32),
+}
+# Float tuples returned as TypedArray of Double
+_VECTOR_TYPES = {
+    KeyValueDataType.VECTOR2: 2,
+    KeyValueDataType.VECTOR3: 3,
+    KeyValueDataType.VECTOR4: 4,
+    KeyValueDataType.QUATERNION: 4,
+    KeyValueDataType.Fltx4: 4,
+    KeyValueDataType.Vector4D_44: 4,
+    KeyValueDataType.CTransform: 7,
+}
+_MATRIX_TYPES = (KeyValueDataType.Matrix3x4, KeyValueDataType.Matrix3x4a)
+# Pointer arrays of these types are returned as numpy arrays
+_ARRAY_DTYPES = {
+    KeyValueDataType.QUATERNION: (np.float32, (4,)),
+    KeyValueDataType.VECTOR4: (np.float32, (4,)),
+    KeyValueDataType.VECTOR3: (np.float32, (3,)),
+    KeyValueDataType.VECTOR2: (np.float32, (2,)),
+    KeyValueDataType.Matrix3x4: (np.float32, (3, 4)),
+    KeyValueDataType.Matrix3x4a: (np.float32, (3, 4)),
+    KeyValueDataType.BYTE: (np.int8, ()),
+    KeyValueDataType.UBYTE: (np.uint8, ()),
+    KeyValueDataType.SHORT: (np.int16, ()),
+    KeyValueDataType.USHORT: (np.uint16, ()),
+    KeyValueDataType.INTEGER: (np.int32, ()),
+    KeyValueDataType.UINTEGER: (np.uint32, ()),
+    KeyValueDataType.INT64: (np.int64, ()),
+    KeyValueDataType.UINT64: (np.uint64, ()),
+    KeyValueDataType.FLOAT: (np.float32, ()),
+}
+
+# Compiled readers take (info, buffer, data, position), data is the buffer memory and position is absolute in it
+MemberReader = Callable[[ResourceIntrospectionInfo, Buffer, memoryview, int], Any]
+
+
+def _compile_value_reader(info: ResourceIntrospectionInfo, member: StructMember) -> tuple[MemberReader, int]:
+    """Returns reader of a single value of member type and its size in bytes."""
+    kv_type = member.type
+    if kv_type in _SCALAR_TYPES:
+        fmt, wrapper, _ = _SCALAR_TYPES[kv_type]
+        unpack = struct.Struct('<' + fmt).unpack_from
+
+        def read(_, __, data, pos):
+            return wrapper(unpack(data, pos)[0])
+
+        return read, struct.calcsize(fmt)
+    elif kv_type == KeyValueDataType.STRUCT:
+        struct_id = member.data_type
+
+        def read(info_, buffer, data, pos):
+            return info_.get_plan(info_.struct_by_id(struct_id)).read(info_, buffer, data, pos)
+
+        return read, info.struct_by_id(struct_id).disc_size
+    elif kv_type == KeyValueDataType.ENUM:
+        enumerator = info.enum_by_id(member.data_type)
+        values = enumerator.values
+        if enumerator.is_flags():
+            def read(_, __, data, pos):
+                enum_value = _UINT32.unpack_from(data, pos)[0]
+                return String("|".join(key.name for value, key in values.items() if value & enum_value))
+        else:
+            def read(_, __, data, pos):
+                return String(values[_UINT32.unpack_from(data, pos)[0]].name)
+        return read, 4
+    elif kv_type == KeyValueDataType.EXTERNAL_REFERENCE:
+        def read(info_, _, data, pos):
+            resource_id = _UINT64.unpack_from(data, pos)[0]
+            if resource_id == 0:
+                return String('')
+            if resource := info_.resource_list.get(resource_id, None):
+                return String(resource)
+            return NullObject()
+
+        return read, 8
+    elif kv_type in (KeyValueDataType.STRING, KeyValueDataType.NAME):
+        def read(_, buffer, data, pos):
+            offset = _UINT32.unpack_from(data, pos)[0]
+            if offset == 0:
+                return String('')
+            buffer.seek(pos + offset)
+            return String(buffer.read_ascii_string())
+
+        return read, 4
+    elif kv_type in _VECTOR_TYPES:
+        unpack = struct.Struct(f'<{_VECTOR_TYPES[kv_type]}f').unpack_from
+
+        def read(_, __, data, pos):
+            return TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED, [Double(v) for v in unpack(data, pos)])
+
+        return read, _VECTOR_TYPES[kv_type] * 4
+    elif kv_type == KeyValueDataType.COLOR:
+        unpack = struct.Struct('<4B').unpack_from
+
+        def read(_, __, data, pos):
+            return TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED, [Double(v / 255) for v in unpack(data, pos)])
+
+        return read, 4
+    elif kv_type == KeyValueDataType.BOOLEAN:
+        def read(_, __, data, pos):
+            return Bool(data[pos] == 1)
+
+        return read, 1
+    elif kv_type in _MATRIX_TYPES:
+        def read(_, __, data, pos):
+            return np.frombuffer(data, np.float32, 12, pos).reshape(3, 4)
+
+        return read, 48
+
+    def read(*_):
+        raise NotImplementedError(f'Unsupported NTRO member type {kv_type!r}')
+
+    return read, 0
+
+
+def _compile_member_reader(info: ResourceIntrospectionInfo, member: StructMember) -> MemberReader:
+    """Returns reader of member value given the struct start."""
+    read_value, size = _compile_value_reader(info, member)
+    offset = member.stride_offset
+    kv3_type = _NTRO_TO_KV3.get(member.type, None)
+    indirection = member.indirection_bytes
+    if indirection:
+        if len(indirection) > 1:
+            raise NotImplementedError('More than one indirection level is not supported')
+        if member.count > 0:
+            raise NotImplementedError('Member.count should be zero when we have indirection levels')
+        if indirection[0] == 3:
+            def read(info_, buffer, data, start):
+                pos = start + offset
+                relative_offset = _UINT32.unpack_from(data, pos)[0]
+                if relative_offset == 0:
+                    return NullObject()
+                return read_value(info_, buffer, data, pos + relative_offset)
+
+            return read
+        elif indirection[0] == 4:
+            if member.type in _ARRAY_DTYPES:
+                dtype, shape = _ARRAY_DTYPES[member.type]
+                items_per_element = int(np.prod(shape))
+
+                def read(_, __, data, start):
+                    pos = start + offset
+                    relative_offset, count = _OFFSET_AND_COUNT.unpack_from(data, pos)
+                    if not count:
+                        return TypedArray(kv3_type, Specifier.UNSPECIFIED, [])
+                    array = np.frombuffer(data, dtype, count * items_per_element, pos + relative_offset)
+                    return array.reshape(count, *shape) if shape else array
+
+                return read
+            elif member.type == KeyValueDataType.STRUCT:
+                struct_id = member.data_type
+
+                def read(info_, buffer, data, start):
+                    pos = start + offset
+                    relative_offset, count = _OFFSET_AND_COUNT.unpack_from(data, pos)
+                    if not count:
+                        return TypedArray(kv3_type, Specifier.UNSPECIFIED, [])
+                    plan = info_.get_plan(info_.struct_by_id(struct_id))
+                    return TypedArray(kv3_type, Specifier.UNSPECIFIED,
+                                      plan.read_array(info_, buffer, data, pos + relative_offset, count))
+
+                return read
+
+            def read(info_, buffer, data, start):
+                pos = start + offset
+                relative_offset, count = _OFFSET_AND_COUNT.unpack_from(data, pos)
+                pos += relative_offset
+                return TypedArray(kv3_type, Specifier.UNSPECIFIED,
+                                  [read_value(info_, buffer, data, pos + i * size) for i in range(count)])
+
+            return read
+        raise NotImplementedError('Implement')
+
+    if member.count > 0:
+        count = member.count
+        if member.type == KeyValueDataType.BYTE:
+            def read(_, buffer, __, start):
+                buffer.seek(start + offset)
+                return buffer.read_ascii_string(count)
+
+            return read
+
+        def read(info_, buffer, data, start):
+            pos = start + offset
+            return TypedArray(kv3_type, Specifier.UNSPECIFIED,
+                              [read_value(info_, buffer, data, pos + i * size) for i in range(count)])
+
+        return read
+
+    def read(info_, buffer, data, start):
+        return read_value(info_, buffer, data, start + offset)
+
+    return read
+
+
+def _compile_record_field(info: ResourceIntrospectionInfo, member: StructMember):
+    """Returns (numpy dtype, converter from record value) for members that are plain data, None otherwise."""
+    if member.indirection_bytes or member.count > 0:
+        return None
+    kv_type = member.type
+    if kv_type in _SCALAR_TYPES:
+        _, wrapper, dtype = _SCALAR_TYPES[kv_type]
+        return np.dtype(dtype).newbyteorder('<'), wrapper
+    elif kv_type in _VECTOR_TYPES:
+        return (np.dtype((np.dtype('<f4'), (_VECTOR_TYPES[kv_type],))),
+                lambda v: TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED, [Double(x) for x in v]))
+    elif kv_type == KeyValueDataType.COLOR:
+        return (np.dtype((np.uint8, (4,))),
+                lambda v: TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED, [Double(x / 255) for x in v]))
+    elif kv_type == KeyValueDataType.BOOLEAN:
+        return np.dtype(np.uint8), lambda v: Bool(v == 1)
+    elif kv_type in _MATRIX_TYPES:
+        return np.dtype((np.dtype('<f4'), (3, 4))), lambda v: np.array(v, np.float32)
+    elif kv_type == KeyValueDataType.STRUCT:
+        plan = info.get_plan(info.struct_by_id(member.data_type))
+        if plan.dtype is not None:
+            return plan.dtype, plan.from_record
+    return None
+
+
+class StructPlan:
+    """Reader of one NTRO struct compiled from its members (including parent members).
+    Structs made only of plain data also get a numpy dtype, so arrays of them are decoded with one frombuffer."""
+
+    def __init__(self, info: ResourceIntrospectionInfo, struct: Struct):
         members: list[tuple[str, StructMember]] = []
 
         def collect_members(st: Struct):
             if st.parent_struct_id:
-                collect_members(self.struct_lookup[st.parent_struct_id])
+                collect_members(info.struct_lookup[st.parent_struct_id])
             for item in st.members.items():
                 members.append(item)
 
         collect_members(struct)
         members.sort(key=lambda a: a[1].stride_offset)
-        struct_start = buffer.tell()
-        for name, member in members:
-            buffer.seek(struct_start + member.stride_offset)
-            indir_level = len(member.indirection_bytes)
-            reader = self._kv_readers[member.type]
-
-            if indir_level:
-                if indir_level > 1:
-                    raise NotImplementedError('More than one indirection level is not supported')
-                if member.count > 0:
-                    raise NotImplementedError('Member.count should be zero when we have indirection levels')
-                offset = buffer.read_relative_offset32()
-                indir_value = member.indirection_bytes[0]
-                if indir_value == 3:
-                    if offset == buffer.tell() - 4:
-                        value = NullObject()
-                    else:
-                        with buffer.read_from_offset(offset):
-                            value = reader(self, buffer, member)
-                elif indir_value == 4:
-                    count = buffer.read_uint32()
-                    if count:
-                        with buffer.read_from_offset(offset):
-                            if member.type == KeyValueDataType.QUATERNION or member.type == KeyValueDataType.VECTOR4:
-                                value = np.frombuffer(buffer.read(16 * count), dtype=np.float32).reshape(count, 4)
-                            elif member.type == KeyValueDataType.VECTOR3:
-                                value = np.frombuffer(buffer.read(12 * count), dtype=np.float32).reshape(count, 3)
-                            elif member.type == KeyValueDataType.VECTOR2:
-                                value = np.frombuffer(buffer.read(8 * count), dtype=np.float32).reshape(count, 2)
-                            elif member.type == KeyValueDataType.Matrix3x4 or member.type == KeyValueDataType.Matrix3x4a:
-                                value = np.frombuffer(buffer.read(48 * count), dtype=np.float32).reshape(count, 3, 4)
-                            elif member.type == KeyValueDataType.BYTE:
-                                value = np.frombuffer(buffer.read(count), dtype=np.int8)
-                            elif member.type == KeyValueDataType.UBYTE:
-                                value = np.frombuffer(buffer.read(count), dtype=np.uint8)
-                            elif member.type == KeyValueDataType.SHORT:
-                                value = np.frombuffer(buffer.read(2 * count), dtype=np.int16)
-                            elif member.type == KeyValueDataType.USHORT:
-                                value = np.frombuffer(buffer.read(2 * count), dtype=np.uint16)
-                            elif member.type == KeyValueDataType.INTEGER:
-                                value = np.frombuffer(buffer.read(4 * count), dtype=np.int32)
-                            elif member.type == KeyValueDataType.UINTEGER:
-                                value = np.frombuffer(buffer.read(4 * count), dtype=np.uint32)
-                            elif member.type == KeyValueDataType.INT64:
-                                value = np.frombuffer(buffer.read(8 * count), dtype=np.int64)
-                            elif member.type == KeyValueDataType.UINT64:
-                                value = np.frombuffer(buffer.read(8 * count), dtype=np.uint64)
-                            elif member.type == KeyValueDataType.FLOAT:
-                                value = np.frombuffer(buffer.read(4 * count), dtype=np.float32)
-                            else:
-                                value = TypedArray(self._ntro_type_to_kv3(member.type), Specifier.UNSPECIFIED, [])
-                                for _ in range(count):
-                                    value.append(reader(self, buffer, member))
-                    else:
-                        value = TypedArray(self._ntro_type_to_kv3(member.type), Specifier.UNSPECIFIED, [])
-                else:
-                    raise NotImplementedError('Implement')
-            else:
-                if member.count > 0:
-                    if member.type == KeyValueDataType.BYTE:
-                        value = buffer.read_ascii_string(member.count)
-                    else:
-                        value = TypedArray(self._ntro_type_to_kv3(member.type), Specifier.UNSPECIFIED,
-                                           [reader(self, buffer, member) for _ in range(member.count)])
-                else:
-                    value = reader(self, buffer, member)
-            data[name] = value
-        buffer.seek(struct_start + struct.disc_size)
-        return data
-
-    @staticmethod
-    def _ntro_type_to_kv3(data_type: KeyValueDataType):
-        return {
-            KeyValueDataType.STRUCT: KV3Type.OBJECT,
-            KeyValueDataType.ENUM: KV3Type.STRING,
-            KeyValueDataType.EXTERNAL_REFERENCE: KV3Type.STRING,
-            KeyValueDataType.STRING: KV3Type.STRING,
-            KeyValueDataType.BYTE: KV3Type.INT32,
-            KeyValueDataType.UBYTE: KV3Type.UINT32,
-            KeyValueDataType.SHORT: KV3Type.INT32,
-            KeyValueDataType.USHORT: KV3Type.UINT32,
-            KeyValueDataType.INTEGER: KV3Type.INT32,
-            KeyValueDataType.UINTEGER: KV3Type.UINT32,
-            KeyValueDataType.INT64: KV3Type.INT64,
-            KeyValueDataType.UINT64: KV3Type.UINT64,
-            KeyValueDataType.FLOAT: KV3Type.DOUBLE,
-
-            KeyValueDataType.VECTOR2: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.VECTOR3: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.VECTOR4: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.QUATERNION: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.Fltx4: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.COLOR: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.BOOLEAN: KV3Type.BOOLEAN,
-            KeyValueDataType.NAME: KV3Type.STRING,
-            KeyValueDataType.Matrix3x4: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.Matrix3x4a: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.CTransform: KV3Type.ARRAY_TYPED,
-            KeyValueDataType.Vector4D_44: KV3Type.ARRAY_TYPED,
-        }[data_type]
-
-    def _read_struct(self, buffer: Buffer, member: StructMember):
-        return self.read_struct(buffer, self.struct_by_id(member.data_type))
-
-    def _read_enum(self, buffer: Buffer, member: StructMember):
-        enum_value = buffer.read_uint32()
-        enumerator = self.enum_by_id(member.data_type)
-        if enumerator.is_flags():
-            tmp = []
-            for value, key in enumerator.values.items():
-                if value & enum_value:
-                    tmp.append(key.name)
-            return String("|".join(tmp))
-        return String(enumerator.values[enum_value].name)
-
-    def _read_ex_ref(self, buffer: Buffer, member: StructMember):
-        resource_id = buffer.read_uint64()
-        if resource_id == 0:
-            return String('')
-        if resource := self.resource_list.get(resource_id, None):
-            return String(resource)
-        return NullObject()
-
-    def _read_string(self, buffer: Buffer, member: StructMember):
-        offset = buffer.read_relative_offset32()
-        if offset == buffer.tell() - 4:
-            return String('')
-        with buffer.read_from_offset(offset):
-            return String(buffer.read_ascii_string())
-
-    def _read_ubyte(self, buffer: Buffer, member: StructMember):
-        return UInt32(buffer.read_uint8())
-
-    def _read_byte(self, buffer: Buffer, member: StructMember):
-        return Int32(buffer.read_int8())
-
-    def _read_ushort(self, buffer: Buffer, member: StructMember):
-        return UInt32(buffer.read_uint16())
-
-    def _read_short(self, buffer: Buffer, member: StructMember):
-        return Int32(buffer.read_int16())
-
-    def _read_uint32(self, buffer: Buffer, member: StructMember):
-        return UInt32(buffer.read_uint32())
-
-    def _read_int32(self, buffer: Buffer, member: StructMember):
-        return Int32(buffer.read_int32())
-
-    def _read_uint64(self, buffer: Buffer, member: StructMember):
-        return UInt64(buffer.read_uint64())
-
-    def _read_int64(self, buffer: Buffer, member: StructMember):
-        return Int64(buffer.read_int64())
-
-    def _read_float(self, buffer: Buffer, member: StructMember):
-        return Double(buffer.read_float())
-
-    def _read_vector2(self, buffer: Buffer, member: StructMember):
-        return TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED,
-                          [Double(buffer.read_float()), Double(buffer.read_float())])
-
-    def _read_vector3(self, buffer: Buffer, member: StructMember):
-        return TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED,
-                          [Double(buffer.read_float()), Double(buffer.read_float()), Double(buffer.read_float())])
-
-    def _read_vector4(self, buffer: Buffer, member: StructMember):
-        return TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED,
-                          [Double(buffer.read_float()) for _ in range(4)])
-
-    def _read_color(self, buffer: Buffer, member: StructMember):
-        return TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED,
-                          [Double(buffer.read_uint8() / 255) for _ in range(4)])
-
-    def _read_bool(self, buffer: Buffer, member: StructMember):
-        return Bool(buffer.read_uint8() == 1)
-
-    def _read_mat34(self, buffer: Buffer, member: StructMember):
-        return np.frombuffer(buffer.read(4 * 12), dtype=np.float32).reshape(3, 4)
-
-    def _read_ctrans(self, buffer: Buffer, member: StructMember):
-        return TypedArray(KV3Type.DOUBLE, Specifier.UNSPECIFIED,
-                          [Double(buffer.read_float()) for _ in range(7)])
-
-    _kv_readers = (
-        None,  # 0
-        _read_struct,  # 1
-        _read_enum,  # 2
-        _read_ex_ref,  # 3
-        _read_string,  # 4
-        None,  # 5
-        None,  # 6
-        None,  # 7
-        None,  # 8
-        None,  # 9
-        _read_ubyte,  # 10
-        _read_byte,  # 11
-        _read_short,  # 12
-        _read_ushort,  # 13
-        _read_int32,  # 14
-        _read_uint32,  # 15
-        _read_int64,  # 16
-        _read_uint64,  # 17
-        _read_float,  # 18
-        None,  # 19
-        None,  # 20
-        _read_vector2,  # 21
-        _read_vector3,  # 22
-        _read_vector4,  # 23
-        None,  # 24
-        _read_vector4,  # 25
-        None,  # 26
-        _read_vector4,  # 27
-        _read_color,  # 28
-        None,  # 29
-        _read_bool,  # 30
-        _read_string,  # 31
-        None,  # 32
-        _read_mat34,  # 33
-        None,  # 34
-        None,  # 35
-        _read_mat34,  # 36
-        None,  # 37
-        None,  # 38
-        None,  # 39
-        _read_ctrans,  # 40
-        None,  # 41
-        None,  # 42
-        None,  # 43
-        _read_vector4,  # 44
-    )
+        self.name = struct.name
+        self.disc_size = struct.disc_size
+        self.members = [(name, _compile_member_reader(info, member)) for name, member in members]
+        self.dtype: Optional[np.dtype] = None
+        self._converters = None
+
+        fields = [_compile_record_field(info, member) for _, member in members]
+        names = [name for name, _ in members]
+        if members and None not in fields and '' not in names and len(set(names)) == len(names):
+            try:
+                self.dtype = np.dtype({'names': names,
+                                       'formats': [dtype for dtype, _ in fields],
+                                       'offsets': [member.stride_offset for _, member in members],
+                                       'itemsize': struct.disc_size})
+                self._converters = [converter for _, converter in fields]
+            except (TypeError, ValueError):
+                self.dtype = None
+
+    def read(self, info: ResourceIntrospectionInfo, buffer: Buffer, data: memoryview, start: int) -> Object:
+        obj = Object()
+        for name, read in self.members:
+            obj[name] = read(info, buffer, data, start)
+        return obj
+
+    def from_record(self, values: tuple) -> Object:
+        obj = Object()
+        for (name, _), converter, value in zip(self.members, self._converters, values):
+            obj[name] = converter(value)
+        return obj
+
+    def read_array(self, info: ResourceIntrospectionInfo, buffer: Buffer, data: memoryview, start: int,
+                   count: int) -> list[Object]:
+        if self.dtype is not None:
+            return [self.from_record(values) for values in np.frombuffer(data, self.dtype, count, start).tolist()]
+        size = self.disc_size
+        return [self.read(info, buffer, data, start + i * size) for i in range(count)]
 
 
 class NTROHelper(ABC):
@@ -323,6 +431,7 @@ class NTROBuffer(MemoryBuffer, NTROHelper):
         if offset is None:
             offset = self._offset
         slice_offset = self.tell()
+        # Resource list is already attached to the introspection info, slices share both and the underlying memory
         if size == -1:
-            return NTROSlice(self._buffer[offset:], slice_offset, self._ntro, self._ntro.resource_list)
-        return NTROSlice(self._buffer[offset:offset + size], slice_offset, self._ntro, self._ntro.resource_list)
+            return NTROSlice(self._buffer[offset:], slice_offset, self._ntro, None)
+        return NTROSlice(self._buffer[offset:offset + size], slice_offset, self._ntro, None)
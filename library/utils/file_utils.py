@@ -2,11 +2,14 @@ import abc
 import binascii
 import contextlib
 import io
+import mmap
 import os
 import struct
 from pathlib import Path
 from struct import calcsize, pack, unpack
-from typing import Optional, Protocol, Union, TypeVar, Type
+from typing import Any, Optional, Protocol, Sequence, Union, TypeVar, Type
+
+import numpy as np
 
 try:
     from SourceIO.library.utils.tiny_path import TinyPath
@@ -211,10 +214,18 @@ class Buffer(abc.ABC, io.RawIOBase):
     def slice(self, offset: Optional[int] = None, size: int = -1) -> 'Buffer':
         raise NotImplementedError
 
-    def read_structure_array(self, offset, count, data_class: Type['Readable']):
+    def read_records(self, dtype: np.dtype, count: int) -> np.ndarray:
+        return np.frombuffer(self.read(dtype.itemsize * count), dtype, count)
+
+    def read_structure_array(self, offset, count, data_class: Type['Readable'], version: Any = None):
+        """Reads count structures starting at offset.
+        Classes implementing RecordReadable with a dtype for given version are decoded in bulk
+        and returned as StructArray, others are read one by one with from_buffer."""
         if count == 0:
             return []
         self.seek(offset)
+        if (dtype := get_record_dtype(data_class, version)) is not None:
+            return StructArray(self.read_records(dtype, count), data_class, version)
         object_list = []
         for _ in range(count):
             obj = data_class.from_buffer(self)
@@ -293,16 +304,39 @@ class MemoryBuffer(Buffer):
     def close(self) -> None:
         self._buffer = None
 
+    def read_records(self, dtype: np.dtype, count: int) -> np.ndarray:
+        size = dtype.itemsize * count
+        if self._offset + size > len(self._buffer):
+            raise BufferError(f"Not enough data left({self.remaining()}) in buffer to read {count} records")
+        records = np.frombuffer(self._buffer, dtype, count, self._offset)
+        self._offset += size
+        return records
+
     def read_nt_string(self: 'MemoryBuffer'):
-        end = self._buffer.obj.index(b"\x00", self._offset)
-        string = self._buffer[self._offset:end]
-        self._offset+=end-self._offset+1
+        buffer = self._buffer
+        obj = buffer.obj
+        if isinstance(obj, (bytes, bytearray, mmap.mmap)) and len(obj) == buffer.nbytes:
+            end = obj.find(b"\x00", self._offset)
+        else:
+            # View into a larger object(slice), offsets of obj do not match ours, search in small chunks
+            end = -1
+            chunk_start = self._offset
+            while chunk_start < len(buffer):
+                chunk = buffer[chunk_start:chunk_start + 64].tobytes()
+                if (chunk_end := chunk.find(b"\x00")) != -1:
+                    end = chunk_start + chunk_end
+                    break
+                chunk_start += len(chunk)
+        if end == -1:
+            raise ValueError("Null terminator not found")
+        string = buffer[self._offset:end]
+        self._offset += end - self._offset + 1
         return string.tobytes().decode("utf8")
 
     def slice(self, offset: Optional[int] = None, size: int = -1) -> 'MemorySlice':
         if offset is None:
             offset = self._offset
-        slice_offset = self.tell()
+        slice_offset = offset
         if size == -1:
             return MemorySlice(self._buffer[offset:], slice_offset)
         return MemorySlice(self._buffer[offset:offset + size], slice_offset)
@@ -372,6 +406,37 @@ class FileBuffer(io.FileIO, Buffer):
             return MemorySlice(self.read(size), slice_offset)
 
 
+class MappedFileBuffer(MemoryBuffer):
+    """Read-only memory mapped file. slice() and data return views into the mapping without copying.
+
+    Views handed out by slice() keep the mapping alive after close(), it is released once the last of them is gone.
+    """
+
+    def __init__(self, file: Union[str, TinyPath, Path]):
+        self.name = str(file)
+        with open(file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # Empty files can't be mapped
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        super().__init__(self._mmap if self._mmap is not None else b"")
+
+    def close(self) -> None:
+        if self._buffer is None:
+            return
+        self._buffer.release()
+        self._buffer = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Slices still reference the mapping, GC will unmap it after they are released
+                pass
+            self._mmap = None
+
+    def __str__(self) -> str:
+        return f'<MappedFileBuffer: {self.name!r} {self.tell()}/{self.size()}>'
+
+
 class MemorySlice(MemoryBuffer):
     def __init__(self, buffer: Union[bytes, bytearray, memoryview], offset: int):
         super().__init__(buffer)
@@ -390,4 +455,60 @@ class Readable(Protocol):
         ...
 
 
-__all__ = ['Buffer', 'MemoryBuffer', 'WritableMemoryBuffer', 'FileBuffer', 'MemorySlice', 'Readable']
+class RecordReadable(Readable, Protocol):
+    """Readable that can also be decoded in bulk from a numpy structured array.
+
+    dtypes maps a version to the structured dtype of one record, None key is used for any version not listed.
+    from_record receives record.item() (a tuple of plain python values) and must return
+    the same object from_buffer would.
+    """
+    dtypes: dict[Any, np.dtype]
+
+    @classmethod
+    def from_record(cls: Type[T], values: tuple, version: Any) -> T:
+        ...
+
+
+def get_record_dtype(data_class: Type, version: Any = None) -> Optional[np.dtype]:
+    dtypes = getattr(data_class, 'dtypes', None)
+    if not dtypes:
+        return None
+    if version in dtypes:
+        return dtypes[version]
+    return dtypes.get(None, None)
+
+
+class StructArray(Sequence[T]):
+    """Read-only sequence over a numpy record array.
+    Elements are built with data_class.from_record on first access, records stay available for vectorized code."""
+
+    def __init__(self, records: np.ndarray, data_class: Type['RecordReadable'], version: Any = None):
+        self.records = records
+        self.data_class = data_class
+        self.version = version
+        self._items: dict[int, T] = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.records)))]
+        if index < 0:
+            index += len(self.records)
+        if not 0 <= index < len(self.records):
+            raise IndexError('StructArray index out of range')
+        if (item := self._items.get(index, None)) is None:
+            item = self._items[index] = self.data_class.from_record(self.records[index].item(), self.version)
+        return item
+
+    def __iter__(self):
+        for index in range(len(self.records)):
+            yield self[index]
+
+    def __repr__(self):
+        return f'<StructArray[{self.data_class.__name__}] {len(self.records)} items>'
+
+
+__all__ = ['Buffer', 'MemoryBuffer', 'WritableMemoryBuffer', 'FileBuffer', 'MappedFileBuffer', 'MemorySlice',
+           'Readable', 'RecordReadable', 'StructArray', 'get_record_dtype']
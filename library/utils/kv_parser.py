@@ -1,3 +1,4 @@
+import re
 import warnings
 from enum import Enum
 from typing import Iterator, Mapping, Union
@@ -153,28 +154,44 @@ class VKVToken(Enum):
     EOF = "End of file"
 
 
+# Unquoted string candidates, non-printable characters outside ASCII are rejected by _valid_length
+_SIMPLE_STRING = re.compile(r'[^\s$%{}\[\]"\'\x00-\x08\x0e-\x1a]+')
+_QUOTED_STRING = {
+    '"': re.compile(r'[^"\n\r\x00-\x08\x0b-\x1a\x1c-\x1f]*'),
+    "'": re.compile(r'[^"\'\n\r\x00-\x08\x0b-\x1a\x1c-\x1f]*'),
+}
+# Lone CR swallows LF that follows it, same as line counting does
+_SPACES = re.compile(r'(?:[^\S\n\r]|\r\n?)+')
+_NEWLINES = re.compile(r'\n+')
+_PUNCTUATION = {'{': VKVToken.LBRACE, '}': VKVToken.RBRACE, '[': VKVToken.LBRACKET, ']': VKVToken.RBRACKET}
+
+
+def _valid_length(string: str) -> int:
+    """Length of the prefix made of printable characters, tab, DEL and ESC."""
+    if string.isprintable():
+        return len(string)
+    for n, symbol in enumerate(string):
+        if not (symbol.isprintable() or symbol in '\t\x7f\x1b'):
+            return n
+    return len(string)
+
+
 class ValveKeyValueLexer:
+    """Tokenizer for VMT-like KeyValues. Scans whole runs with regular expressions,
+    line and column are only computed when requested (error reporting)."""
 
     def __init__(self, buffer: str, buffer_name: str = '<memory>'):
         self.buffer = buffer.replace('\r\n', '\n').replace("\\", "/")
         self.buffer_name = buffer_name
         self._offset = 0
-        self._line = 1
-        self._column = 1
 
     @property
     def symbol(self):
-        if self._offset < len(self.buffer):
-            return self.buffer[self._offset]
-        else:
-            return ""
+        return self.buffer[self._offset:self._offset + 1]
 
     @property
     def next_symbol(self):
-        if self._offset + 1 < len(self.buffer):
-            return self.buffer[self._offset + 1]
-        else:
-            return ""
+        return self.buffer[self._offset + 1:self._offset + 2]
 
     @property
     def leftover(self):
@@ -182,138 +199,73 @@ class ValveKeyValueLexer:
 
     @property
     def line(self):
-        return self._line
+        consumed = self.buffer[:self._offset]
+        return consumed.count('\n') + consumed.count('\r') - consumed.count('\r\n') + 1
 
     @property
     def column(self):
-        return self._column
-
-    def advance(self):
-        symbol = self.symbol
-        if symbol:
-            if symbol == '\r' and self.next_symbol == '\n':
-                self._offset += 1
-
-            if symbol == '\n' or symbol == '\r':
-                self._line += 1
-                self._column = 1
-            else:
-                self._column += 1
-            self._offset += 1
-        return symbol
-
-    def skip(self, count=1):
-        for _ in range(count):
-            self.advance()
-
-    @staticmethod
-    def _is_valid_symbol(symbol):
-        return (symbol.isprintable() or symbol in '\t\x7f\x1b') and symbol not in '$%{}[]"\'\n\r'
-
-    def _is_valid_quoted_symbol(self, symbol):
-        return self._is_valid_symbol(symbol) or symbol in '$%.,\'\\/<>=![]{}?'
-
-    def _is_escaped_symbol(self):
-        return self.next_symbol in '\'"\\'
-
-    def read_simple_string(self, terminators='\n'):
-        string_buffer = ""
-        while True:
-            symbol = self.symbol
-            if symbol == "\\" and self.next_symbol == "x":
-                self.advance()
-            # if symbol in '"\'':
-            #     self.advance()
-            #     break
-            if not self._is_valid_symbol(symbol) or symbol in terminators:
-                break
-            string_buffer += self.advance()
-        return string_buffer.strip().rstrip()
-
-    def read_quoted_string(self):
-        terminator = self.advance()
-        string_buffer = ""
-
-        while True:
-            symbol = self.symbol
-            if symbol == "\\" and self.next_symbol == "x":
-                self.advance()
-                self.advance()
-                self.advance()
-            # if symbol == '\\' and self.next_symbol in '\'"ntr':
-            #     self.advance()
-            if not self._is_valid_quoted_symbol(symbol) or symbol in terminator + '\n':
-                break
-
-            string_buffer += self.advance()
-        if self.symbol == terminator:
-            self.advance()
-        else:
-            warnings.warn(f'Expected {terminator!r}, but got {self.symbol !r} at {self._line}:{self._column}')
-
-        return string_buffer.strip().rstrip()
+        consumed = self.buffer[:self._offset]
+        return self._offset - max(consumed.rfind('\n'), consumed.rfind('\r'))
 
     def lex(self):
-        while self._offset < len(self.buffer):
-            symbol = self.symbol
+        buffer = self.buffer
+        length = len(buffer)
+        offset = self._offset
+        while offset < length:
+            symbol = buffer[offset]
             if symbol == '\n':
-                if self.next_symbol == '\n':
-                    while self.next_symbol == '\n':
-                        self.advance()  # skip multiple new lines
-                yield VKVToken.NEWLINE, self.advance()
-            elif symbol.isspace():
-                self.advance()
-                continue
-            elif symbol == '/' and self.next_symbol == '/':
-                self.advance(), self.advance()
-                comment = ''
-                while self.symbol != '\n' and self:
-                    comment += self.advance()
-                # yield VKVToken.COMMENT, comment
-            elif symbol == '{':
-                yield VKVToken.LBRACE, self.advance()
-            elif symbol == '}':
-                yield VKVToken.RBRACE, self.advance()
-            elif self._is_valid_symbol(symbol):
-                string = self.read_simple_string(terminators=' \t\n')
-                if string:
-                    yield VKVToken.STRING, string
-            elif symbol in '\'"':
-                if self.next_symbol in '\'"':
-                    self.advance(), self.advance()
+                # Multiple new lines are reported as one
+                self._offset = offset = _NEWLINES.match(buffer, offset).end()
+                yield VKVToken.NEWLINE, symbol
+            elif symbol in _PUNCTUATION:
+                self._offset = offset = offset + 1
+                yield _PUNCTUATION[symbol], symbol
+            elif symbol == '"' or symbol == "'":
+                if buffer[offset + 1:offset + 2] in '\'"':
+                    self._offset = offset = min(offset + 2, length)
                     yield VKVToken.STRING, ""
                     continue
-                string = self.read_quoted_string()
+                start = offset + 1
+                end = _QUOTED_STRING[symbol].match(buffer, start).end()
+                string = buffer[start:end]
+                if (valid := _valid_length(string)) != len(string):
+                    string = string[:valid]
+                    end = start + valid
+                if buffer[end:end + 1] == symbol:
+                    self._offset = offset = end + 1
+                else:
+                    self._offset = offset = end
+                    warnings.warn(f'Expected {symbol!r}, but got {buffer[end:end + 1]!r} at {self.line}:{self.column}')
+                string = string.strip()
                 if string:
                     yield VKVToken.STRING, string
-            elif symbol == '$':
-                self.advance()
-                string = self.read_simple_string(terminators=' \t\n')
-                if string:
-                    yield VKVToken.STRING, "$" + string
-            elif self.symbol in "<>=":
-                expr = ""
-                while True:
-                    if self.symbol not in "<>=":
-                        break
-                    expr += self.symbol
-                if expr:
-                    yield VKVToken.EXPRESSION, expr
-            elif symbol == '%':
-                self.advance()
-                string = self.read_simple_string(terminators=' \t\n')
-                if string:
-                    yield VKVToken.STRING, "%" + string
-            elif symbol == '[':
-                yield VKVToken.LBRACKET, self.advance()
-            elif symbol == ']':
-                yield VKVToken.RBRACKET, self.advance()
-            elif symbol.isprintable():
-                warnings.warn(f'Unknown symbol {self.advance()!r} at {self._line}:{self._column}')
-                continue
+            elif symbol == '$' or symbol == '%':
+                offset += 1
+                match = _SIMPLE_STRING.match(buffer, offset)
+                if match is not None:
+                    string = match.group()
+                    string = string[:_valid_length(string)]
+                    self._offset = offset = offset + len(string)
+                    if string:
+                        yield VKVToken.STRING, symbol + string
+                else:
+                    self._offset = offset
+            elif symbol == '/' and buffer[offset + 1:offset + 2] == '/':
+                end = buffer.find('\n', offset + 2)
+                while end != -1 and buffer[end - 1] == '\r' and end - 1 >= offset + 2:
+                    end = buffer.find('\n', end + 1)
+                self._offset = offset = length if end == -1 else end
+            elif symbol.isspace():
+                self._offset = offset = _SPACES.match(buffer, offset).end()
             else:
-                raise KVLexerException(
-                    f'Unknown symbol {symbol!r} in {self.buffer_name!r} at {self._line}:{self._column}')
+                match = _SIMPLE_STRING.match(buffer, offset)
+                string = match.group() if match is not None else ''
+                string = string[:_valid_length(string)]
+                if not string:
+                    raise KVLexerException(
+                        f'Unknown symbol {symbol!r} in {self.buffer_name!r} at {self.line}:{self.column}')
+                self._offset = offset = offset + len(string)
+                yield VKVToken.STRING, string
         yield VKVToken.EOF, None
 
     def __bool__(self):
@@ -393,33 +345,71 @@ class ValveKeyValueParser:
         return expr
 
     def parse(self):
+        for _ in self.iter_parse():
+            pass
+
+    def iter_parse(self):
+        """Parses the buffer, yielding every top level node (block or key/value pair) as soon as it is complete.
+        Nodes are the raw ones stored in the tree, a block left unclosed at the end of input is yielded last."""
+        # Same grammar as expressed with match/expect, with token checks inlined as it runs once per token
         node_stack = [self._tree]
-        while self._lexer:
-            self._skip_newlines()
-            if self.match(VKVToken.STRING) or self.match(VKVToken.EXPRESSION):
-                key = self.advance()[1]
-                self._skip_newlines()
-                if self.match(VKVToken.LBRACE, True):
+        lexer = self._lexer
+        peek = self.peek
+        advance = self.advance
+        newline = VKVToken.NEWLINE
+        try:
+            while lexer:
+                token = peek()[0]
+                while token is newline:
+                    advance()
+                    token = peek()[0]
+                if token is VKVToken.STRING or token is VKVToken.EXPRESSION:
+                    key = advance()[1].lower()
+                    token = peek()[0]
+                    while token is newline:
+                        advance()
+                        token = peek()[0]
+                    if token is VKVToken.LBRACE:
+                        advance()
+                        new_tree_node = []
+                        node_stack[-1].append((key, new_tree_node))
+                        node_stack.append(new_tree_node)
+                    elif token is VKVToken.STRING:
+                        value = advance()[1]
+                        if peek()[0] is VKVToken.LBRACKET:
+                            advance()
+                            condition = self._parse_expression()
+                            node_stack[-1].append((key, (value, condition)))
+                        else:
+                            node_stack[-1].append((key, value))
+                        if len(node_stack) == 1:
+                            yield self._tree[-1]
+                        if peek()[0] is newline:
+                            advance()
+                        else:
+                            self.expect(newline)
+                elif self._array_of_blocks and token is VKVToken.LBRACE:
+                    advance()
                     new_tree_node = []
-                    node_stack[-1].append((key.lower(), new_tree_node))
+                    node_stack[-1].append(new_tree_node)
                     node_stack.append(new_tree_node)
-                elif self.match(VKVToken.STRING):
-                    value = self.advance()
-                    if self.match(VKVToken.LBRACKET, True):
-                        condition = self._parse_expression()
-                        node_stack[-1].append((key.lower(), (value[1], condition)))
-                    else:
-                        node_stack[-1].append((key.lower(), value[1]))
-                    self.expect(VKVToken.NEWLINE)
-            elif self._array_of_blocks and self.match(VKVToken.LBRACE, True):
-                new_tree_node = []
-                node_stack[-1].append(new_tree_node)
-                node_stack.append(new_tree_node)
-            elif self.match(VKVToken.RBRACE, True):
-                node_stack.pop(-1)
-            elif self.match(VKVToken.EOF):
-                break
-            else:
-                token, value = self.peek()
+                elif token is VKVToken.RBRACE:
+                    advance()
+                    node_stack.pop(-1)
+                    if len(node_stack) == 1:
+                        yield self._tree[-1]
+                elif token is VKVToken.EOF:
+                    break
+                else:
+                    token, value = self.peek()
+                    raise KVParserException(f"Unexpected token {token}:\"{value}\" in {self._path} "
+                                            f"at {self._lexer.line}:{self._lexer.column}")
+        except StopIteration:
+            # Token stream ran out in the middle of a construct, e.g. a condition missing its closing bracket
+            if not self._self_recover:
                 raise KVParserException(
-                    f"Unexpected token {token}:\"{value}\" in {self._path} at {self._lexer.line}:{self._lexer.column}")
+                    f"Unexpected end of input in {self._path} at {lexer.line}:{lexer.column}") from None
+            warnings.warn(f"Unexpected end of input in {self._path!r} at {lexer.line}:{lexer.column}, "
+                          f"dropping unfinished key/value pair")
+        if len(node_stack) > 1:
+            yield self._tree[-1]
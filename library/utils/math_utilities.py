@@ -1,5 +1,5 @@
 import math
-from typing import Union
+from typing import Iterator, Union
 
 import numpy as np
 
@@ -245,3 +245,33 @@ def vector_normalize(v):
     if norm == 0:
         norm = np.finfo(v.dtype).eps
     return v / norm
+
+
+def group_vertex_weights(bone_indices: np.ndarray, bone_weights: np.ndarray
+                         ) -> Iterator[tuple[int, float, np.ndarray]]:
+    """Groups per vertex influences of shape (vertex_count, influence_count) into (bone, weight, vertex ids).
+
+    Zero weights are skipped, if a vertex references the same bone more than once the last influence wins.
+    """
+    bone_indices = np.asarray(bone_indices).reshape(len(bone_indices), -1)
+    bone_weights = np.asarray(bone_weights).reshape(len(bone_weights), -1)
+    vertex_ids = np.repeat(np.arange(len(bone_indices), dtype=np.uint32), bone_indices.shape[1])
+    bones = bone_indices.ravel().astype(np.int64)
+    weights = bone_weights.ravel()
+    mask = weights > 0
+    vertex_ids, bones, weights = vertex_ids[mask], bones[mask], weights[mask]
+    if not weights.size:
+        return
+
+    # Stable sort by (bone, vertex) keeps influence order, so the last of duplicated pairs is the one to keep
+    order = np.lexsort((vertex_ids, bones))
+    vertex_ids, bones, weights = vertex_ids[order], bones[order], weights[order]
+    last = np.ones(len(order), np.bool_)
+    last[:-1] = (bones[1:] != bones[:-1]) | (vertex_ids[1:] != vertex_ids[:-1])
+    vertex_ids, bones, weights = vertex_ids[last], bones[last], weights[last]
+
+    order = np.lexsort((vertex_ids, weights, bones))
+    vertex_ids, bones, weights = vertex_ids[order], bones[order], weights[order]
+    starts = np.flatnonzero(np.concatenate(([True], (bones[1:] != bones[:-1]) | (weights[1:] != weights[:-1]))))
+    for start, group in zip(starts, np.split(vertex_ids, starts[1:])):
+        yield int(bones[start]), float(weights[start]), group
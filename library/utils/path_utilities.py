@@ -1,9 +1,102 @@
 import os
 import platform
+from threading import Lock
 from typing import Optional
 
 from SourceIO.library.utils import TinyPath
 
+_is_windows = platform.system() == "Windows"
+
+
+class CaseInsensitiveDirectoryCache:
+    """Caches case-folded directory listings so case-insensitive path resolution on case-sensitive filesystems
+    costs one dict lookup per path component instead of one readdir.
+
+    Listings are kept until invalidated. With revalidate=True every cached directory is checked against its mtime
+    on access, which catches files added or removed since the listing was read at the cost of one stat per component.
+    """
+
+    def __init__(self, revalidate: bool = False):
+        self.revalidate = revalidate
+        self._lock = Lock()
+        # directory -> (mtime_ns, {lower name: real name} for subdirectories, {lower name: real name} for files)
+        self._listings: dict[str, Optional[tuple[int, dict[str, str], dict[str, str]]]] = {}
+
+    def _read_listing(self, directory: str):
+        dirs = {}
+        files = {}
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as it:
+                for entry in it:
+                    target = dirs if entry.is_dir() else files
+                    target.setdefault(entry.name.lower(), entry.name)
+        except OSError:
+            return None
+        return mtime, dirs, files
+
+    def _get_listing(self, directory: str):
+        listing = self._listings.get(directory, False)
+        if listing is not False and self.revalidate and listing is not None:
+            try:
+                if os.stat(directory).st_mtime_ns != listing[0]:
+                    listing = False
+            except OSError:
+                listing = None
+        if listing is False:
+            listing = self._read_listing(directory)
+            with self._lock:
+                self._listings[directory] = listing
+        return listing
+
+    def resolve(self, path: TinyPath) -> Optional[TinyPath]:
+        """Finds an existing file matching the path case-insensitively, returns None if there is no such file."""
+        path = TinyPath(path)
+        if path.is_absolute():
+            parts = path.parts
+            # posix absolute paths split into ["", ...], keep the root separator
+            current = parts[0] or "/"
+            parts = parts[1:]
+        else:
+            current = ""
+            parts = path.parts
+        if not parts:
+            return None
+        *dir_parts, file_name = parts
+        for part in dir_parts:
+            if part in ("", "."):
+                continue
+            if part == "..":
+                current = os.path.dirname(current)
+                continue
+            listing = self._get_listing(current or ".")
+            if listing is None or (real_name := listing[1].get(part.lower(), None)) is None:
+                return None
+            current = os.path.join(current, real_name)
+        listing = self._get_listing(current or ".")
+        if listing is None or (real_name := listing[2].get(file_name.lower(), None)) is None:
+            return None
+        return TinyPath(os.path.join(current, real_name))
+
+    def invalidate(self, path: Optional[TinyPath] = None):
+        """Drops cached listings of the given directory and everything below it, or the whole cache."""
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+                return
+            path = str(TinyPath(path))
+            prefix = path + "/"
+            for directory in list(self._listings.keys()):
+                if directory == path or directory.startswith(prefix):
+                    del self._listings[directory]
+
+
+directory_cache = CaseInsensitiveDirectoryCache()
+
+
+def invalidate_directory_cache(path: Optional[TinyPath] = None):
+    directory_cache.invalidate(path)
+
 
 def pop_path_back(path: TinyPath):
     if len(path.parts) > 1:
@@ -58,21 +151,11 @@ def backwalk_file_resolver(current_path, file_to_find) -> Optional[TinyPath]:
 
 
 def corrected_path(path: TinyPath):
-    if platform.system() == "Windows" or path.exists():  # Shortcut for windows
+    if _is_windows or path.exists():  # Shortcut for windows
         return path
-    root, *parts, fname = path.parts
-
-    new_path = TinyPath(root)
-    for part in parts:
-        for dir_name in new_path.iterdir():
-            if dir_name.is_file():
-                continue
-            if dir_name.name.lower() == part.lower():
-                new_path = dir_name
-                break
-    for file_name in new_path.iterdir():
-        if file_name.is_file() and file_name.name.lower() == fname.lower():
-            return file_name
+    resolved = directory_cache.resolve(path)
+    if resolved is not None:
+        return resolved
     return path
 
 
@@ -1,3 +1,4 @@
+import re
 import sys
 from collections import OrderedDict
 from enum import Enum
@@ -10,6 +11,15 @@ log_manager = SourceLogMan()
 logger = log_manager.get_logger('Utilities::KeyValue Parser')
 
 
+_SPACES = re.compile(r'\s+')
+_LINE_END = re.compile(r'[\r\n\0]')
+_IDENTIFIER_PART = re.compile(r'[\w|\\/.*]*')
+_DOUBLE_QUOTED = re.compile(r'[^"\r\n\0]*')
+_SINGLE_QUOTED = re.compile(r"[^'\r\n\0]*")
+_BRACKETED = re.compile(r'[^\]\r\n\0]*')
+_DECIMAL = re.compile(r'[0-9.]*')
+
+
 def _is_end(ch: str):
     return ch in '\r\n\0'
 
@@ -61,55 +71,43 @@ class KVReader:
 
     def _read(self):
         while True:
+            self._skip_spaces()
             lc = self._line, self._column
             ch = self._next_char()
 
-            if ch.isspace():
-                continue
-
             if ch == '/' and self._peek_char() == '/':
-                while not _is_end(self._next_char()):
-                    pass
+                self._skip_line()
                 continue
             if ch == '\\' and self._peek_char() == '\\':
-                while not _is_end(self._next_char()):
-                    pass
+                self._skip_line()
                 continue
 
             if _is_identifier_start(ch):
-                buf = ch
-                while _is_identifier_part(self._peek_char()):
-                    buf += self._next_char()
-                return KVToken.STR, buf, lc
+                return KVToken.STR, ch + self._read_run(_IDENTIFIER_PART), lc
 
             if ch == '"':
-                buf = ''
-                while not _is_end(self._peek_char()) and self._peek_char() != '"':
-                    buf += self._next_char()
+                buf = self._read_run(_DOUBLE_QUOTED)
                 if self._next_char() != '"':
                     self._report('String literal is not closed', lc)
                 return KVToken.STR, buf, lc
 
             if ch == '[':
-                buf = ''
-                while not _is_end(self._peek_char()) and self._peek_char() != ']':
-                    buf += self._next_char()
+                self._read_run(_BRACKETED)
                 if self._next_char() != ']':
                     self._report('String literal is not closed', lc)
                 continue
                 # return KVToken.STR, buf, lc
             if ch == '\'':
-                buf = ''
-                while not _is_end(self._peek_char()) and self._peek_char() != '\'':
-                    buf += self._next_char()
+                buf = self._read_run(_SINGLE_QUOTED)
                 if self._next_char() != '\'':
                     self._report('String literal is not closed', lc)
                 return KVToken.STR, buf, lc
 
             if ch.isdigit() or ch == '.' or ch == '-':
-                buf = ch
+                buf = ch + self._read_run(_DECIMAL)
+                # Digits that are not decimal (superscripts and alike) are rare enough to take one at a time
                 while self._peek_char().isdigit() or self._peek_char() == '.':
-                    buf += self._next_char()
+                    buf += self._next_char() + self._read_run(_DECIMAL)
                 return KVToken.NUM, buf, lc
 
             if ch == '+':
@@ -126,6 +124,35 @@ class KVReader:
 
             self._report(f'Unknown character \'{ch}\' ({ord(ch):02x})', lc)
 
+    def _read_run(self, pattern: re.Pattern) -> str:
+        """Consumes the longest match of pattern, it must not contain line ends."""
+        end = pattern.match(self.data, self._index).end()
+        run = self.data[self._index:end]
+        self._index = end
+        self._column += len(run)
+        return run
+
+    def _skip_spaces(self):
+        match = _SPACES.match(self.data, self._index)
+        if match is None:
+            return
+        spaces = match.group()
+        self._index = match.end()
+        line_breaks = spaces.count('\n') + spaces.count('\r') - spaces.count('\r\n')
+        if line_breaks:
+            self._line += line_breaks
+            self._column = len(spaces) - max(spaces.rfind('\n'), spaces.rfind('\r'))
+        else:
+            self._column += len(spaces)
+
+    def _skip_line(self):
+        """Skips everything up to and including the next line end."""
+        match = _LINE_END.search(self.data, self._index)
+        end = self._length if match is None else match.start()
+        self._column += end - self._index
+        self._index = end
+        self._next_char()
+
     def _report(self, msg: str, pos: tuple):
         raise ValueError(f'{self.name}:{pos[0]}:{pos[1]}: {msg}')
 
@@ -148,8 +175,8 @@ class KVReader:
         return ch
 
     def _peek_char(self):
-        if self._length < self._index:
-            return None
+        if self._length <= self._index:
+            return '\0'
         return self.data[self._index]
 
 
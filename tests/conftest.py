@@ -0,0 +1,10 @@
+import importlib
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+if 'SourceIO' not in sys.modules:
+    sys.path.insert(0, str(REPO_ROOT.parent))
+    # Package __init__ registers the checkout as SourceIO, whatever its folder is called
+    importlib.import_module(REPO_ROOT.name)
@@ -0,0 +1,228 @@
+"""Random binary KV3 trees written straight into KV3ContextNew sub-buffers, for v1, v3 and v5 type stream layouts.
+
+Shared by test_kv3_columnar_decoder.py and bench/kv3_decoders.py.
+"""
+import random
+import struct
+from typing import Optional
+
+import numpy as np
+
+from SourceIO.library.source2.keyvalues3.binary_keyvalues import (KV3Buffers, KV3ContextNew, _read_type_legacy,
+                                                                   _read_type_v3, _read_type_v5, _read_value_legacy)
+from SourceIO.library.source2.keyvalues3.columnar_decoder import TYPE_FORMAT_V1, TYPE_FORMAT_V3, TYPE_FORMAT_V5
+from SourceIO.library.source2.keyvalues3.enums import KV3Type, Specifier
+from SourceIO.library.source2.keyvalues3.types import BaseType, TypedArray
+from SourceIO.library.utils import MemoryBuffer
+
+_TYPE_READERS = {
+    TYPE_FORMAT_V1: _read_type_legacy,
+    TYPE_FORMAT_V3: _read_type_v3,
+    TYPE_FORMAT_V5: _read_type_v5,
+}
+
+_SCALAR_TYPES = [KV3Type.STRING, KV3Type.INT32, KV3Type.UINT32, KV3Type.FLOAT, KV3Type.DOUBLE, KV3Type.INT64,
+                 KV3Type.UINT64, KV3Type.INT8, KV3Type.UINT8, KV3Type.BOOLEAN, KV3Type.BINARY_BLOB, KV3Type.NULL,
+                 KV3Type.BOOLEAN_TRUE, KV3Type.BOOLEAN_FALSE, KV3Type.INT64_ZERO, KV3Type.INT64_ONE,
+                 KV3Type.DOUBLE_ZERO, KV3Type.DOUBLE_ONE]
+_SHORT_TYPES = [KV3Type.INT16, KV3Type.UINT16]
+_ELEMENT_TYPES = [KV3Type.DOUBLE_ZERO, KV3Type.DOUBLE_ONE, KV3Type.INT64_ZERO, KV3Type.INT64_ONE, KV3Type.DOUBLE,
+                  KV3Type.INT64, KV3Type.UINT64, KV3Type.INT32, KV3Type.UINT32, KV3Type.STRING, KV3Type.FLOAT,
+                  KV3Type.BOOLEAN_TRUE, KV3Type.UINT8, KV3Type.OBJECT]
+
+
+class _Columns:
+    def __init__(self):
+        self.bytes = bytearray()
+        self.shorts = bytearray()
+        self.ints = bytearray()
+        self.doubles = bytearray()
+
+    def to_buffers(self, with_shorts: bool) -> KV3Buffers:
+        return KV3Buffers(MemoryBuffer(bytes(self.bytes)),
+                          MemoryBuffer(bytes(self.shorts)) if with_shorts else None,
+                          MemoryBuffer(bytes(self.ints)),
+                          MemoryBuffer(bytes(self.doubles)))
+
+
+class KV3TreeWriter:
+    """Writes random values the way a binary KV3 file lays them out.
+    v1 has no short buffer, v5 keeps object member counts in their own buffer and has a second value buffer
+    that ARRAY_TYPED_BYTE_LENGTH2 arrays are read from."""
+
+    def __init__(self, type_format: int, rnd: random.Random, string_count: int = 64, blob_sizes: bool = True,
+                 max_depth: int = 4):
+        self.type_format = type_format
+        self.rnd = rnd
+        self.max_depth = max_depth
+        self.strings = [f'string_{i}' for i in range(string_count)]
+        self.types = bytearray()
+        self.member_counts = bytearray()
+        self.columns0 = _Columns()
+        self.columns1 = _Columns() if type_format == TYPE_FORMAT_V5 else self.columns0
+        self.active = self.columns1
+        self.blob_sizes: Optional[list[int]] = [] if blob_sizes else None
+        self.blobs = bytearray()
+
+    def write_type(self, data_type: KV3Type, specifier: Optional[Specifier]):
+        if specifier is None:
+            self.types.append(int(data_type))
+        elif self.type_format == TYPE_FORMAT_V5:
+            self.types += bytes((int(data_type) | 0x80, int(specifier)))
+        else:
+            # v1/v3 store a flag byte, 0 means no specifier
+            self.types += bytes((int(data_type) | 0x80, specifier))
+
+    def random_specifier(self):
+        if self.rnd.random() >= 0.15:
+            return None
+        if self.type_format == TYPE_FORMAT_V5:
+            return self.rnd.choice((Specifier.RESOURCE, Specifier.RESOURCE_NAME, Specifier.PANORAMA,
+                                    Specifier.SOUNDEVENT, Specifier.SUBCLASS, Specifier.ENTITY_NAME))
+        return self.rnd.choice((0, 1, 2, 8, 16, 32))
+
+    def random_type(self, depth: int) -> KV3Type:
+        choices = list(_SCALAR_TYPES)
+        if self.type_format != TYPE_FORMAT_V1:
+            choices += _SHORT_TYPES
+        if depth < self.max_depth:
+            choices += [KV3Type.OBJECT] * 8 + [KV3Type.ARRAY] * 4
+            choices += [KV3Type.ARRAY_TYPED, KV3Type.ARRAY_TYPED_BYTE_LENGTH] * 2
+            if self.type_format == TYPE_FORMAT_V5:
+                choices += [KV3Type.ARRAY_TYPED_BYTE_LENGTH2] * 2
+        return self.rnd.choice(choices)
+
+    def write_object(self, member_count: int, depth: int = 0):
+        """Object body with random members, type byte is written by the caller."""
+        packed = struct.pack('<I', member_count)
+        if self.type_format == TYPE_FORMAT_V5:
+            self.member_counts += packed
+        else:
+            self.active.ints += packed
+        for _ in range(member_count):
+            self.active.ints += struct.pack('<i', self.rnd.randrange(-1, len(self.strings)))
+            self.write_value(depth + 1)
+
+    def write_array(self, count: int, depth: int = 0):
+        self.active.ints += struct.pack('<i', count)
+        for _ in range(count):
+            self.write_value(depth + 1)
+
+    def write_value(self, depth: int = 0):
+        data_type = self.random_type(depth)
+        specifier = None if data_type == KV3Type.ARRAY_TYPED_BYTE_LENGTH2 else self.random_specifier()
+        self.write_type(data_type, specifier)
+        self.write_body(data_type, depth)
+
+    def write_body(self, data_type: KV3Type, depth: int):
+        rnd = self.rnd
+        columns = self.active
+        if data_type == KV3Type.OBJECT:
+            self.write_object(rnd.randint(0, 6), depth)
+        elif data_type == KV3Type.ARRAY:
+            self.write_array(rnd.randint(0, 5), depth)
+        elif data_type in (KV3Type.ARRAY_TYPED, KV3Type.ARRAY_TYPED_BYTE_LENGTH, KV3Type.ARRAY_TYPED_BYTE_LENGTH2):
+            count = rnd.randint(0, 8)
+            if data_type == KV3Type.ARRAY_TYPED:
+                columns.ints += struct.pack('<I', count)
+            else:
+                columns.bytes.append(count)
+            if data_type == KV3Type.ARRAY_TYPED_BYTE_LENGTH2:
+                self.active = self.columns0
+            element_type = rnd.choice(_ELEMENT_TYPES)
+            self.write_type(element_type, self.random_specifier())
+            for _ in range(count):
+                self.write_body(element_type, depth + 1)
+            self.active = self.columns1
+        elif data_type == KV3Type.STRING:
+            columns.ints += struct.pack('<i', rnd.randrange(-1, len(self.strings)))
+        elif data_type == KV3Type.INT32:
+            columns.ints += struct.pack('<i', rnd.randint(-2 ** 31, 2 ** 31 - 1))
+        elif data_type == KV3Type.UINT32:
+            columns.ints += struct.pack('<I', rnd.randint(0, 2 ** 32 - 1))
+        elif data_type == KV3Type.FLOAT:
+            columns.ints += struct.pack('<f', rnd.uniform(-1e6, 1e6))
+        elif data_type == KV3Type.DOUBLE:
+            columns.doubles += struct.pack('<d', rnd.uniform(-1e12, 1e12))
+        elif data_type == KV3Type.INT64:
+            columns.doubles += struct.pack('<q', rnd.randint(-2 ** 63, 2 ** 63 - 1))
+        elif data_type == KV3Type.UINT64:
+            columns.doubles += struct.pack('<Q', rnd.randint(0, 2 ** 64 - 1))
+        elif data_type == KV3Type.INT16:
+            columns.shorts += struct.pack('<h', rnd.randint(-2 ** 15, 2 ** 15 - 1))
+        elif data_type == KV3Type.UINT16:
+            columns.shorts += struct.pack('<H', rnd.randint(0, 2 ** 16 - 1))
+        elif data_type in (KV3Type.INT8, KV3Type.UINT8):
+            columns.bytes.append(rnd.randrange(256))
+        elif data_type == KV3Type.BOOLEAN:
+            columns.bytes.append(rnd.randint(0, 1))
+        elif data_type == KV3Type.BINARY_BLOB:
+            data = rnd.randbytes(rnd.randint(0, 24))
+            if self.blob_sizes is not None:
+                self.blob_sizes.append(len(data))
+                self.blobs += data
+            else:
+                columns.ints += struct.pack('<i', len(data))
+                columns.bytes += data
+
+    def context(self) -> KV3ContextNew:
+        """Fresh context over the written data, readers consume their buffers so build one per decode."""
+        with_shorts = self.type_format != TYPE_FORMAT_V1
+        buffer0 = self.columns0.to_buffers(with_shorts)
+        buffer1 = buffer0 if self.columns1 is self.columns0 else self.columns1.to_buffers(with_shorts)
+        if self.type_format == TYPE_FORMAT_V5:
+            member_counts = MemoryBuffer(bytes(self.member_counts))
+        else:
+            member_counts = buffer1.int_buffer
+        return KV3ContextNew(strings=self.strings,
+                             buffer0=buffer0,
+                             buffer1=buffer1,
+                             types_buffer=MemoryBuffer(bytes(self.types)),
+                             object_member_count_buffer=member_counts,
+                             binary_blob_sizes=list(self.blob_sizes) if self.blob_sizes is not None else None,
+                             binary_blob_buffer=MemoryBuffer(bytes(self.blobs)),
+                             read_type=_TYPE_READERS[self.type_format],
+                             read_value=_read_value_legacy,
+                             active_buffer=buffer1)
+
+
+def random_object_tree(type_format: int, seed: int, blob_sizes: bool = True) -> KV3TreeWriter:
+    """Root object with nested random members."""
+    writer = KV3TreeWriter(type_format, random.Random(seed), blob_sizes=blob_sizes)
+    writer.write_type(KV3Type.OBJECT, None)
+    writer.write_object(writer.rnd.randint(4, 12))
+    return writer
+
+
+def wide_array_tree(type_format: int, seed: int, count: int) -> KV3TreeWriter:
+    """Root array of count random values, sized for timing."""
+    writer = KV3TreeWriter(type_format, random.Random(seed), max_depth=2)
+    writer.write_type(KV3Type.ARRAY, None)
+    writer.write_array(count)
+    return writer
+
+
+def assert_same_tree(expected, actual, path: str = 'root'):
+    """Compares wrapper types, specifiers, typed array element types and values, member order included."""
+    assert type(expected) is type(actual), f'{path}: {type(expected).__name__} != {type(actual).__name__}'
+    if isinstance(expected, np.ndarray):
+        assert expected.dtype == actual.dtype, f'{path}: {expected.dtype} != {actual.dtype}'
+        assert expected.tobytes() == actual.tobytes(), path
+        return
+    if isinstance(expected, BaseType):
+        assert expected.specifier == actual.specifier, f'{path}: {expected.specifier!r} != {actual.specifier!r}'
+    if isinstance(expected, TypedArray):
+        assert expected.data_type == actual.data_type, path
+        assert expected.data_specifier == actual.data_specifier, path
+    if isinstance(expected, dict):
+        assert list(expected.keys()) == list(actual.keys()), path
+        for key, value in expected.items():
+            assert_same_tree(value, actual[key], f'{path}.{key}')
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual), path
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            assert_same_tree(a, b, f'{path}[{i}]')
+    elif isinstance(expected, float):
+        assert struct.pack('<d', expected) == struct.pack('<d', actual), f'{path}: {expected} != {actual}'
+    else:
+        assert expected == actual, f'{path}: {expected!r} != {actual!r}'
@@ -0,0 +1,145 @@
+"""Runs the KeyValues lexers and parsers over text and reduces the results to JSON friendly values,
+so output of the current code can be compared with golden files made by an older revision.
+
+Shared by test_kv_conformance.py, kv_corpus/make_golden.py and bench/kv_parsers.py.
+"""
+import random
+import subprocess
+import sys
+import types
+import warnings
+from pathlib import Path
+
+CORPUS_DIR = Path(__file__).resolve().parent / 'kv_corpus'
+REPO_ROOT = CORPUS_DIR.parents[1]
+
+PARSER_MODES = [(True, False), (True, True), (False, False)]  # (self_recover, array_of_blocks)
+
+
+def corpus_files() -> list[Path]:
+    return sorted(path for path in CORPUS_DIR.iterdir() if path.suffix in ('.txt', '.vmt'))
+
+
+def read_corpus_file(path: Path) -> str:
+    # Keep CR and CRLF as they are, line endings are part of what is tested
+    with path.open('r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def import_revision(revision: str, relative_path: str, module_name: str) -> types.ModuleType:
+    """Imports a module of the checkout as it was at git revision, SourceIO imports resolve to the current tree."""
+    source = subprocess.run(['git', 'show', f'{revision}:{relative_path}'], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True, encoding='utf-8').stdout
+    module = types.ModuleType(module_name)
+    module.__file__ = f'{revision}:{relative_path}'
+    sys.modules[module_name] = module
+    exec(compile(source, module.__file__, 'exec'), module.__dict__)
+    return module
+
+
+def _error(e: Exception) -> list:
+    return ['error', type(e).__name__, str(e)]
+
+
+def plain(value):
+    """Tuples become lists and dicts become lists of pairs, member order is kept."""
+    if isinstance(value, dict):
+        return {'pairs': [[key, plain(item)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value
+
+
+def lexer_tokens(kv_parser, text: str) -> list:
+    lexer = kv_parser.ValveKeyValueLexer(text, 'corpus')
+    tokens = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            for token, value in lexer.lex():
+                tokens.append([token.name, value, lexer._offset, lexer.line, lexer.column])
+        except Exception as e:
+            tokens.append(_error(e))
+    return tokens
+
+
+def parser_tree(kv_parser, text: str, self_recover: bool, array_of_blocks: bool):
+    parser = kv_parser.ValveKeyValueParser(buffer_and_name=(text, 'corpus'), self_recover=self_recover,
+                                           array_of_blocks=array_of_blocks)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            parser.parse()
+        except Exception as e:
+            return _error(e)
+    return plain(parser._tree)
+
+
+def reader_tokens(s1_keyvalues, text: str, limit: int = 10000) -> list:
+    tokens = []
+    try:
+        reader = s1_keyvalues.KVReader('corpus', text)
+        for _ in range(limit):
+            token, value, position = reader.read()
+            tokens.append([token.name, value, list(position)])
+            if token.name == 'END':
+                break
+    except Exception as e:
+        tokens.append(_error(e))
+    return tokens
+
+
+def kv_parser_result(s1_keyvalues, text: str):
+    try:
+        return plain(s1_keyvalues.KVParser('corpus', text).parse())
+    except Exception as e:
+        return _error(e)
+
+
+def describe(kv_parser, s1_keyvalues, text: str) -> dict:
+    """Everything the conformance test compares for one input."""
+    return {
+        'lexer': lexer_tokens(kv_parser, text),
+        'parser': [parser_tree(kv_parser, text, *mode) for mode in PARSER_MODES],
+        'reader': reader_tokens(s1_keyvalues, text),
+        'kv_parser': kv_parser_result(s1_keyvalues, text),
+    }
+
+
+_LEXER_ALPHABET = list('abc $%{}[]"\'\n\r\t/\\<>=.,!?-_0123') + ['\x0b', '\x1b', '\x7f', '\xe9', '\xa0', '\x85',
+                                                                   '​', '\x01', '　', '\r\n']
+_PARSER_PIECES = ['"key"', '"value"', 'key', '$x', '%y', '{', '}', '\n', '\n\n', ' ', '[$WIN32]', '[!$X360]', '"a b"',
+                  '//c\n', '""', "'q'", '>=dx90', '\t', '"un\n']
+_READER_ALPHABET = list('ab_Z09.-+{}"\'[]/\\|*$%<> \t\r\n\0\x0b\x0c\x85\xa0\xe9\xb2\xdf\x01xyz') + [
+    '//', '\r\n', '"key"', '{\n', '}\n', '123', '1.5', '[$X360]']
+
+
+def fuzz_inputs(count: int = 150, seed: int = 24) -> list[str]:
+    """Random character soups for the lexers and token soups for the parsers, same list on every run."""
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        inputs.append(''.join(rng.choice(_LEXER_ALPHABET) for _ in range(rng.randint(0, 80))))
+        inputs.append(''.join(rng.choice(_PARSER_PIECES) for _ in range(rng.randint(0, 30))))
+        inputs.append(''.join(rng.choice(_READER_ALPHABET) for _ in range(rng.randint(0, 40))))
+    return inputs
+
+
+_CRASHES = ('IndexError', 'StopIteration', 'RuntimeError')
+
+
+def matches_golden(expected, actual) -> bool:
+    """Exact match. Where the old code crashed with a Python error the current code may report a proper error
+    or read on, then only tokens before the crash have to match."""
+    if expected == actual:
+        return True
+    if _is_crash(expected):
+        return not _is_crash(actual)
+    if isinstance(expected, list) and expected and _is_crash(expected[-1]):
+        return isinstance(actual, list) and actual[:len(expected) - 1] == expected[:-1] and \
+            not any(_is_crash(token) for token in actual)
+    return False
+
+
+def _is_crash(value) -> bool:
+    return isinstance(value, list) and len(value) == 3 and value[0] == 'error' and value[1] in _CRASHES
@@ -0,0 +1,45 @@
+"""Writes golden.json with the lexer and parser output of kv_parser.py and s1_keyvalues.py at a git revision,
+for every corpus file and for the fuzz inputs of kv_conformance.fuzz_inputs.
+
+Usage: python tests/kv_corpus/make_golden.py <revision>
+The committed golden.json comes from the revision before the regular expression lexers (baseline).
+"""
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import conftest  # noqa: F401, makes the checkout importable as SourceIO
+from kv_conformance import CORPUS_DIR, corpus_files, describe, fuzz_inputs, import_revision, read_corpus_file
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    revision = sys.argv[1]
+    kv_parser = import_revision(revision, 'library/utils/kv_parser.py', 'golden_kv_parser')
+    s1_keyvalues = import_revision(revision, 'library/utils/s1_keyvalues.py', 'golden_s1_keyvalues')
+    golden = {
+        'files': {path.name: describe(kv_parser, s1_keyvalues, read_corpus_file(path)) for path in corpus_files()},
+        'fuzz': [[text, describe(kv_parser, s1_keyvalues, text)] for text in fuzz_inputs()],
+    }
+    # One input per line keeps diffs of regenerated files readable
+    with (CORPUS_DIR / 'golden.json').open('w', encoding='utf-8') as f:
+        for n, (section, entries) in enumerate(golden.items()):
+            f.write('{\n' if n == 0 else ',\n')
+            f.write(f'{json.dumps(section)}: {"{" if isinstance(entries, dict) else "["}\n')
+            items = entries.items() if isinstance(entries, dict) else enumerate(entries)
+            lines = [(f'{json.dumps(key)}: ' if isinstance(entries, dict) else '') + _dumps(value)
+                     for key, value in items]
+            f.write(',\n'.join(lines))
+            f.write('\n}' if isinstance(entries, dict) else '\n]')
+        f.write('\n}\n')
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+if __name__ == '__main__':
+    main()
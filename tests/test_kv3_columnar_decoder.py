@@ -0,0 +1,45 @@
+import pytest
+
+from SourceIO.library.source2.keyvalues3.columnar_decoder import (KV3ColumnarDecoder, TYPE_FORMAT_V1, TYPE_FORMAT_V3,
+                                                                   TYPE_FORMAT_V5)
+from SourceIO.library.source2.keyvalues3.types import LazyObject
+
+from kv3_trees import assert_same_tree, random_object_tree
+
+TYPE_FORMATS = [TYPE_FORMAT_V1, TYPE_FORMAT_V3, TYPE_FORMAT_V5]
+SEEDS = range(150)
+
+
+def _legacy_decode(writer):
+    context = writer.context()
+    return context.read_value(context)
+
+
+@pytest.mark.parametrize('blob_sizes', [True, False], ids=['blob-block', 'inline-blobs'])
+@pytest.mark.parametrize('type_format', TYPE_FORMATS)
+def test_columnar_matches_legacy(type_format, blob_sizes):
+    for seed in SEEDS:
+        writer = random_object_tree(type_format, seed, blob_sizes)
+        expected = _legacy_decode(writer)
+        actual = KV3ColumnarDecoder(writer.context(), type_format).decode()
+        assert_same_tree(expected, actual, f'seed {seed}')
+
+
+def _resolve_lazy(value):
+    if isinstance(value, LazyObject):
+        return {key: _resolve_lazy(member) for key, member in value.items()}
+    if isinstance(value, list):
+        return [_resolve_lazy(item) for item in value]
+    return value
+
+
+@pytest.mark.parametrize('type_format', TYPE_FORMATS)
+def test_lazy_matches_eager(type_format):
+    for seed in SEEDS:
+        writer = random_object_tree(type_format, seed)
+        eager = KV3ColumnarDecoder(writer.context(), type_format).decode()
+        lazy = KV3ColumnarDecoder(writer.context(), type_format, lazy=True).decode()
+        assert isinstance(lazy, LazyObject)
+        assert list(eager.keys()) == list(lazy.keys())
+        assert lazy.specifier == eager.specifier
+        assert repr(_resolve_lazy(lazy)) == repr(_resolve_lazy(eager))
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from SourceIO.library.utils import kv_parser, s1_keyvalues
+
+from kv_conformance import CORPUS_DIR, describe, matches_golden, read_corpus_file
+
+with (CORPUS_DIR / 'golden.json').open('r', encoding='utf-8') as _f:
+    GOLDEN = json.load(_f)
+
+
+def _assert_conforms(expected: dict, text: str):
+    actual = describe(kv_parser, s1_keyvalues, text)
+    for key, value in expected.items():
+        if key == 'parser':
+            for mode, (expected_tree, actual_tree) in enumerate(zip(value, actual[key])):
+                assert matches_golden(expected_tree, actual_tree), f'parser mode {mode}: {actual_tree}'
+        else:
+            assert matches_golden(value, actual[key]), f'{key}: {actual[key]}'
+
+
+@pytest.mark.parametrize('name', sorted(GOLDEN['files']))
+def test_corpus_file(name):
+    _assert_conforms(GOLDEN['files'][name], read_corpus_file(CORPUS_DIR / name))
+
+
+def test_fuzz_inputs():
+    for text, expected in GOLDEN['fuzz']:
+        _assert_conforms(expected, text)